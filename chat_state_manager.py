@@ -25,11 +25,68 @@ has_new = manager.has_new_message("联系人名称", current_hash="abc456", curr
 """
 
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence, Union
 from dataclasses import dataclass, field
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# 基线 hash 表的初始行数（不足时按倍数扩容）
+_INITIAL_HASH_CAPACITY = 64
+
+
+if hasattr(int, "bit_count"):
+    def _popcount(value: int) -> int:
+        return value.bit_count()
+else:  # Python 3.9
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount_u64(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values).astype(np.int64)
+else:  # NumPy < 2.0
+    def _popcount_u64(values: np.ndarray) -> np.ndarray:
+        bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1)
+        return bits.sum(axis=1, dtype=np.int64)
+
+
+def hash_distance(hash_a: str, hash_b: str) -> int:
+    """
+    计算两个十六进制感知哈希的汉明距离（与 imagehash 的 ``hash_a - hash_b`` 结果一致）
+    
+    Args:
+        hash_a: 十六进制 hash 字符串
+        hash_b: 十六进制 hash 字符串
+    
+    Returns:
+        不同的位数
+    """
+    return _popcount(int(hash_a, 16) ^ int(hash_b, 16))
+
+
+def _hash_to_u64(chat_hash: str) -> Optional[int]:
+    """十六进制 hash 转为可存入 uint64 表的整数；非十六进制或超过 64 位时返回 None"""
+    try:
+        value = int(chat_hash, 16)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 <= value < (1 << 64) else None
+
+
+def _fallback_distance(hash_a: str, hash_b: str) -> int:
+    """
+    无法按 64 位整数比较时的 hash 距离
+    
+    两者都是十六进制时按任意位宽计算汉明距离；否则按字符串比较，相同为 0，不同视为所有位都不同。
+    """
+    try:
+        return hash_distance(hash_a, hash_b)
+    except (TypeError, ValueError):
+        return 0 if hash_a == hash_b else 4 * max(len(hash_a), len(hash_b))
+
 
 @dataclass
 class ChatState:
@@ -44,14 +101,46 @@ class ChatStateManager:
     为每个联系人单独维护聊天状态，包括：
     - chat_hash: 聊天区域的感知哈希
     - avatar_y_positions: 头像y位置列表
+    
+    chat_hash 的整数形式另存于一张 uint64 表（每个联系人一行），
+    单个比较直接取整数做 XOR + popcount，多个联系人可用 hash_distances 一次向量化比较。
+    不是 64 位十六进制的 hash 不进表，比较时回退到字符串形式。
     """
     
     def __init__(self):
         """初始化状态管理器"""
         # 存储每个联系人的状态：{contact_name: ChatState}
         self._states: Dict[str, ChatState] = {}
+        # 基线 hash 表：{联系人键: 行号}，行内为 chat_hash 的 uint64 值；清除状态后行号回收复用
+        self._hash_rows: Dict[str, int] = {}
+        self._hash_table = np.zeros(_INITIAL_HASH_CAPACITY, dtype=np.uint64)
+        self._free_rows: List[int] = []
+        self._next_row = 0
         logger.debug("[ChatStateManager] 初始化聊天状态管理器")
     
+    def _hash_row(self, key: str) -> int:
+        """获取联系人在基线 hash 表中的行号，不存在则分配（表满时倍增扩容）"""
+        row = self._hash_rows.get(key)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._next_row
+                self._next_row += 1
+                if row >= len(self._hash_table):
+                    grown = np.zeros(len(self._hash_table) * 2, dtype=np.uint64)
+                    grown[:row] = self._hash_table
+                    self._hash_table = grown
+            self._hash_rows[key] = row
+        return row
+    
+    def _release_hash_row(self, key: str) -> None:
+        """释放联系人在基线 hash 表中的行（如有），供后续联系人复用"""
+        row = self._hash_rows.pop(key, None)
+        if row is not None:
+            self._hash_table[row] = 0
+            self._free_rows.append(row)
+    
     def _get_contact_key(self, contact_name: Optional[str] = None) -> str:
         """
         获取联系人键名
@@ -94,6 +183,13 @@ class ChatStateManager:
         # 更新状态
         if chat_hash is not None:
             state.chat_hash = chat_hash
+            value = _hash_to_u64(chat_hash)
+            if value is None:
+                # 非 64 位十六进制 hash：只保留字符串，比较时回退
+                self._release_hash_row(key)
+            else:
+                row = self._hash_row(key)  # 先分配行（可能扩容替换表），再写入
+                self._hash_table[row] = value
             logger.debug(f"[ChatStateManager] 保存联系人 '{contact_name or '默认'}' 的hash: {chat_hash[:16]}...")
         
         if avatar_y_positions is not None:
@@ -179,10 +275,12 @@ class ChatStateManager:
         
         # 计算哈希差异（汉明距离）
         try:
-            import imagehash
-            last_hash = imagehash.hex_to_hash(state.chat_hash)
-            current_hash_obj = imagehash.hex_to_hash(current_hash)
-            hash_diff = current_hash_obj - last_hash
+            row = self._hash_rows.get(self._get_contact_key(contact_name))
+            current_value = _hash_to_u64(current_hash)
+            if row is not None and current_value is not None:
+                hash_diff = _popcount(current_value ^ int(self._hash_table[row]))
+            else:
+                hash_diff = _fallback_distance(state.chat_hash, current_hash)
             
             # 如果hash差异超过阈值，视为聊天区域有变化 => 有新消息（避免同一人连续发多条时头像不变导致漏检）
             if hash_diff >= hash_threshold:
@@ -200,13 +298,54 @@ class ChatStateManager:
                     f"[ChatStateManager] 联系人 '{contact_name or '默认'}' 视觉未变化: hash差异={hash_diff} < 阈值{hash_threshold}，跳过读取"
                 )
                 return False
-        except ImportError:
-            logger.warning("[ChatStateManager] imagehash未安装，无法使用视觉指纹检测新消息")
-            return False
         except Exception as e:
             logger.error(f"[ChatStateManager] 判断新消息失败: {e}")
             return False
     
+    def hash_distances(
+        self,
+        contact_names: Sequence[Optional[str]],
+        current_hashes: Union[Sequence[str], np.ndarray],
+    ) -> np.ndarray:
+        """
+        批量计算多个联系人当前 hash 与基线的汉明距离（一次 XOR + popcount）
+        
+        只计算距离，不更新基线。基线或当前 hash 不是 64 位十六进制的条目逐个回退到字符串比较。
+        
+        Args:
+            contact_names: 联系人名称列表（None 表示默认状态）
+            current_hashes: 与 contact_names 一一对应的当前 hash（十六进制字符串，或 uint64 数组）
+        
+        Returns:
+            int64 数组，无视觉基线的联系人对应 -1
+        """
+        if len(contact_names) != len(current_hashes):
+            raise ValueError("contact_names 与 current_hashes 长度不一致")
+        keys = [self._get_contact_key(name) for name in contact_names]
+        has_baseline = np.array(
+            [key in self._states and self._states[key].chat_hash is not None for key in keys],
+            dtype=bool,
+        )
+        rows = np.array([self._hash_rows.get(key, 0) for key in keys], dtype=np.intp)
+        if isinstance(current_hashes, np.ndarray):
+            current = current_hashes.astype(np.uint64, copy=False)
+            comparable = np.array([key in self._hash_rows for key in keys], dtype=bool)
+        else:
+            values = [_hash_to_u64(h) for h in current_hashes]
+            current = np.array([v or 0 for v in values], dtype=np.uint64)
+            comparable = np.array(
+                [v is not None and key in self._hash_rows for v, key in zip(values, keys)],
+                dtype=bool,
+            )
+        distances = _popcount_u64(np.bitwise_xor(self._hash_table[rows], current))
+        for i in np.flatnonzero(has_baseline & ~comparable):
+            current_hash = current_hashes[i]
+            if isinstance(current_hash, np.integer):
+                current_hash = format(int(current_hash), "016x")
+            distances[i] = _fallback_distance(self._states[keys[i]].chat_hash, current_hash)
+        distances[~has_baseline] = -1
+        return distances
+    
     def clear_state(self, contact_name: Optional[str] = None) -> bool:
         """
         清除联系人的聊天状态
@@ -220,6 +359,7 @@ class ChatStateManager:
         key = self._get_contact_key(contact_name)
         if key in self._states:
             del self._states[key]
+            self._release_hash_row(key)
             logger.debug(f"[ChatStateManager] 清除联系人 '{contact_name or '默认'}' 的状态")
             return True
         return False
@@ -233,6 +373,10 @@ class ChatStateManager:
         """
         count = len(self._states)
         self._states.clear()
+        self._hash_rows.clear()
+        self._hash_table = np.zeros(_INITIAL_HASH_CAPACITY, dtype=np.uint64)
+        self._free_rows.clear()
+        self._next_row = 0
         logger.info(f"[ChatStateManager] 清除所有联系人状态，共 {count} 个")
         return count
     
@@ -441,7 +441,7 @@ def cmd_watch(args):
       2) 之后进入循环，仅调用 has_new_message(contact) 做 hash 检测；
          检测到有新消息时，再调用一次 poll(contact) 真正读取并退出。
     """
-    from config import WeChatAutomationConfig, ConfigValidationError
+    from config import WeChatAutomationConfig, ConfigValidationError, ensure_dotenv_loaded
     try:
         WeChatAutomationConfig.validate_config(strict=False)
     except ConfigValidationError as e:
@@ -461,6 +461,7 @@ def cmd_watch(args):
     debug = getattr(args, "debug", False)
 
     # 解析轮询间隔（秒），默认 2 秒，可通过环境变量覆盖
+    ensure_dotenv_loaded()
     interval_env = os.getenv("WECHAT_WATCH_INTERVAL_SECONDS", "").strip()
     try:
         interval = float(interval_env) if interval_env else 2.0
@@ -24,23 +24,48 @@
 
 import os
 import logging
+import functools
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from dotenv import load_dotenv
-
-# 先加载项目根目录下的 .env（如果存在），用于管理环境变量
-# 例如：WECHAT_ME_CONTACT、ALIYUN_OCR_APPCODE 等
 _BASE_DIR = Path(__file__).parent
-load_dotenv(dotenv_path=_BASE_DIR / ".env", override=False)
+
+
+@functools.lru_cache(maxsize=1)
+def ensure_dotenv_loaded() -> None:
+    """
+    按需加载项目根目录下的 .env（如果存在），仅在首次调用时读取文件。
+
+    不在模块导入时加载：测试、CLI 工具等不读取这些环境变量的进程无需打开 .env。
+    读取 WECHAT_ME_CONTACT、ALIYUN_OCR_APPCODE、DASHSCOPE_API_KEY 等变量前调用。
+    """
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=_BASE_DIR / ".env", override=False)
+
+
+class _EnvSetting:
+    """
+    类属性描述符：读取时先加载 .env，再返回环境变量的值（未设置时返回默认值）
+
+    在类上重新赋值（如 WeChatAutomationConfig.ALIYUN_OCR_APPCODE = "..."）会直接替换描述符，即代码赋值优先。
+    """
+
+    def __init__(self, name: str, default: Optional[str] = None):
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj, owner=None) -> Optional[str]:
+        ensure_dotenv_loaded()
+        return os.environ.get(self.name, self.default)
 
 # 支持相对导入（作为模块）和绝对导入（直接运行）
-try:
+if __package__:
     from .models import WeChatConfig
-except ImportError:
-    # 如果相对导入失败，尝试绝对导入（用于直接运行或测试）
+else:
+    # 直接运行或测试时按顶层模块导入；目录已在 sys.path 中时不再重复插入
     import sys
-    sys.path.insert(0, str(Path(__file__).parent))
+    if str(_BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(_BASE_DIR))
     from models import WeChatConfig
 
 
@@ -86,9 +111,21 @@ class WeChatAutomationConfig:
     
     # ========== 阿里云 OCR（高精版）==========
     # 设置环境变量 ALIYUN_OCR_APPCODE 或在代码中赋值，优先使用阿里云 OCR；未设置时回退到 Tesseract
-    ALIYUN_OCR_APPCODE = os.environ.get("ALIYUN_OCR_APPCODE", "f121886fece64b1daaaacea7d01e2137")
+    # 首次读取时才加载 .env；在代码中对类属性赋值则优先于环境变量
+    DEFAULT_ALIYUN_OCR_APPCODE = "f121886fece64b1daaaacea7d01e2137"
+    ALIYUN_OCR_APPCODE = _EnvSetting("ALIYUN_OCR_APPCODE", DEFAULT_ALIYUN_OCR_APPCODE)
     ALIYUN_OCR_URL = "https://gjbsb.market.alicloudapi.com/ocrservice/advanced"
     
+    @classmethod
+    def get_aliyun_ocr_appcode(cls) -> str:
+        """
+        获取阿里云 OCR AppCode
+
+        优先级：代码中赋值的 ALIYUN_OCR_APPCODE > 环境变量/.env 中的 ALIYUN_OCR_APPCODE > 默认值。
+        首次调用时才加载 .env。
+        """
+        return cls.ALIYUN_OCR_APPCODE
+    
     # ========== 模板图片路径 ==========
     TEMPLATE_PATHS = {
         # 搜索相关
@@ -220,8 +257,18 @@ class WeChatAutomationConfig:
     # ========== 红点检测 ==========
     # 红点判定逻辑：检测区域内红色像素面积占比超过此阈值则判定为有红点（默认 0.7）
     RED_POINT_AREA_RATIO_THRESHOLD = 0.6
+    # 红色像素的 HSV 范围（OpenCV：H 0-179，S/V 0-255）；红色色相跨越 0°，分低、高两段
+    RED_POINT_HSV_RANGES = (
+        ((0, 70, 50), (10, 255, 255)),
+        ((170, 70, 50), (179, 255, 255)),
+    )
     # 以下为旧版模板匹配用，若使用面积占比逻辑则可不依赖
     RED_POINT_MATCH_THRESHOLD = 0.5
+
+    # ========== 模板匹配 ==========
+    # 整图/区域级模板匹配是否通过 cv2.UMat 走 OpenCL（仅在 OpenCV 检测到可用 OpenCL 设备时生效，否则仍用 CPU）
+    # 默认关闭：首次调用需编译 OpenCL 内核，且小区域匹配的上传/回读开销可能超过收益，需在目标机器上实测后开启
+    TEMPLATE_MATCH_USE_OPENCL = False
     
     # ========== 延迟设置 ==========
     CLICK_DELAY = 0.1  # 点击后延迟（秒）
@@ -231,6 +278,7 @@ class WeChatAutomationConfig:
     # ========== 调试设置 ==========
     SAVE_SCREENSHOT_ON_ERROR = True  # 错误时保存截图
     SAVE_SCREENSHOT_ON_SUCCESS = False  # 成功时保存截图（调试用）
+    ANNOTATE_ELEMENTS = True  # annotate_all_elements 是否绘制标注图（生产环境可关闭，省去标注开销）
     LOG_LEVEL = "INFO"  # 日志级别
     
     # ========== 必需模板文件 ==========
@@ -14,28 +14,48 @@
 import json
 import logging
 import os
+import sys
+import threading
 from pathlib import Path
 from typing import Optional, Dict, List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 # 支持相对导入和绝对导入
+if __package__:
+    from .config import WeChatAutomationConfig, ensure_dotenv_loaded
+    from .models import DATACLASS_SLOTS
+else:
+    _dir = str(Path(__file__).parent)
+    if _dir not in sys.path:
+        sys.path.insert(0, _dir)
+    from config import WeChatAutomationConfig, ensure_dotenv_loaded
+    from models import DATACLASS_SLOTS
+
+# orjson 可选：C 实现的解析/序列化更快；未安装时回退到标准库 json
 try:
-    from .config import WeChatAutomationConfig
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
 except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent))
-    from config import WeChatAutomationConfig
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
 
 logger = logging.getLogger(__name__)
 
 # 全局单例实例（延迟初始化）
 _global_mapper_instance: Optional['ContactUserMapper'] = None
+_global_mapper_lock = threading.Lock()
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class ContactMapping:
-    """联系人映射信息"""
+    """联系人映射信息（不可变；更新映射时整体替换）"""
     contact_name: str
     user_id: int
     contact_id: Optional[str] = None  # 联系人ID（可选）
@@ -115,8 +135,8 @@ class ContactUserMapper:
         
         try:
             # 读取配置文件
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                config_data = _json_loads(f.read())
             
             logger.debug(f"[ContactUserMapper] 配置文件加载成功")
             
@@ -165,7 +185,7 @@ class ContactUserMapper:
             
             logger.debug(f"[ContactUserMapper] 配置加载完成，共 {len(self._mappings)} 个映射")
             
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError 也是其子类
             logger.error(f"[ContactUserMapper] ✗ 配置文件JSON格式错误: {e}")
             logger.error(f"[ContactUserMapper] 将使用默认配置")
             self._create_default_config()
@@ -188,8 +208,8 @@ class ContactUserMapper:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
             # 写入默认配置
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(default_config, f, ensure_ascii=False, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(_json_dumps(default_config))
             
             logger.info(f"[ContactUserMapper] ✓ 默认配置文件创建成功: {self.config_file}")
         except Exception as e:
@@ -296,8 +316,8 @@ class ContactUserMapper:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
             # 写入文件
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(_json_dumps(config_data))
             
             logger.debug(f"[ContactUserMapper] ✓ 配置文件保存成功")
             return True
@@ -344,6 +364,8 @@ class ContactUserMapper:
 
         若环境变量指定的联系人不在 contact_mappings 中，会记录 warning，但仍保留该名称，方便后续按名称做过滤。
         """
+        # 首次读取时才加载 .env
+        ensure_dotenv_loaded()
         # 优先 WECHAT_ME_CONTACT，其次 WECHAT_ME_CONTACT_NAME
         name = os.environ.get("WECHAT_ME_CONTACT") or os.environ.get("WECHAT_ME_CONTACT_NAME")
         if not name:
@@ -396,6 +418,9 @@ def get_global_mapper() -> ContactUserMapper:
     """
     global _global_mapper_instance
     if _global_mapper_instance is None:
-        _global_mapper_instance = ContactUserMapper()
-        logger.info(f"[ContactUserMapper] 创建全局单例实例，已加载 {len(_global_mapper_instance._mappings)} 个映射")
+        # 双重检查：并发首次访问时只创建一个实例，避免重复读取配置文件
+        with _global_mapper_lock:
+            if _global_mapper_instance is None:
+                _global_mapper_instance = ContactUserMapper()
+                logger.info(f"[ContactUserMapper] 创建全局单例实例，已加载 {len(_global_mapper_instance._mappings)} 个映射")
     return _global_mapper_instance
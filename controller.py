@@ -10,6 +10,8 @@ Controller 是纯驱动层，只负责UI操作，不关心消息状态、对话
 - send_text(contact, text): 发送文本消息
 - read_new_messages(contact, anchor_hash): 读取消息（直接读取，不判断首次/非首次）
 - has_new_message(): 检测是否有新消息（使用视觉指纹方法）
+- has_new_messages(contacts): 批量检测多个联系人是否有新消息（联系人列表行的视觉指纹，一次截图）
+- a_has_new_message / a_read_new_messages / a_send_text / a_send_file: 上述阻塞接口的协程版本
 
 设计原则：
 1. **纯驱动**：只做UI操作，不做业务判断
@@ -58,48 +60,109 @@ events = channel.poll("联系人")  # 自动处理轮询、去重、锚点
 ```
 """
 
+import asyncio
+import functools
+import importlib
 import logging
-from enum import Enum
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
 
-# 支持相对导入（作为模块）和绝对导入（直接运行）
-try:
-    from .flows import send_text_to_contact, open_chat, send_message, read_new_messages, send_file_to_contact
-    from .element_locator import has_new_message, save_chat_state, clear_chat_state, get_current_chat_hash
-    from .screen import get_wechat_hwnd, get_dpi_scale, WindowNotFoundError, DPIError, ScreenshotError
-    from .actions import ActionError
-    from .locator import LocateError
-    from .models import WeChatConfig, Message, FlowResult, TaskType
+# 作为包导入时使用相对导入；直接运行时把本目录加入 sys.path 后绝对导入（按 __package__ 判断，不靠 ImportError）
+# flows / element_locator / actions / locator 依赖 OpenCV、pyautogui、OCR 等重模块，
+# 仅在首次真正执行 UI 操作时导入（见 _flows、_element_locator、_error_table）
+if __package__:
+    from .screen import get_wechat_hwnd, get_dpi_scale, is_window_alive, capture_window, WindowNotFoundError, DPIError, ScreenshotError
+    from .models import WeChatConfig, Message, DATACLASS_SLOTS
+    from .chat_state_manager import ChatStateManager
     from .config import WeChatAutomationConfig, ConfigValidationError
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent))
-    from flows import send_text_to_contact, open_chat, send_message, read_new_messages, send_file_to_contact
-    from element_locator import has_new_message, save_chat_state, clear_chat_state, get_current_chat_hash
-    from screen import get_wechat_hwnd, get_dpi_scale, WindowNotFoundError, DPIError, ScreenshotError
-    from actions import ActionError
-    from locator import LocateError
-    from models import WeChatConfig, Message, FlowResult, TaskType
+else:
+    _dir = str(Path(__file__).parent)
+    if _dir not in sys.path:
+        sys.path.insert(0, _dir)
+    from screen import get_wechat_hwnd, get_dpi_scale, is_window_alive, capture_window, WindowNotFoundError, DPIError, ScreenshotError
+    from models import WeChatConfig, Message, DATACLASS_SLOTS
+    from chat_state_manager import ChatStateManager
     from config import WeChatAutomationConfig, ConfigValidationError
 
 logger = logging.getLogger(__name__)
 
 
-class ErrorCode(Enum):
-    """错误码枚举"""
-    SUCCESS = "SUCCESS"
-    WINDOW_NOT_FOUND = "WINDOW_NOT_FOUND"
-    DPI_ERROR = "DPI_ERROR"
-    TEMPLATE_MISSING = "TEMPLATE_MISSING"
-    TIMEOUT = "TIMEOUT"
-    ACTION_FAILED = "ACTION_FAILED"
-    LOCATE_FAILED = "LOCATE_FAILED"
-    SCREENSHOT_FAILED = "SCREENSHOT_FAILED"
-    CONFIG_INVALID = "CONFIG_INVALID"
-    UNKNOWN_ERROR = "UNKNOWN_ERROR"
+class ErrorCode(IntEnum):
+    """错误码枚举（整数值，比较/哈希为整数运算；需要字符串时使用 .name）"""
+    SUCCESS = 0
+    WINDOW_NOT_FOUND = 1
+    DPI_ERROR = 2
+    TEMPLATE_MISSING = 3
+    TIMEOUT = 4
+    ACTION_FAILED = 5
+    LOCATE_FAILED = 6
+    SCREENSHOT_FAILED = 7
+    CONFIG_INVALID = 8
+    UNKNOWN_ERROR = 9
+
+
+# 底层异常类型 -> (错误码, 信息前缀)；按异常 MRO 查找，子类同样适用。首次映射错误时构建
+_ERR_BY_TYPE: Optional[Dict[type, tuple]] = None
+
+
+def _import_sibling(name: str):
+    """导入同目录下的模块（包内按包名，直接运行时按模块名；已导入时直接取 sys.modules）"""
+    return importlib.import_module(f"{__package__}.{name}" if __package__ else name)
+
+
+def _flows():
+    """延迟导入 flows 模块"""
+    return _import_sibling("flows")
+
+
+def _element_locator():
+    """延迟导入 element_locator 模块"""
+    return _import_sibling("element_locator")
+
+
+def _error_table() -> Dict[type, tuple]:
+    """构建（并缓存）异常类型 -> (错误码, 信息前缀) 映射表"""
+    global _ERR_BY_TYPE
+    if _ERR_BY_TYPE is None:
+        table: Dict[type, tuple] = {
+            WindowNotFoundError: (ErrorCode.WINDOW_NOT_FOUND, "微信窗口未找到"),
+            DPIError: (ErrorCode.DPI_ERROR, "DPI设置错误"),
+            ScreenshotError: (ErrorCode.SCREENSHOT_FAILED, "截图失败"),
+        }
+        try:
+            ActionError = _import_sibling("actions").ActionError
+            LocateError = _import_sibling("locator").LocateError
+            table[ActionError] = (ErrorCode.ACTION_FAILED, "操作失败")
+            table[LocateError] = (ErrorCode.LOCATE_FAILED, "定位失败")
+        except ImportError as e:
+            # 依赖缺失时这两类异常本就不会出现，不影响其余映射
+            logger.debug(f"错误码映射未加载 actions/locator 异常类型: {e}")
+        _ERR_BY_TYPE = table
+    return _ERR_BY_TYPE
+
+# 类型未命中时按错误信息关键字兜底（超时优先于模板缺失）
+_TIMEOUT_RE = re.compile(r"timeout|超时", re.IGNORECASE)
+_TEMPLATE_RE = re.compile(r"template|模板", re.IGNORECASE)
+
+
+def _ui_serialized(method):
+    """
+    UI 驱动方法装饰器：在 self._ui_lock 下执行
+    
+    鼠标/键盘/截图操作及就绪/帧缓存不能被多个线程交错使用；锁可重入，UI 方法之间可以互相调用。
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._ui_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class WeChatControllerError(Exception):
@@ -131,7 +194,7 @@ class ReadMessageError(WeChatControllerError):
     pass
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ControllerResult:
     """控制器操作结果
     
@@ -171,6 +234,19 @@ class WeChatController:
         """
         self.config = config or WeChatConfig()
         self._hwnd = None
+        # 就绪检查缓存：ts 为上次完整检查的时间（time.monotonic），0 表示需要重新检查
+        self._ready_cache: Dict[str, Any] = {"ts": 0.0, "hwnd": None, "dpi": None}
+        # 帧缓存：最近一次截图及其元素定位结果，供连续的 hash/状态查询复用；任何 UI 操作后失效
+        self._frame_cache: Dict[str, Any] = {"ts": 0.0, "contact": None, "img": None, "positions": None}
+        # 最近一次由本控制器成功打开/发送的聊天（及时间），用于跳过重复的 open_chat
+        self._current_chat: Optional[str] = None
+        self._current_chat_ts = 0.0
+        # 联系人列表行的视觉基线（has_new_messages 使用，与聊天区基线分开维护）
+        self._list_row_states = ChatStateManager()
+        # get_status 探测用线程池（首次调用时创建）
+        self._status_pool: Optional[ThreadPoolExecutor] = None
+        # 同一时刻只允许一个 UI 操作（鼠标/键盘/截图不可交错）；由 _ui_serialized 在各 UI 方法内获取
+        self._ui_lock = threading.RLock()
         logger.info("WeChatController 初始化完成（驱动层）")
     
     def _map_error_to_code(self, error: Exception) -> tuple[ErrorCode, str]:
@@ -183,30 +259,111 @@ class WeChatController:
         Returns:
             (错误码, 错误信息)
         """
-        if isinstance(error, WindowNotFoundError):
-            return (ErrorCode.WINDOW_NOT_FOUND, f"微信窗口未找到: {str(error)}")
-        elif isinstance(error, DPIError):
-            return (ErrorCode.DPI_ERROR, f"DPI设置错误: {str(error)}")
-        elif isinstance(error, ScreenshotError):
-            return (ErrorCode.SCREENSHOT_FAILED, f"截图失败: {str(error)}")
-        elif isinstance(error, ActionError):
-            return (ErrorCode.ACTION_FAILED, f"操作失败: {str(error)}")
-        elif isinstance(error, LocateError):
-            return (ErrorCode.LOCATE_FAILED, f"定位失败: {str(error)}")
-        elif "timeout" in str(error).lower() or "超时" in str(error):
-            return (ErrorCode.TIMEOUT, f"操作超时: {str(error)}")
-        elif "模板" in str(error) or "template" in str(error).lower():
-            return (ErrorCode.TEMPLATE_MISSING, f"模板缺失: {str(error)}")
-        else:
-            return (ErrorCode.UNKNOWN_ERROR, f"未知错误: {str(error)}")
+        text = str(error)
+        table = _error_table()
+        for cls in type(error).__mro__:
+            entry = table.get(cls)
+            if entry is not None:
+                error_code, prefix = entry
+                return (error_code, f"{prefix}: {text}")
+        return self._map_message_to_code(text)
+    
+    def _map_message_to_code(self, text: str) -> tuple[ErrorCode, str]:
+        """
+        按错误信息关键字映射错误码（用于流程结果中的错误字符串，无需构造异常）
+        
+        Args:
+            text: 错误信息
+        
+        Returns:
+            (错误码, 错误信息)
+        """
+        if _TIMEOUT_RE.search(text):
+            return (ErrorCode.TIMEOUT, f"操作超时: {text}")
+        if _TEMPLATE_RE.search(text):
+            return (ErrorCode.TEMPLATE_MISSING, f"模板缺失: {text}")
+        return (ErrorCode.UNKNOWN_ERROR, f"未知错误: {text}")
+    
+    def _invalidate_ready_cache(self) -> None:
+        """使就绪检查缓存失效，下次调用 _ensure_ready 时重新完整检查"""
+        self._ready_cache["ts"] = 0.0
+    
+    def _invalidate_frame_cache(self) -> None:
+        """丢弃缓存的截图（UI 可能已变化）"""
+        self._frame_cache.update(ts=0.0, contact=None, img=None, positions=None)
+    
+    def _remember_current_chat(self, contact: Optional[str]) -> None:
+        """记录当前前台聊天（None 表示未知）"""
+        self._current_chat = contact.strip() if contact else None
+        self._current_chat_ts = time.monotonic()
+    
+    def _is_current_chat(self, contact: str) -> bool:
+        """
+        前台聊天是否就是 contact
+        
+        仅当本控制器最近（current_chat_ttl 秒内）打开过该聊天时才做判断，并以界面上识别出的
+        联系人名确认（用户可能已手动切换聊天）；无法识别或不一致时返回 False。
+        """
+        target = contact.strip()
+        if (
+            self._current_chat != target
+            or time.monotonic() - self._current_chat_ts >= self.config.current_chat_ttl
+        ):
+            return False
+        try:
+            visible = _element_locator().get_contact_name(contact_name=target, max_ocr_retries=1)
+        except Exception as e:
+            logger.debug("识别当前联系人失败: %s", e)
+            return False
+        if not visible or visible.strip() != target:
+            logger.debug("界面当前联系人为 %s，与 %s 不一致", visible, target)
+            self._remember_current_chat(None)
+            return False
+        return True
+    
+    def _grab(self, contact: Optional[str]) -> tuple:
+        """
+        获取当前窗口截图与元素定位结果，在 config.frame_cache_ttl 秒内对同一联系人复用
+        
+        Args:
+            contact: 联系人名称（用于选择头像模板）
+        
+        Returns:
+            (screenshot, positions)
+        """
+        cache = self._frame_cache
+        if (
+            cache["img"] is not None
+            and cache["contact"] == contact
+            and time.monotonic() - cache["ts"] < self.config.frame_cache_ttl
+        ):
+            return cache["img"], cache["positions"]
+        
+        screenshot = capture_window(self._hwnd)
+        positions = _element_locator().locate_all_elements(screenshot, contact_name=contact)
+        cache.update(ts=time.monotonic(), contact=contact, img=screenshot, positions=positions)
+        return screenshot, positions
     
     def _ensure_ready(self) -> None:
         """
         确保微信准备就绪
         
+        完整检查（查找窗口、读取DPI、校验配置）的结果在 config.ready_ttl 秒内复用，
+        期间只用 IsWindow 确认窗口句柄仍然有效。
+        
         Raises:
             WeChatNotReadyError: 微信未准备就绪
         """
+        cache = self._ready_cache
+        if (
+            cache["ts"]
+            and time.monotonic() - cache["ts"] < self.config.ready_ttl
+            and is_window_alive(cache["hwnd"])
+        ):
+            self._hwnd = cache["hwnd"]
+            return
+        
+        self._invalidate_ready_cache()
         try:
             # 检查窗口是否存在
             self._hwnd = get_wechat_hwnd()
@@ -218,6 +375,8 @@ class WeChatController:
             
             # 配置自检：硬失败（FAIL FAST），未通过则抛 ConfigValidationError
             WeChatAutomationConfig.validate_config(strict=False)
+            
+            cache.update(ts=time.monotonic(), hwnd=self._hwnd, dpi=dpi_scale)
         
         except ConfigValidationError as e:
             raise WeChatNotReadyError(ErrorCode.CONFIG_INVALID, f"配置验证失败: {e}")
@@ -229,6 +388,7 @@ class WeChatController:
             error_code, error_msg = self._map_error_to_code(e)
             raise WeChatNotReadyError(error_code, error_msg)
     
+    @_ui_serialized
     def send_text(self, contact: str, text: str) -> ControllerResult:
         """
         发送文本消息（驱动层方法）
@@ -252,11 +412,13 @@ class WeChatController:
             self._ensure_ready()
             
             logger.info(f"发送消息: {contact} -> {text[:20]}...")
+            self._invalidate_frame_cache()
             
             # 调用流程
-            flow_result = send_text_to_contact(contact, text, self.config)
+            flow_result = _flows().send_text_to_contact(contact, text, self.config)
             
             if flow_result.success:
+                self._remember_current_chat(contact)
                 return ControllerResult(
                     success=True,
                     error_code=ErrorCode.SUCCESS,
@@ -264,9 +426,10 @@ class WeChatController:
                     execution_time=flow_result.execution_time
                 )
             else:
+                self._remember_current_chat(None)
                 # 从流程结果中提取错误信息
-                error_code, error_msg = self._map_error_to_code(
-                    Exception(flow_result.error_message or "发送消息失败")
+                error_code, error_msg = self._map_message_to_code(
+                    flow_result.error_message or "发送消息失败"
                 )
                 
                 return ControllerResult(
@@ -280,10 +443,13 @@ class WeChatController:
         except WeChatNotReadyError:
             raise
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._remember_current_chat(None)
             error_code, error_msg = self._map_error_to_code(e)
             logger.error(f"发送消息失败: {error_msg}")
             raise SendMessageError(error_code, error_msg)
     
+    @_ui_serialized
     def open_chat(self, contact: str) -> ControllerResult:
         """
         打开聊天窗口（驱动层方法）
@@ -305,11 +471,13 @@ class WeChatController:
             self._ensure_ready()
             
             logger.info(f"打开聊天窗口: {contact}")
+            self._invalidate_frame_cache()
             
             # 调用流程
-            flow_result = open_chat(contact, self.config)
+            flow_result = _flows().open_chat(contact, self.config)
             
             if flow_result.success:
+                self._remember_current_chat(contact)
                 return ControllerResult(
                     success=True,
                     error_code=ErrorCode.SUCCESS,
@@ -317,9 +485,10 @@ class WeChatController:
                     execution_time=flow_result.execution_time
                 )
             else:
+                self._remember_current_chat(None)
                 # 从流程结果中提取错误信息
-                error_code, error_msg = self._map_error_to_code(
-                    Exception(flow_result.error_message or "打开聊天窗口失败")
+                error_code, error_msg = self._map_message_to_code(
+                    flow_result.error_message or "打开聊天窗口失败"
                 )
                 
                 return ControllerResult(
@@ -333,10 +502,13 @@ class WeChatController:
         except WeChatNotReadyError:
             raise
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._remember_current_chat(None)
             error_code, error_msg = self._map_error_to_code(e)
             logger.error(f"打开聊天窗口失败: {error_msg}")
             raise ContactNotFoundError(error_code, error_msg)
     
+    @_ui_serialized
     def read_new_messages(
         self,
         contact: Optional[str] = None,
@@ -349,7 +521,7 @@ class WeChatController:
         状态管理（锚点、去重等）应该由 MessageChannel 层处理。
         
         Args:
-            contact: 联系人名称，如果指定则先打开聊天窗口
+            contact: 联系人名称，如果指定则先打开聊天窗口（本控制器刚打开过且界面上仍是该聊天时除外）
             anchor_hash: 锚点hash（可选），用于停止读取（匹配到锚点停止）
         
         Returns:
@@ -364,20 +536,25 @@ class WeChatController:
             self._ensure_ready()
             
             logger.info(f"读取消息: {contact or '当前窗口'}")
+            self._invalidate_frame_cache()
             
-            # 如果指定了联系人，先打开聊天窗口
-            if contact:
+            # 如果指定了联系人，先打开聊天窗口（刚由本控制器打开过、且界面联系人名一致则跳过）
+            if contact and self._is_current_chat(contact):
+                logger.debug(f"当前聊天已是 {contact}，跳过 open_chat")
+            elif contact:
                 logger.debug(f"打开聊天窗口: {contact}")
-                open_result = open_chat(contact, self.config)
+                open_result = _flows().open_chat(contact, self.config)
                 if not open_result.success:
-                    error_code, error_msg = self._map_error_to_code(
-                        Exception(open_result.error_message or "打开聊天窗口失败")
+                    self._remember_current_chat(None)
+                    error_code, error_msg = self._map_message_to_code(
+                        open_result.error_message or "打开聊天窗口失败"
                     )
                     raise ReadMessageError(error_code, error_msg)
+                self._remember_current_chat(contact)
             
             # 读取消息（使用锚点停止条件）
             logger.debug(f"读取消息，锚点: {anchor_hash[:16] if anchor_hash else 'None'}...")
-            flow_result = read_new_messages(
+            flow_result = _flows().read_new_messages(
                 contact,
                 self.config,
                 anchor_hash=anchor_hash
@@ -388,8 +565,8 @@ class WeChatController:
                 logger.info(f"成功读取 {len(messages)} 条消息")
                 return messages
             else:
-                error_code, error_msg = self._map_error_to_code(
-                    Exception(flow_result.error_message or "读取消息失败")
+                error_code, error_msg = self._map_message_to_code(
+                    flow_result.error_message or "读取消息失败"
                 )
                 raise ReadMessageError(error_code, error_msg)
         
@@ -398,10 +575,13 @@ class WeChatController:
         except ReadMessageError:
             raise
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._remember_current_chat(None)
             error_code, error_msg = self._map_error_to_code(e)
             logger.error(f"读取消息失败: {error_msg}")
             raise ReadMessageError(error_code, error_msg)
     
+    @_ui_serialized
     def has_new_message(self, contact: Optional[str] = None, hash_threshold: int = 8) -> bool:
         """
         检测是否有新消息（驱动层方法，使用视觉指纹）
@@ -421,19 +601,75 @@ class WeChatController:
         """
         try:
             self._ensure_ready()
-            return has_new_message(contact_name=contact, hash_threshold=hash_threshold)
+            screenshot, positions = self._grab(contact)
+            return _element_locator().has_new_message(
+                positions=positions,
+                screenshot=screenshot,
+                contact_name=contact,
+                hash_threshold=hash_threshold,
+            )
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._invalidate_frame_cache()
             logger.error(f"检测新消息失败: {e}")
             return False
     
+    @_ui_serialized
+    def has_new_messages(self, contacts: List[str], hash_threshold: int = 8) -> Dict[str, bool]:
+        """
+        批量检测多个联系人是否有新消息（驱动层方法，使用联系人列表行的视觉指纹）
+        
+        只截图、定位一次：取联系人列表中每个可见联系人所在行（头像、昵称、预览、时间、红点），
+        整批计算 pHash，并与各行的基线一次性比较。
+        与 has_new_message 不同，无需打开聊天窗口，适合多联系人轮询。
+        
+        Args:
+            contacts: 联系人名称列表
+            hash_threshold: 哈希差异阈值（pHash建议8-12，默认8）
+        
+        Returns:
+            {联系人名称: 是否有新消息}；列表中不可见的联系人为 False
+        
+        Note:
+            每个联系人首次出现时保存其行基线并返回 False，后续调用比较变化；判定为变化时更新基线。
+        """
+        result = {contact: False for contact in contacts}
+        try:
+            self._ensure_ready()
+            screenshot, positions = self._grab(None)
+            element_locator = _element_locator()
+            row_rois = element_locator.get_contact_row_rois(screenshot, positions)
+            visible = [contact for contact in contacts if contact in row_rois]
+            if not visible:
+                logger.debug(f"联系人列表中未找到以下联系人: {contacts}")
+                return result
+            
+            hashes = element_locator.batch_phash(screenshot, [row_rois[c] for c in visible])
+            distances = self._list_row_states.hash_distances(visible, hashes)
+            for contact, row_hash, distance in zip(visible, hashes, distances):
+                if distance < 0 or distance >= hash_threshold:
+                    self._list_row_states.save_state(contact, chat_hash=f"{int(row_hash):016x}")
+                result[contact] = bool(distance >= hash_threshold)
+            logger.debug(f"批量检测新消息: {result}")
+            return result
+        except Exception as e:
+            self._invalidate_ready_cache()
+            self._invalidate_frame_cache()
+            logger.error(f"批量检测新消息失败: {e}")
+            return result
+    
+    @_ui_serialized
     def save_chat_state(self, contact: Optional[str] = None) -> bool:
         """
         保存当前聊天窗口的视觉基线（与信息锚点绑定：仅在锚点更新/初始化成功后由 message_channel 调用）。
         """
         try:
             self._ensure_ready()
-            return save_chat_state(contact_name=contact)
+            screenshot, positions = self._grab(contact)
+            return _element_locator().save_chat_state(positions=positions, screenshot=screenshot, contact_name=contact)
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._invalidate_frame_cache()
             logger.warning(f"保存聊天状态失败: {e}")
             return False
     
@@ -442,19 +678,23 @@ class WeChatController:
         清除指定联系人的视觉基线（锚点重置或初始化失败时调用，避免视觉状态与锚点不一致）。
         """
         try:
-            return clear_chat_state(contact_name=contact)
+            return _element_locator().clear_chat_state(contact_name=contact)
         except Exception as e:
             logger.warning(f"清除聊天状态失败: {e}")
             return False
     
+    @_ui_serialized
     def get_current_chat_hash(self, contact: Optional[str] = None) -> Optional[str]:
         """
         获取当前聊天区域的感知哈希（不修改状态，用于轮询前与已保存的 UI hash 比较）。
         """
         try:
             self._ensure_ready()
-            return get_current_chat_hash(contact_name=contact)
+            screenshot, positions = self._grab(contact)
+            return _element_locator().get_current_chat_hash(contact_name=contact, screenshot=screenshot, positions=positions)
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._invalidate_frame_cache()
             logger.debug(f"获取当前聊天区 hash 失败: {e}")
             return None
     
@@ -473,6 +713,7 @@ class WeChatController:
         except Exception:
             return False
     
+    @_ui_serialized
     def ensure_wechat_ready(self) -> bool:
         """
         确保微信准备就绪
@@ -484,12 +725,15 @@ class WeChatController:
             WeChatNotReadyError: 微信未准备就绪
         """
         try:
+            # 显式调用时强制完整检查
+            self._invalidate_ready_cache()
             self._ensure_ready()
             return True
         except WeChatNotReadyError as e:
             logger.error(f"微信未准备就绪: {e.message}")
             raise
     
+    @_ui_serialized
     def send_file(self, contact: str, file_path: str) -> ControllerResult:
         """
         发送文件/图片消息（驱动层方法）
@@ -513,11 +757,13 @@ class WeChatController:
             self._ensure_ready()
             
             logger.info(f"发送文件: {contact} -> {file_path}")
+            self._invalidate_frame_cache()
             
             # 调用流程
-            flow_result = send_file_to_contact(contact, file_path, self.config)
+            flow_result = _flows().send_file_to_contact(contact, file_path, self.config)
             
             if flow_result.success:
+                self._remember_current_chat(contact)
                 return ControllerResult(
                     success=True,
                     error_code=ErrorCode.SUCCESS,
@@ -525,9 +771,10 @@ class WeChatController:
                     execution_time=flow_result.execution_time
                 )
             else:
+                self._remember_current_chat(None)
                 # 从流程结果中提取错误信息
-                error_code, error_msg = self._map_error_to_code(
-                    Exception(flow_result.error_message or "发送文件失败")
+                error_code, error_msg = self._map_message_to_code(
+                    flow_result.error_message or "发送文件失败"
                 )
                 
                 return ControllerResult(
@@ -541,6 +788,8 @@ class WeChatController:
         except WeChatNotReadyError:
             raise
         except Exception as e:
+            self._invalidate_ready_cache()
+            self._remember_current_chat(None)
             error_code, error_msg = self._map_error_to_code(e)
             logger.error(f"发送文件失败: {error_msg}")
             raise SendMessageError(error_code, error_msg)
@@ -549,6 +798,8 @@ class WeChatController:
         """
         获取控制器状态
         
+        微信未运行时不读取 DPI、不校验配置；运行时两者相互独立，配置校验在后台线程与 DPI 读取并行。
+        
         Returns:
             状态信息字典
         """
@@ -560,9 +811,12 @@ class WeChatController:
         }
         
         try:
-            if self.is_wechat_running():
+            if status["wechat_running"]:
+                if self._status_pool is None:
+                    self._status_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wechat-status")
+                valid_future = self._status_pool.submit(WeChatAutomationConfig.validate)
                 status["dpi_scale"] = get_dpi_scale()
-                is_valid, error = WeChatAutomationConfig.validate()
+                is_valid, error = valid_future.result()
                 status["config_valid"] = is_valid
                 if not is_valid:
                     status["config_error"] = error
@@ -570,3 +824,27 @@ class WeChatController:
             status["error"] = str(e)
         
         return status
+    
+    # ==================== 协程接口 ====================
+    # 阻塞的 UI 操作通过 asyncio.to_thread 放到工作线程执行，事件循环在等待期间可处理 LLM/网络等 IO。
+    # UI 操作之间由各同步方法内的 _ui_lock 串行化，并发的只是 UI 操作与其他协程；就绪检查依赖 TTL 缓存自然合并。
+    
+    async def a_has_new_message(self, contact: Optional[str] = None, hash_threshold: int = 8) -> bool:
+        """has_new_message 的协程版本"""
+        return await asyncio.to_thread(self.has_new_message, contact, hash_threshold)
+    
+    async def a_read_new_messages(
+        self,
+        contact: Optional[str] = None,
+        anchor_hash: Optional[str] = None
+    ) -> List[Message]:
+        """read_new_messages 的协程版本"""
+        return await asyncio.to_thread(self.read_new_messages, contact, anchor_hash)
+    
+    async def a_send_text(self, contact: str, text: str) -> ControllerResult:
+        """send_text 的协程版本"""
+        return await asyncio.to_thread(self.send_text, contact, text)
+    
+    async def a_send_file(self, contact: str, file_path: str) -> ControllerResult:
+        """send_file 的协程版本"""
+        return await asyncio.to_thread(self.send_file, contact, file_path)
@@ -6,6 +6,7 @@
 - locate_all_elements(): 定位所有UI元素并返回位置字典（推荐使用此函数获取位置）
 - locate_all_contact_avatars_in_list(): 一次性定位联系人列表中所有配置联系人的头像位置（返回带联系人标识的结果列表）
 - locate_all_contact_avatars_in_chat(): 一次性定位聊天区域中所有配置联系人的头像位置（返回带联系人标识的结果列表，支持群聊）
+- locate_all_contact_avatars(): 一次匹配同时返回列表区域与聊天区域的联系人头像（两组都需要时使用）
 - get_contacts_with_new_message_red_point(): 扫描新消息红点，返回存在红点的联系人名称列表（不打开聊天、不读消息）
 - get_element_bounds(): 根据元素位置和大小计算边界框
 - save_element_positions(): 保存元素位置到JSON文件（用于调试和缓存）
@@ -78,25 +79,44 @@
      * 如果没有搜索框，则一定是聊天中的（为单独打开聊天窗口做准备）
 """
 
+import copy
+import functools
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List, Union
 import cv2
 import numpy as np
 
-# 感知哈希库（可选依赖）
+# orjson 可选：C 实现的序列化更快，且可直接序列化 NumPy 整数；未安装时回退到标准库 json
 try:
-    import imagehash
-    from PIL import Image
-    IMAGEHASH_AVAILABLE = True
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
 except ImportError:
-    IMAGEHASH_AVAILABLE = False
+    orjson = None
+
+    def _json_default(obj):
+        if isinstance(obj, (np.generic, np.ndarray)):
+            return obj.tolist()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8")
 
 # 支持相对导入（作为模块）和绝对导入（直接运行）
 try:
-    from .screen import get_wechat_hwnd, capture_window, save_screenshot
-    from .locator import match_all_templates, put_chinese_text, ocr_region
+    from .screen import get_wechat_hwnd, capture_window, get_window_client_bbox, save_screenshot
+    from .locator import match_all_templates, put_chinese_texts, ocr_region, load_template_gray, to_gray, match_response, frame_scope, frame_cache
     from .config import WeChatAutomationConfig
     from .models import LocateResult, LocateMethod, ContactLocateResult
     from .contact_mapper import ContactUserMapper
@@ -105,8 +125,8 @@ except ImportError:
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent))
-    from screen import get_wechat_hwnd, capture_window, save_screenshot
-    from locator import match_all_templates, put_chinese_text, ocr_region
+    from screen import get_wechat_hwnd, capture_window, get_window_client_bbox, save_screenshot
+    from locator import match_all_templates, put_chinese_texts, ocr_region, load_template_gray, to_gray, match_response, frame_scope, frame_cache
     from config import WeChatAutomationConfig
     from models import LocateResult, LocateMethod, ContactLocateResult
     from contact_mapper import ContactUserMapper
@@ -169,6 +189,32 @@ ELEMENT_ORDER = [
     "input_box_anchor",  # 特殊处理：使用sticker_icon和send_button的中点
 ]
 
+# 标注颜色（按顺序，与ELEMENT_ORDER对应）
+_ELEMENT_COLORS = [
+    (0, 255, 255),   # 黄色 - chat_message_icon
+    (255, 165, 0),   # 橙色 - three_point_icon
+    (255, 20, 147),  # 深粉色 - pin_icon
+    (0, 255, 0),     # 绿色 - search_bar
+    (0, 0, 255),     # 红色 - profile_photo_in_list
+    (255, 192, 203), # 粉色 - new_message_red_point
+    (255, 0, 0),     # 蓝色 - profile_photo_in_chat
+    (255, 0, 255),   # 紫色 - sticker_icon
+    (255, 255, 0),   # 青色 - save_icon
+    (128, 0, 128),   # 紫色 - file_icon
+    (255, 192, 203), # 粉色 - screencap_icon
+    (200, 200, 200), # 浅灰 - tape_icon
+    (0, 128, 128),   # 青色 - voice_call_icon
+    (128, 255, 0),   # 黄绿色 - video_call_icon
+    (0, 128, 255),   # 橙色 - send_button
+    (255, 255, 255), # 白色 - input_box_anchor
+]
+
+# 标注时每个元素的 (名称, 颜色)，导入时按 ELEMENT_ORDER 算好；颜色不够时用灰色
+ELEMENT_DRAW_SPEC: Tuple[Tuple[str, Tuple[int, int, int]], ...] = tuple(
+    (name, _ELEMENT_COLORS[idx] if idx < len(_ELEMENT_COLORS) else (128, 128, 128))
+    for idx, name in enumerate(ELEMENT_ORDER)
+)
+
 # 元素对应的模板路径键名
 TEMPLATE_KEYS = {
     "chat_message_icon": "topbar_chat_message",
@@ -203,46 +249,108 @@ def get_element_size(element_name: str) -> Tuple[int, int]:
     return ELEMENT_SIZES.get(element_name, (30, 30))
 
 
+def _red_mask(region_bgr: np.ndarray) -> np.ndarray:
+    """红色像素掩码：转 HSV 后按低/高两段红色色相取掩码（对亮度、抗锯齿边缘比 RGB 差值稳健）"""
+    hsv = cv2.cvtColor(region_bgr, cv2.COLOR_BGR2HSV)
+    red_mask = None
+    for lower, upper in WeChatAutomationConfig.RED_POINT_HSV_RANGES:
+        band = cv2.inRange(hsv, lower, upper)
+        red_mask = band if red_mask is None else cv2.bitwise_or(red_mask, band)
+    return red_mask
+
+
+def _red_ratio_from_mask(
+    red_mask: np.ndarray,
+    search_left: int,
+    search_top: int,
+    search_right: int,
+    search_bottom: int,
+    min_ratio: float,
+    red_pixels: Optional[int] = None,
+) -> Tuple[float, int, int]:
+    """由检测区域的红色掩码计算 (最大红色连通块占比, 中心 x, 中心 y)，规则见 _red_pixel_ratio_in_region"""
+    total = red_mask.shape[0] * red_mask.shape[1]
+    # 大多数头像没有红点：红色像素总数已不够阈值时，最大连通块更不可能够，跳过连通块分析
+    any_red = cv2.countNonZero(red_mask) if red_pixels is None else red_pixels
+    if any_red == 0 or any_red < min_ratio * total:
+        return any_red / total, (search_left + search_right) // 2, (search_top + search_bottom) // 2
+    # 只取最大的红色连通块：孤立的抗锯齿边缘/噪点不计入面积，质心也不被其拉偏
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(red_mask, connectivity=8)
+    largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    red_count = int(stats[largest, cv2.CC_STAT_AREA])
+    cx = int(centroids[largest, 0]) + search_left
+    cy = int(centroids[largest, 1]) + search_top
+    return red_count / total, cx, cy
+
+
 def _red_pixel_ratio_in_region(
     screenshot_bgr: np.ndarray,
     search_left: int,
     search_top: int,
     search_right: int,
     search_bottom: int,
+    min_ratio: float = 0.0,
 ) -> Tuple[float, int, int]:
     """
-    红点检测核心逻辑：在划定检测区域内统计红色像素面积占比。
+    红点检测核心逻辑：在划定检测区域内统计最大红色连通块（HSV 范围见 RED_POINT_HSV_RANGES）的面积占比。
     若占比大于配置的 RED_POINT_AREA_RATIO_THRESHOLD（默认 70%）则判定为有红点。
 
     Args:
         screenshot_bgr: BGR 截图
         search_left, search_top, search_right, search_bottom: 检测区域边界（像素）
+        min_ratio: 判定阈值（可选）。全部红色像素的占比已低于此值时不再做连通块分析，
+            直接返回该占比（最大连通块占比的上界）与区域几何中心
 
     Returns:
-        (red_ratio, center_x, center_y): 红色像素占比 [0,1]、红点中心 x/y（整图坐标）
-        中心点为红色像素质心；若无红色像素则为区域几何中心。
+        (red_ratio, center_x, center_y): 最大红色连通块的面积占比 [0,1]、红点中心 x/y（整图坐标）
+        中心点为该连通块的质心；若无红色像素则为区域几何中心。
     """
     if screenshot_bgr is None or len(screenshot_bgr.shape) < 3:
         return 0.0, (search_left + search_right) // 2, (search_top + search_bottom) // 2
     region = screenshot_bgr[search_top:search_bottom, search_left:search_right]
     if region.size == 0:
         return 0.0, (search_left + search_right) // 2, (search_top + search_bottom) // 2
-    # OpenCV 读图是 BGR：channel0=B, channel1=G, channel2=R，拆开后变量名与通道一致
-    b, g, r = cv2.split(region)
-    # 红点判定（基于 R 通道，抗亮度/缩放/抗锯齿）：R>=180 且 R 明显高于 G、B
-    red_mask = (r >= 180) & (r - g >= 40) & (r - b >= 40)
-    total = region.shape[0] * region.shape[1]
-    red_count = int(np.sum(red_mask))
-    ratio = red_count / total if total else 0.0
-    # 质心（红色像素）
-    ys, xs = np.where(red_mask)
-    if len(xs) > 0 and len(ys) > 0:
-        cx = int(np.mean(xs)) + search_left
-        cy = int(np.mean(ys)) + search_top
-    else:
-        cx = (search_left + search_right) // 2
-        cy = (search_top + search_bottom) // 2
-    return ratio, cx, cy
+    return _red_ratio_from_mask(
+        _red_mask(region), search_left, search_top, search_right, search_bottom, min_ratio
+    )
+
+
+def _red_pixel_ratios_in_regions(
+    screenshot_bgr: np.ndarray,
+    regions: List[Tuple[int, int, int, int]],
+    min_ratio: float = 0.0,
+) -> List[Tuple[float, int, int]]:
+    """
+    批量版 _red_pixel_ratio_in_region：同尺寸的检测区域纵向拼接，一次完成 HSV 转换与红色掩码，
+    红色像素数按区域一次性统计；只有达到 min_ratio 的区域才逐个做连通块分析。
+
+    Args:
+        screenshot_bgr: BGR 截图
+        regions: 检测区域列表 [(left, top, right, bottom), ...]（需已裁剪到截图范围内且非空）
+        min_ratio: 判定阈值，含义同 _red_pixel_ratio_in_region
+
+    Returns:
+        与 regions 一一对应的 (red_ratio, center_x, center_y) 列表
+    """
+    results: List[Tuple[float, int, int]] = [(0.0, 0, 0)] * len(regions)
+    by_shape: Dict[Tuple[int, int], List[int]] = {}
+    for i, (left, top, right, bottom) in enumerate(regions):
+        by_shape.setdefault((bottom - top, right - left), []).append(i)
+    for (h, w), indices in by_shape.items():
+        if len(indices) == 1:
+            i = indices[0]
+            results[i] = _red_pixel_ratio_in_region(screenshot_bgr, *regions[i], min_ratio=min_ratio)
+            continue
+        stacked = np.concatenate(
+            [screenshot_bgr[regions[i][1]:regions[i][3], regions[i][0]:regions[i][2]] for i in indices], axis=0
+        )
+        mask = _red_mask(stacked)
+        counts = np.count_nonzero(mask.reshape(len(indices), h * w), axis=1)
+        for k, i in enumerate(indices):
+            results[i] = _red_ratio_from_mask(
+                mask[k * h:(k + 1) * h], *regions[i], min_ratio, red_pixels=int(counts[k])
+            )
+    return results
 
 
 def get_element_bounds(
@@ -286,6 +394,28 @@ def get_element_bounds(
     return (left, top, width, height)
 
 
+# 最近一帧的整体定位结果：((截图内容摘要, 阈值, 联系人名称, 联系人ID), 结果)。
+# 轮询中 has_new_message / save_chat_state / get_contact_name 等对同一帧各自定位时只匹配一遍；
+# 按像素内容而不是数组对象判断是否同一帧，数组被重新填充或原地绘制后不会命中旧结果
+_last_positions: Tuple[Optional[tuple], Optional[Dict[str, Union[LocateResult, List[LocateResult]]]]] = (None, None)
+_last_positions_lock = threading.Lock()
+
+
+def _frame_digest(image: np.ndarray) -> tuple:
+    """截图内容摘要（形状、类型与 CRC32），用于跨调用的按帧结果缓存；整帧约 1ms，远小于一次完整定位"""
+    return image.shape, image.dtype.str, zlib.crc32(np.ascontiguousarray(image))
+
+
+def _copy_positions(
+    positions: Dict[str, Union[LocateResult, List[LocateResult]]]
+) -> Dict[str, Union[LocateResult, List[LocateResult]]]:
+    """复制定位结果字典：LocateResult 的字段都是不可变值，逐个浅拷贝即与深拷贝等价"""
+    return {
+        name: [copy.copy(r) for r in value] if isinstance(value, list) else copy.copy(value)
+        for name, value in positions.items()
+    }
+
+
 def locate_all_elements(
     screenshot: Optional[np.ndarray] = None,
     threshold: float = 0.7,
@@ -304,8 +434,9 @@ def locate_all_elements(
     Returns:
         元素位置字典 {element_name: LocateResult 或 List[LocateResult]}
         注意：profile_photo_in_chat 返回 List[LocateResult]，其他元素返回 LocateResult
+        对像素完全相同的截图、相同参数重复调用时直接返回上次结果的副本
     """
-    config = WeChatAutomationConfig
+    global _last_positions
     
     # 如果没有提供截图，自动截取
     if screenshot is None:
@@ -316,7 +447,43 @@ def locate_all_elements(
             logger.error(f"获取窗口截图失败: {e}")
             return {}
     
+    cache_key = (_frame_digest(screenshot), threshold, contact_name, contact_id)
+    with _last_positions_lock:
+        cached_key, cached = _last_positions
+        if cached_key == cache_key:
+            logger.debug("同一帧已定位过，复用上次的元素定位结果")
+            return _copy_positions(cached)
+    
+    with frame_scope(screenshot):
+        results = _locate_elements_in_frame(screenshot, threshold, contact_name, contact_id)
+    
+    with _last_positions_lock:
+        _last_positions = (cache_key, _copy_positions(results))
+    return results
+
+
+def _locate_elements_in_frame(
+    screenshot: np.ndarray,
+    threshold: float,
+    contact_name: Optional[str],
+    contact_id: Optional[str],
+) -> Dict[str, Union[LocateResult, List[LocateResult]]]:
+    """locate_all_elements 的实现：在截图的帧作用域内逐个定位元素（不查结果缓存）"""
+    config = WeChatAutomationConfig
+    
+    # 每个元素的模板路径与尺寸在进入循环前查好，循环内只做局部字典访问
+    config_template_paths = config.TEMPLATE_PATHS
+    element_template_paths = {
+        name: config_template_paths.get(TEMPLATE_KEYS[name]) for name in ELEMENT_ORDER if name in TEMPLATE_KEYS
+    }
+    element_sizes = {name: ELEMENT_SIZES.get(name, (30, 30)) for name in ELEMENT_ORDER}
+    
+    # 灰度图只转换一次，所有模板匹配分支共用（裁剪区域直接切灰度图，不再各自转换）
+    screenshot_gray = to_gray(screenshot)
+    
     results = {}
+    # 头像模板路径 -> 本帧中超过阈值的候选点 (xs, ys, confs)（NMS 前），供红点定位复用，避免同一模板重复 matchTemplate
+    avatar_matches_by_template: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
     
     # 按顺序定位每个元素
     for element_name in ELEMENT_ORDER:
@@ -326,16 +493,16 @@ def locate_all_elements(
             if element_name == "search_bar":
                 template_paths = []
                 # 尝试基础模板
-                base_path = config.TEMPLATE_PATHS.get("search_bar")
+                base_path = element_template_paths.get("search_bar")
                 if base_path and base_path.exists():
                     template_paths.append(base_path)
                 # 尝试ing状态模板
-                ing_path = config.TEMPLATE_PATHS.get("search_bar_ing")
+                ing_path = config_template_paths.get("search_bar_ing")
                 if ing_path and ing_path.exists():
                     template_paths.append(ing_path)
                 
                 if template_paths:
-                    result = match_all_templates(screenshot, template_paths, threshold=threshold)
+                    result = match_all_templates(screenshot_gray, template_paths, threshold=threshold)
                 else:
                     logger.debug(f"元素 {element_name} 模板不存在，跳过")
                     results[element_name] = LocateResult(
@@ -348,16 +515,16 @@ def locate_all_elements(
             elif element_name == "send_button":
                 template_paths = []
                 # 尝试基础模板
-                base_path = config.TEMPLATE_PATHS.get("send_button")
+                base_path = element_template_paths.get("send_button")
                 if base_path and base_path.exists():
                     template_paths.append(base_path)
                 # 尝试default状态模板
-                default_path = config.TEMPLATE_PATHS.get("send_button_default")
+                default_path = config_template_paths.get("send_button_default")
                 if default_path and default_path.exists():
                     template_paths.append(default_path)
                 
                 if template_paths:
-                    result = match_all_templates(screenshot, template_paths, threshold=threshold)
+                    result = match_all_templates(screenshot_gray, template_paths, threshold=threshold)
                 else:
                     logger.debug(f"元素 {element_name} 模板不存在，跳过")
                     results[element_name] = LocateResult(
@@ -396,9 +563,9 @@ def locate_all_elements(
                         results["profile_photo_in_chat"] = []
                         continue
                     
-                    # 在整个窗口中搜索所有头像
-                    template = cv2.imread(str(template_path))
-                    if template is None:
+                    # 在整个窗口中搜索所有头像（灰度模板按路径+修改时间缓存）
+                    template_gray = load_template_gray(template_path)
+                    if template_gray is None:
                         logger.warning(f"无法加载头像模板: {template_path}")
                         results["profile_photo_in_list"] = LocateResult(
                             success=False,
@@ -407,68 +574,38 @@ def locate_all_elements(
                         results["profile_photo_in_chat"] = []
                         continue
                     
-                    # 转换为灰度图进行匹配
-                    if len(screenshot.shape) == 3:
-                        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-                    else:
-                        screenshot_gray = screenshot
-                    
-                    if len(template.shape) == 3:
-                        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-                    else:
-                        template_gray = template
-                    
-                    # 模板匹配
-                    match_result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                    
-                    # 找到所有超过阈值的位置
-                    locations = np.where(match_result >= threshold)
+                    # 模板匹配（响应图按帧缓存，红点定位等后续步骤匹配同一模板时直接复用）
+                    match_result = match_response(screenshot, template_path, threshold)
+                    if match_result is None:
+                        logger.warning(f"头像模板尺寸大于截图，跳过定位: {template_path}")
+                        results["profile_photo_in_list"] = LocateResult(
+                            success=False,
+                            error_message=f"头像模板尺寸大于截图"
+                        )
+                        results["profile_photo_in_chat"] = []
+                        continue
                     
-                    # 收集所有匹配点
-                    all_matches = []
-                    for pt in zip(*locations[::-1]):  # Switch x and y coordinates
-                        confidence = float(match_result[pt[1], pt[0]])
-                        # 计算头像中心点
-                        avatar_center_x = pt[0] + template_gray.shape[1] // 2
-                        avatar_center_y = pt[1] + template_gray.shape[0] // 2
-                        
-                        all_matches.append({
-                            'x': avatar_center_x,
-                            'y': avatar_center_y,
-                            'confidence': confidence
-                        })
+                    # 所有超过阈值的位置（头像中心坐标与置信度，保持为 NumPy 数组）
+                    candidates = _avatar_candidates(
+                        match_result, threshold, template_gray.shape[1], template_gray.shape[0],
+                        peak_radius=_AVATAR_NMS_DISTANCE // 2,
+                    )
                     
                     # 去重：使用NMS（非极大值抑制）算法，避免重复检测
-                    # 头像大小是50x50px，所以去重阈值应该至少是头像大小的一半（25px）
-                    # 但考虑到可能的检测误差，使用30px作为阈值
-                    nms_threshold = 30  # 像素距离阈值
-                    
-                    logger.debug(f"初始找到 {len(all_matches)} 个匹配点（阈值={threshold}）")
+                    nms_threshold = _AVATAR_NMS_DISTANCE  # 像素距离阈值
                     
-                    # 按置信度从高到低排序
-                    all_matches.sort(key=lambda m: m['confidence'], reverse=True)
+                    logger.debug(f"初始找到 {len(candidates[0])} 个匹配点（阈值={threshold}）")
+                    avatar_matches_by_template[str(template_path)] = candidates
                     
-                    unique_matches = []
-                    for match in all_matches:
-                        is_duplicate = False
-                        for existing in unique_matches:
-                            distance = ((match['x'] - existing['x'])**2 + (match['y'] - existing['y'])**2)**0.5
-                            if distance < nms_threshold:
-                                is_duplicate = True
-                                # 如果新匹配的置信度更高，替换旧的
-                                if match['confidence'] > existing['confidence']:
-                                    unique_matches.remove(existing)
-                                    unique_matches.append(match)
-                                    logger.debug(f"  替换重复头像: 旧({existing['x']}, {existing['y']}) -> 新({match['x']}, {match['y']}), 距离={distance:.1f}px")
-                                else:
-                                    logger.debug(f"  跳过重复头像: ({match['x']}, {match['y']}), 距离已有头像({existing['x']}, {existing['y']})={distance:.1f}px")
-                                break
-                        if not is_duplicate:
-                            unique_matches.append(match)
+                    # 按置信度从高到低贪心保留，与已保留头像距离小于阈值的视为重复；只为保留下来的点构造字典
+                    unique_matches = _nms_avatar_candidates(*candidates, nms_threshold=nms_threshold)
                     
-                    logger.debug(f"去重后找到 {len(unique_matches)} 个唯一头像（NMS阈值={nms_threshold}px）")
-                    for i, match in enumerate(unique_matches):
-                        logger.debug(f"  唯一头像{i+1}: ({match['x']}, {match['y']}), 置信度={match['confidence']:.3f}")
+                    # 逐个头像的调试输出仅在 DEBUG 开启时生成（下同）
+                    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                    logger.debug("去重后找到 %d 个唯一头像（NMS阈值=%dpx）", len(unique_matches), nms_threshold)
+                    if debug_enabled:
+                        for i, match in enumerate(unique_matches):
+                            logger.debug("  唯一头像%d: (%d, %d), 置信度=%.3f", i + 1, match['x'], match['y'], match['confidence'])
                     
                     # 获取search_bar位置与列表区域边界（左界=search_bar_x - 宽度*0.6，右界=search_bar_x）
                     search_bar_result = results.get("search_bar")
@@ -479,7 +616,7 @@ def locate_all_elements(
                     if search_bar_result and search_bar_result.success:
                         search_bar_x = search_bar_result.x
                         search_bar_y = search_bar_result.y
-                        sb_size = get_element_size("search_bar")
+                        sb_size = element_sizes["search_bar"]
                         sb_w = sb_size[0] if sb_size else 180
                         list_left_x = max(0, int((search_bar_x or 0) - sb_w * 0.6))
                         list_right_x = int(search_bar_x or 0)
@@ -509,16 +646,9 @@ def locate_all_elements(
                             list_left_x=list_left_x,
                         )
                     
-                    # 转换为LocateResult（支持包内/独立目录两种运行方式）
-                    try:
-                        from .models import LocateMethod
-                    except ImportError:
-                        from models import LocateMethod
-                    
                     # profile_photo_in_list: 只取第一个（如果有多个，取置信度最高的）
                     if list_matches:
-                        list_matches.sort(key=lambda m: m['confidence'], reverse=True)
-                        best_list_match = list_matches[0]
+                        best_list_match = max(list_matches, key=lambda m: m['confidence'])
                         list_result = LocateResult(
                             success=True,
                             x=best_list_match['x'],
@@ -535,51 +665,39 @@ def locate_all_elements(
                         )
                     
                     # profile_photo_in_chat: 返回所有聊天中的头像
-                    logger.debug(f"分类结果: 列表头像={len(list_matches)}个, 聊天头像={len(chat_matches)}个")
-                    if list_matches:
-                        logger.debug(f"  列表头像位置: {[(m['x'], m['y']) for m in list_matches]}")
-                    if chat_matches:
-                        logger.debug(f"  聊天头像位置: {[(m['x'], m['y']) for m in chat_matches]}")
+                    logger.debug("分类结果: 列表头像=%d个, 聊天头像=%d个", len(list_matches), len(chat_matches))
+                    if debug_enabled and list_matches:
+                        logger.debug("  列表头像位置: %s", [(m['x'], m['y']) for m in list_matches])
+                    if debug_enabled and chat_matches:
+                        logger.debug("  聊天头像位置: %s", [(m['x'], m['y']) for m in chat_matches])
                     
                     chat_result_list = []
-                    # 按x坐标分组（同一竖线范围内的头像）
-                    chat_matches.sort(key=lambda m: m['x'])
-                    x_groups = []
-                    current_group = []
-                    current_x = None
-                    
-                    for match in chat_matches:
-                        if current_x is None or abs(match['x'] - current_x) < 10:
-                            current_group.append(match)
-                            current_x = match['x']
-                        else:
-                            if current_group:
-                                x_groups.append(current_group)
-                            current_group = [match]
-                            current_x = match['x']
-                    if current_group:
-                        x_groups.append(current_group)
+                    # 按x坐标分组（同一竖线范围内的头像：按x排序后相邻差<10归为同组），组内按y从上到下
+                    chat_xs = np.array([m['x'] for m in chat_matches], dtype=np.int64)
+                    chat_ys = np.array([m['y'] for m in chat_matches], dtype=np.int64)
+                    by_x = np.argsort(chat_xs, kind="stable")
+                    group_ids = np.cumsum(np.diff(chat_xs[by_x], prepend=chat_xs[by_x[:1]]) >= 10)
+                    # lexsort 稳定：先按组、再按y，同y保持x顺序
+                    order = by_x[np.lexsort((chat_ys[by_x], group_ids))]
                     
-                    logger.debug(f"聊天头像按x坐标分组: {len(x_groups)}个组")
-                    for i, group in enumerate(x_groups):
-                        logger.debug(f"  组{i+1}: {len(group)}个头像, x坐标={group[0]['x']}")
-                    
-                    # 对每个组内的头像按y坐标排序（从上到下）
-                    for group in x_groups:
-                        group.sort(key=lambda m: m['y'])
+                    if debug_enabled:
+                        _, group_starts, group_sizes = np.unique(group_ids, return_index=True, return_counts=True)
+                        logger.debug("聊天头像按x坐标分组: %d个组", len(group_starts))
+                        for i, (start, size) in enumerate(zip(group_starts, group_sizes)):
+                            logger.debug("  组%d: %d个头像, x坐标=%d", i + 1, size, chat_xs[by_x[start]])
                     
                     # 转换为LocateResult列表
-                    for group in x_groups:
-                        for match in group:
-                            chat_result_list.append(LocateResult(
-                                success=True,
-                                x=match['x'],
-                                y=match['y'],
-                                confidence=match['confidence'],
-                                method=LocateMethod.TEMPLATE_MATCH,
-                                region=None,
-                                error_message=None
-                            ))
+                    for k in order:
+                        match = chat_matches[k]
+                        chat_result_list.append(LocateResult(
+                            success=True,
+                            x=match['x'],
+                            y=match['y'],
+                            confidence=match['confidence'],
+                            method=LocateMethod.TEMPLATE_MATCH,
+                            region=None,
+                            error_message=None
+                        ))
                     
                     results["profile_photo_in_list"] = list_result
                     results["profile_photo_in_chat"] = chat_result_list
@@ -589,9 +707,10 @@ def locate_all_elements(
                     else:
                         logger.debug(f"✗ 未定位到列表头像")
                     
-                    logger.debug(f"✓ 最终返回 {len(chat_result_list)} 个聊天区域头像")
-                    for i, result in enumerate(chat_result_list):
-                        logger.debug(f"  聊天头像{i+1}: ({result.x}, {result.y}), 置信度={result.confidence:.3f}")
+                    logger.debug("✓ 最终返回 %d 个聊天区域头像", len(chat_result_list))
+                    if debug_enabled:
+                        for i, result in enumerate(chat_result_list):
+                            logger.debug("  聊天头像%d: (%d, %d), 置信度=%.3f", i + 1, result.x, result.y, result.confidence)
                     continue
             
             # 特殊处理：new_message_red_point - 先定位联系人头像，在每块检测区域内用红色像素面积占比判定
@@ -599,16 +718,14 @@ def locate_all_elements(
                 # 步骤1: 定位所有联系人列表中的头像
                 logger.debug(f"[红点定位] 步骤1: 定位联系人列表中的所有头像...")
                 try:
-                    try:
-                        from .contact_mapper import ContactUserMapper
-                    except ImportError:
-                        from contact_mapper import ContactUserMapper
                     contact_mapper = ContactUserMapper()
+                    # 头像模板已在 profile_photo_in_list 中匹配过的联系人直接复用匹配点
                     contact_avatars = locate_all_contact_avatars_in_list(
                         screenshot=screenshot,
                         threshold=threshold,
                         contact_mapper=contact_mapper,
                         enabled_contacts_only=True,
+                        precomputed_matches=avatar_matches_by_template,
                     )
                 except Exception as e:
                     logger.error(f"[红点定位] 定位联系人头像失败: {e}")
@@ -628,31 +745,24 @@ def locate_all_elements(
                 
                 logger.debug(f"[红点定位] 找到 {len(contact_avatars)} 个联系人头像")
                 
-                avatar_size = get_element_size("profile_photo_in_list")
+                avatar_size = element_sizes["profile_photo_in_list"]
                 avatar_radius = (avatar_size[0] if avatar_size else 50) // 2
-                search_radius = 10
                 red_area_ratio_threshold = getattr(config, "RED_POINT_AREA_RATIO_THRESHOLD", 0.7)
-                h_img, w_img = screenshot.shape[:2]
                 
                 all_matches = []
                 best_ratio = 0.0
                 
-                for contact_result in contact_avatars:
-                    avatar_x = contact_result.locate_result.x or 0
-                    avatar_y = contact_result.locate_result.y or 0
-                    contact_name = contact_result.contact_name
-                    top_right_x = avatar_x + avatar_radius
-                    top_right_y = avatar_y - avatar_radius
-                    search_left = max(0, int(top_right_x - search_radius))
-                    search_right = min(w_img, int(top_right_x + search_radius))
-                    search_top = max(0, int(top_right_y - search_radius))
-                    search_bottom = min(h_img, int(top_right_y + search_radius))
-                    if search_right <= search_left or search_bottom <= search_top:
-                        continue
-                    
-                    ratio, cx, cy = _red_pixel_ratio_in_region(
-                        screenshot, search_left, search_top, search_right, search_bottom
-                    )
+                # 各头像右上角的检测区域一次性算出，整批计算红色占比
+                avatars = ContactAvatarArray.from_results(contact_avatars)
+                scanned, boxes = _red_point_search_boxes(avatars, avatar_radius, screenshot.shape)
+                red_ratios = _red_pixel_ratios_in_regions(
+                    screenshot, [tuple(box) for box in boxes.tolist()], min_ratio=red_area_ratio_threshold
+                )
+                
+                for i, (ratio, cx, cy) in zip(scanned.tolist(), red_ratios):
+                    avatar_x = int(avatars.xs[i])
+                    avatar_y = int(avatars.ys[i])
+                    contact_name = avatars.names[i]
                     if ratio > best_ratio:
                         best_ratio = ratio
                     if ratio >= red_area_ratio_threshold:
@@ -664,9 +774,15 @@ def locate_all_elements(
                             'avatar_x': avatar_x,
                             'avatar_y': avatar_y,
                         })
-                        logger.debug(f"[红点定位] 联系人 {contact_name} 检测区域内红色占比={ratio:.2%} >= {red_area_ratio_threshold:.0%}, 判定有红点: ({cx}, {cy})")
+                        logger.debug(
+                            "[红点定位] 联系人 %s 检测区域内红色占比=%.2f%% >= %.0f%%, 判定有红点: (%d, %d)",
+                            contact_name, ratio * 100, red_area_ratio_threshold * 100, cx, cy,
+                        )
                     else:
-                        logger.debug(f"[红点定位] 联系人 {contact_name} 红色占比={ratio:.2%} < {red_area_ratio_threshold:.0%}")
+                        logger.debug(
+                            "[红点定位] 联系人 %s 红色占比=%.2f%% < %.0f%%",
+                            contact_name, ratio * 100, red_area_ratio_threshold * 100,
+                        )
                 
                 if len(all_matches) == 0:
                     logger.debug(f"[红点定位] ✗ 未定位到红点（检查了 {len(contact_avatars)} 个头像），最高红色占比={best_ratio:.2%}")
@@ -677,22 +793,16 @@ def locate_all_elements(
                     )
                     continue
                 
-                if len(all_matches) > 1:
-                    all_matches.sort(key=lambda m: m['confidence'], reverse=True)
-                selected_match = all_matches[0]
+                selected_match = max(all_matches, key=lambda m: m['confidence'])
                 logger.debug(f"[红点定位] 找到 {len(all_matches)} 个红点，取最高占比: 联系人={selected_match['contact_name']}, 位置=({selected_match['x']}, {selected_match['y']}), 占比={selected_match['confidence']:.2%}")
                 
-                try:
-                    from .models import LocateMethod as _LM
-                except ImportError:
-                    from models import LocateMethod as _LM
-                rw, rh = get_element_size("new_message_red_point") or (15, 15)
+                rw, rh = element_sizes["new_message_red_point"] or (15, 15)
                 result = LocateResult(
                     success=True,
                     x=selected_match['x'],
                     y=selected_match['y'],
                     confidence=selected_match['confidence'],
-                    method=_LM.TEMPLATE_MATCH,
+                    method=LocateMethod.TEMPLATE_MATCH,
                     region=(selected_match['x'] - rw // 2, selected_match['y'] - rh // 2, rw, rh),
                     error_message=None
                 )
@@ -704,14 +814,14 @@ def locate_all_elements(
             elif element_name == "pin_icon":
                 template_key = TEMPLATE_KEYS.get(element_name)
                 if template_key:
-                    template_path = config.TEMPLATE_PATHS.get(template_key)
+                    template_path = element_template_paths.get(element_name)
                     if template_path and template_path.exists():
                         # 限制搜索区域为上半部分20%
                         h, w = screenshot.shape[:2]
                         search_height = int(h * 0.2)  # 上半部分20%
                         
                         # 裁剪搜索区域
-                        search_image = screenshot[0:search_height, 0:w]
+                        search_image = screenshot_gray[0:search_height, 0:w]
                         
                         # 在限制区域内搜索
                         result = match_all_templates(
@@ -775,9 +885,9 @@ def locate_all_elements(
                 # 普通元素定位
                 template_key = TEMPLATE_KEYS.get(element_name)
                 if template_key:
-                    template_path = config.TEMPLATE_PATHS.get(template_key)
+                    template_path = element_template_paths.get(element_name)
                     if template_path and template_path.exists():
-                        result = match_all_templates(screenshot, [template_path], threshold=threshold)
+                        result = match_all_templates(screenshot_gray, [template_path], threshold=threshold)
                     else:
                         logger.debug(f"元素 {element_name} 模板不存在，跳过")
                         results[element_name] = LocateResult(
@@ -812,29 +922,79 @@ def locate_all_elements(
     return results
 
 
-def _nms_avatar_matches(
-    matches: List[Dict],
-    nms_threshold: int = 30
-) -> List[Dict]:
+# 头像去重距离（像素）：头像大小是50x50px，去重阈值应该至少是头像大小的一半（25px），
+# 考虑到可能的检测误差，使用30px作为阈值
+_AVATAR_NMS_DISTANCE = 30
+
+
+def _avatar_candidates(
+    match_result: np.ndarray,
+    threshold: float,
+    template_w: int,
+    template_h: int,
+    peak_radius: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    取响应图中超过阈值的位置，换算为头像中心坐标。
+    返回 (xs, ys, confs) 三个等长数组，顺序与逐行扫描响应图一致。
+    
+    peak_radius > 0 时只保留局部极大值（在 (2*peak_radius+1) 见方邻域内最高的点）：
+    一个头像的响应峰会铺开成一片超过阈值的像素，先在响应图上做膨胀取峰，NMS 只需处理各峰本身。
     """
-    对同一联系人的头像匹配结果做 NMS 去重（仅在同一联系人内部去重）。
-    每个 match 需包含 'x', 'y', 'confidence'，可选 'contact_name', 'contact_id'。
+    rows, cols = np.nonzero(match_result >= threshold)
+    if peak_radius > 0 and len(rows) > 1:
+        # 只在候选点外接矩形（外扩 peak_radius，保证邻域完整）内做膨胀
+        y0 = max(int(rows.min()) - peak_radius, 0)
+        x0 = max(int(cols.min()) - peak_radius, 0)
+        window = match_result[y0:int(rows.max()) + peak_radius + 1, x0:int(cols.max()) + peak_radius + 1]
+        kernel = np.ones((2 * peak_radius + 1, 2 * peak_radius + 1), dtype=np.uint8)
+        local_max = cv2.dilate(window, kernel)
+        is_peak = window[rows - y0, cols - x0] >= local_max[rows - y0, cols - x0]
+        rows, cols = rows[is_peak], cols[is_peak]
+    return cols + template_w // 2, rows + template_h // 2, match_result[rows, cols].astype(np.float64)
+
+
+def _nms_avatar_points(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    confs: np.ndarray,
+    nms_threshold: int = _AVATAR_NMS_DISTANCE
+) -> List[int]:
     """
-    if not matches:
+    头像候选点 NMS：按置信度从高到低贪心保留，每保留一个，用 NumPy 一次性抑制其阈值距离内的其余点。
+    返回保留点的下标（按置信度从高到低）。
+    """
+    if len(xs) == 0:
         return []
-    sorted_matches = sorted(matches, key=lambda m: m.get("confidence", 0.0), reverse=True)
-    unique: List[Dict] = []
-    for match in sorted_matches:
-        is_dup = False
-        for existing in unique:
-            dx = match["x"] - existing["x"]
-            dy = match["y"] - existing["y"]
-            if (dx * dx + dy * dy) ** 0.5 < nms_threshold:
-                is_dup = True
-                break
-        if not is_dup:
-            unique.append(match)
-    return unique
+    order = np.argsort(-np.asarray(confs, dtype=np.float64), kind="stable")
+    pts = np.column_stack((xs, ys)).astype(np.float64)[order]
+    thr2 = float(nms_threshold) * float(nms_threshold)
+    suppressed = np.zeros(len(pts), dtype=bool)
+    keep: List[int] = []
+    for k in range(len(pts)):
+        if suppressed[k]:
+            continue
+        keep.append(int(order[k]))
+        d2 = ((pts - pts[k]) ** 2).sum(axis=1)
+        suppressed |= d2 < thr2
+    return keep
+
+
+def _nms_avatar_candidates(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    confs: np.ndarray,
+    nms_threshold: int = _AVATAR_NMS_DISTANCE,
+    **fields,
+) -> List[Dict]:
+    """
+    对同一联系人的头像候选点做 NMS 去重（仅在同一联系人内部去重），
+    只为保留下来的点构造匹配字典 {'x', 'y', 'confidence', **fields}（fields 如 contact_name、contact_id）。
+    """
+    return [
+        {'x': int(xs[k]), 'y': int(ys[k]), 'confidence': float(confs[k]), **fields}
+        for k in _nms_avatar_points(xs, ys, confs, nms_threshold)
+    ]
 
 
 def _classify_avatar_matches(
@@ -881,70 +1041,133 @@ def _classify_avatar_matches(
             else:
                 chat_matches.append(m)
         return list_matches, chat_matches
-    # 两个及以上：先按 X 分组（10px 容差）
+    # 两个及以上：先按 X 分组（10px 容差），分组与区域筛选都在坐标数组上完成
     x_threshold = 10
-    by_x: Dict[float, List[Dict]] = {}
-    for m in matches:
-        x = m["x"]
-        key = round(x / x_threshold) * x_threshold
-        if key not in by_x:
-            by_x[key] = []
-        by_x[key].append(m)
-    x_keys_sorted = sorted(by_x.keys())
-    n_x = len(x_keys_sorted)
-    if n_x >= 2:
-        # 最左列=列表，其余列=聊天
-        left_x_key = x_keys_sorted[0]
-        for m in matches:
-            key = round(m["x"] / x_threshold) * x_threshold
-            if key == left_x_key:
-                list_matches.append(m)
-            else:
-                chat_matches.append(m)
+    xs = np.fromiter((m["x"] for m in matches), dtype=np.float64, count=len(matches))
+    ys = np.fromiter((m["y"] for m in matches), dtype=np.float64, count=len(matches))
+    x_keys = np.round(xs / x_threshold) * x_threshold
+    if x_keys.min() != x_keys.max():
+        # 两个及以上 X 列：最左列=列表，其余列=聊天
+        is_list = x_keys == x_keys.min()
     else:
-        # n_x == 1：同 X 上有不同 y，说明是聊天中的
-        chat_matches.extend(matches)
+        # 只有一个 X 列：同 X 上有不同 y，说明是聊天中的
+        is_list = np.zeros(len(matches), dtype=bool)
+    chat_matches = [matches[i] for i in np.flatnonzero(~is_list)]
     # 列表区域已确定时：判为「列表中」的必须落在 [list_left_x, list_right_x) 且 y > search_bar_y，否则判不符合、不计入列表
-    if list_left is not None and list_right is not None and search_bar_y is not None and list_matches:
-        in_region: List[Dict] = []
-        for m in list_matches:
-            if m["x"] >= list_left and m["x"] < list_right and m["y"] > search_bar_y:
-                in_region.append(m)
-            # 不在列表区：不回退为 chat，直接丢弃（区域只能做减法）
-        list_matches = in_region
+    # 不在列表区：不回退为 chat，直接丢弃（区域只能做减法）
+    if list_left is not None and list_right is not None and search_bar_y is not None:
+        is_list &= (xs >= list_left) & (xs < list_right) & (ys > search_bar_y)
+    list_matches = [matches[i] for i in np.flatnonzero(is_list)]
     return list_matches, chat_matches
 
 
-def locate_all_contact_avatars_in_list(
-    screenshot: Optional[np.ndarray] = None,
-    threshold: float = 0.7,
-    contact_mapper: Optional[ContactUserMapper] = None,
-    enabled_contacts_only: bool = True,
-    exclude_contacts: Optional[List[str]] = None,
-) -> List[ContactLocateResult]:
+def _locate_search_bar(screenshot: np.ndarray, threshold: float) -> Optional[LocateResult]:
     """
-    一次性定位联系人列表中所有配置联系人的头像位置
+    定位搜索框（search_bar / search_bar_ing 两种状态取最佳）
     
-    功能：
-    - 获取所有配置的联系人（或仅启用的联系人）
-    - 使用每个联系人的头像模板进行匹配
-    - 将所有匹配结果标记对应的联系人
-    - 只返回列表区域的头像（排除聊天区域）
+    列表/聊天头像定位在同一帧上各需一次；在 frame_scope 内对同一截图、同一阈值重复调用时直接复用结果。
+    
+    Returns:
+        定位结果；模板都不存在或匹配出错时返回 None
+    """
+    cache = frame_cache(screenshot)
+    cache_key = ("search_bar", threshold)
+    if cache is not None and cache_key in cache:
+        return cache[cache_key]
+    config = WeChatAutomationConfig
+    search_bar_result = None
+    try:
+        search_bar_template_paths = []
+        base_path = config.TEMPLATE_PATHS.get("search_bar")
+        if base_path and base_path.exists():
+            search_bar_template_paths.append(base_path)
+        ing_path = config.TEMPLATE_PATHS.get("search_bar_ing")
+        if ing_path and ing_path.exists():
+            search_bar_template_paths.append(ing_path)
+        
+        if search_bar_template_paths:
+            # 搜索框模板较大且只需最佳一处：半分辨率粗搜后仅在候选附近做全分辨率匹配
+            search_bar_result = match_all_templates(
+                screenshot, search_bar_template_paths, threshold=threshold, coarse_to_fine=True
+            )
+            if search_bar_result.success:
+                logger.debug(f"搜索框位置: ({search_bar_result.x}, {search_bar_result.y})")
+    except Exception as e:
+        logger.debug(f"定位搜索框失败: {e}")
+    if cache is not None:
+        cache[cache_key] = search_bar_result
+    return search_bar_result
+
+
+# 联系人头像模板匹配的线程池（按需创建，进程内复用）
+_match_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_match_pool() -> ThreadPoolExecutor:
+    """获取头像模板匹配线程池（全局单例）"""
+    global _match_pool
+    if _match_pool is None:
+        _match_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="wechat-match")
+    return _match_pool
+
+
+def _match_avatar_jobs(
+    screenshot: np.ndarray,
+    jobs: List[Tuple[Path, int, int, Optional[Tuple[int, int, int, int]]]],
+    threshold: float,
+) -> List[Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    计算多个头像模板的候选点；多于一个模板时分发到线程池（OpenCV 匹配期间释放 GIL，各模板可在多核上同时匹配）
     
     Args:
-        screenshot: 窗口截图（BGR格式），如果为None则自动截取
-        threshold: 模板匹配阈值（0.0-1.0）
-        contact_mapper: 联系人映射器实例，如果为None则创建新实例
-        enabled_contacts_only: 是否只定位启用的联系人，如果为False则定位所有配置的联系人
+        screenshot: 窗口截图（BGR，匹配期间只读，各线程共享）
+        jobs: 匹配任务列表 [(模板路径, 模板宽, 模板高, 匹配区域 roi 或 None), ...]
+        threshold: 模板匹配阈值
     
     Returns:
-        联系人头像定位结果列表 List[ContactLocateResult]，每个结果包含：
-        - locate_result: LocateResult（定位结果）
-        - contact_name: 联系人名称
-        - contact_id: 联系人ID（可选）
+        与 jobs 一一对应的候选点 (xs, ys, confs)（头像中心的整图坐标）；模板无法匹配时为 None
     """
-    config = WeChatAutomationConfig
+    def _match_one(job):
+        template_path, template_w, template_h, roi = job
+        match_result = match_response(screenshot, template_path, threshold, roi=roi)
+        if match_result is None:
+            return None
+        xs, ys, confs = _avatar_candidates(
+            match_result, threshold, template_w, template_h, peak_radius=_AVATAR_NMS_DISTANCE // 2
+        )
+        if roi is not None:
+            xs, ys = xs + roi[0], ys + roi[1]
+        return xs, ys, confs
+    
+    if len(jobs) <= 1:
+        return [_match_one(job) for job in jobs]
+    return list(_get_match_pool().map(_match_one, jobs))
+
+
+# 最近一次列表头像定位：(条件键, 列表条带像素, 结果)。轮询时列表条带逐像素不变则直接复用结果
+_last_list_avatars: Optional[Tuple[tuple, np.ndarray, List[ContactLocateResult]]] = None
+_last_list_avatars_lock = threading.Lock()
+
+
+def _locate_all_contact_avatars(
+    screenshot: Optional[np.ndarray],
+    threshold: float,
+    contact_mapper: Optional[ContactUserMapper],
+    enabled_contacts_only: bool,
+    exclude_contacts: Optional[List[str]],
+    precomputed_matches: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]],
+    want_list: bool,
+    want_chat: bool,
+) -> Tuple[List[ContactLocateResult], List[ContactLocateResult]]:
+    """
+    列表/聊天区域联系人头像定位的共用流程：每个联系人模板只匹配一次，NMS 去重后按位置分为列表、聊天两组
+    
+    只要列表（want_chat=False）且搜索框已定位时，只在列表条带内匹配，并复用列表条带未变化时的上次结果；
+    需要聊天区域时整图匹配。
     
+    Returns:
+        (列表区域结果, 聊天区域结果)；未请求的一组为空列表
+    """
     # 如果没有提供截图，自动截取
     if screenshot is None:
         try:
@@ -952,7 +1175,29 @@ def locate_all_contact_avatars_in_list(
             screenshot = capture_window(hwnd)
         except Exception as e:
             logger.error(f"获取窗口截图失败: {e}")
-            return []
+            return [], []
+    
+    with frame_scope(screenshot):
+        return _locate_contact_avatars_in_frame(
+            screenshot, threshold, contact_mapper, enabled_contacts_only,
+            exclude_contacts, precomputed_matches, want_list, want_chat,
+        )
+
+
+def _locate_contact_avatars_in_frame(
+    screenshot: np.ndarray,
+    threshold: float,
+    contact_mapper: Optional[ContactUserMapper],
+    enabled_contacts_only: bool,
+    exclude_contacts: Optional[List[str]],
+    precomputed_matches: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]],
+    want_list: bool,
+    want_chat: bool,
+) -> Tuple[List[ContactLocateResult], List[ContactLocateResult]]:
+    """_locate_all_contact_avatars 的实现（在截图的帧作用域内执行）"""
+    global _last_list_avatars
+    config = WeChatAutomationConfig
+    list_only = want_list and not want_chat
     
     # 如果没有提供联系人映射器，创建新实例
     if contact_mapper is None:
@@ -981,31 +1226,13 @@ def locate_all_contact_avatars_in_list(
     
     if not contacts:
         logger.warning("没有找到配置的联系人")
-        return []
+        return [], []
     
-    # 转换为灰度图
-    if len(screenshot.shape) == 3:
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-    else:
-        screenshot_gray = screenshot
+    # 转换为灰度图（与搜索框模板匹配共用）
+    screenshot_gray = to_gray(screenshot)
     
-    # 先定位搜索框位置（用于判断头像是否在列表中）
-    search_bar_result = None
-    try:
-        search_bar_template_paths = []
-        base_path = config.TEMPLATE_PATHS.get("search_bar")
-        if base_path and base_path.exists():
-            search_bar_template_paths.append(base_path)
-        ing_path = config.TEMPLATE_PATHS.get("search_bar_ing")
-        if ing_path and ing_path.exists():
-            search_bar_template_paths.append(ing_path)
-        
-        if search_bar_template_paths:
-            search_bar_result = match_all_templates(screenshot, search_bar_template_paths, threshold=threshold)
-            if search_bar_result.success:
-                logger.debug(f"搜索框位置: ({search_bar_result.x}, {search_bar_result.y})")
-    except Exception as e:
-        logger.debug(f"定位搜索框失败: {e}")
+    # 先定位搜索框位置（用于判断头像在列表中还是聊天区域；同一帧内复用）
+    search_bar_result = _locate_search_bar(screenshot, threshold)
     
     search_bar_x = search_bar_result.x if search_bar_result and search_bar_result.success else None
     search_bar_y = search_bar_result.y if search_bar_result and search_bar_result.success else None
@@ -1017,11 +1244,32 @@ def locate_all_contact_avatars_in_list(
         sb_w = sb_size[0] if sb_size else 180
         list_left_x = max(0, int(search_bar_x - sb_w * 0.6))
         list_right_x = int(search_bar_x)
+    # 只要列表且列表区域已确定时，只在列表条带内匹配
+    use_strip = list_only and list_left_x is not None and list_right_x is not None and search_bar_y is not None
+    
+    # 列表条带（含头像向右伸出的部分）与上次逐像素相同且条件不变时，头像位置必然相同，跳过全部模板匹配
+    cache_key = None
+    list_strip = None
+    if use_strip:
+        list_strip = screenshot[:, :min(screenshot.shape[1], list_right_x + sb_w // 2)]
+        cache_key = (
+            tuple(contacts),
+            tuple(contact_mapper.get_contact_id(c) for c in contacts),
+            threshold,
+            search_bar_x,
+            search_bar_y,
+        )
+        with _last_list_avatars_lock:
+            last = _last_list_avatars
+        if last is not None and last[0] == cache_key and np.array_equal(last[1], list_strip):
+            logger.debug("列表条带未变化，复用上次的 %d 个联系人头像定位结果", len(last[2]))
+            return copy.deepcopy(last[2]), []
     
-    # 存储所有匹配结果：{contact_name: List[匹配结果]}
-    all_contact_matches: Dict[str, List[Dict]] = {}
+    # 存储所有候选点：{contact_name: ((xs, ys, confs), contact_id, 是否仅在列表条带内匹配)}
+    all_contact_matches: Dict[str, Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], Optional[str], bool]] = {}
     
-    # 为每个联系人匹配头像
+    # 逐联系人确定模板与匹配区域：(联系人, ID, 复用的候选点, 匹配任务)，需要计算的匹配随后一起并行执行
+    pending: List[Tuple[str, Optional[str], Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]], Optional[tuple]]] = []
     for contact_name in contacts:
         contact_id = contact_mapper.get_contact_id(contact_name)
         
@@ -1032,20 +1280,20 @@ def locate_all_contact_avatars_in_list(
         )
         
         if not template_path or not template_path.exists():
-            logger.debug(f"联系人 '{contact_name}' 的头像模板不存在: {template_path}，跳过")
+            logger.debug("联系人 '%s' 的头像模板不存在: %s，跳过", contact_name, template_path)
             continue
         
-        # 加载模板
-        template = cv2.imread(str(template_path))
-        if template is None:
-            logger.warning(f"无法加载联系人 '{contact_name}' 的头像模板: {template_path}")
+        # 同一模板本帧已匹配过：直接复用候选点
+        if precomputed_matches and str(template_path) in precomputed_matches:
+            logger.debug("联系人 '%s' 复用已有的头像匹配结果", contact_name)
+            pending.append((contact_name, contact_id, precomputed_matches[str(template_path)], None))
             continue
         
-        # 转换为灰度图
-        if len(template.shape) == 3:
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-        else:
-            template_gray = template
+        # 加载灰度模板（缓存）
+        template_gray = load_template_gray(template_path)
+        if template_gray is None:
+            logger.warning(f"无法加载联系人 '{contact_name}' 的头像模板: {template_path}")
+            continue
         
         # 检查模板尺寸是否小于等于截图尺寸（OpenCV要求）
         template_h, template_w = template_gray.shape[:2]
@@ -1058,61 +1306,40 @@ def locate_all_contact_avatars_in_list(
             )
             continue
         
-        # 模板匹配
-        match_result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        
-        # 找到所有超过阈值的位置
-        locations = np.where(match_result >= threshold)
-        
-        # 收集所有匹配点
-        matches = []
-        for pt in zip(*locations[::-1]):  # Switch x and y coordinates
-            confidence = float(match_result[pt[1], pt[0]])
-            # 计算头像中心点
-            avatar_center_x = pt[0] + template_gray.shape[1] // 2
-            avatar_center_y = pt[1] + template_gray.shape[0] // 2
-            
-            matches.append({
-                'x': avatar_center_x,
-                'y': avatar_center_y,
-                'confidence': confidence,
-                'contact_name': contact_name,
-                'contact_id': contact_id
-            })
-        
-        if matches:
-            logger.debug(f"联系人 '{contact_name}' 找到 {len(matches)} 个匹配点")
-            all_contact_matches[contact_name] = matches
+        # 列表条带：判为列表的头像中心必须落在 [list_left_x, list_right_x) 且低于搜索框；否则整图匹配。响应图按帧缓存
+        roi = None
+        if use_strip:
+            roi = (
+                max(0, list_left_x - template_w // 2),
+                max(0, int(search_bar_y) - template_h // 2),
+                min(screenshot_w, list_right_x - template_w // 2 + template_w),
+                screenshot_h,
+            )
+        pending.append((contact_name, contact_id, None, (template_path, template_w, template_h, roi)))
+    
+    matched = iter(_match_avatar_jobs(screenshot, [job for *_, job in pending if job is not None], threshold))
+    for contact_name, contact_id, candidates, job in pending:
+        if job is not None:
+            candidates = next(matched)
+            if candidates is None:
+                continue
+        if len(candidates[0]):
+            logger.debug("联系人 '%s' 找到 %d 个匹配点", contact_name, len(candidates[0]))
+            all_contact_matches[contact_name] = (candidates, contact_id, job is not None and job[3] is not None)
         else:
-            logger.debug(f"联系人 '{contact_name}' 未找到匹配的头像")
+            logger.debug("联系人 '%s' 未找到匹配的头像", contact_name)
     
     if not all_contact_matches:
         logger.warning("所有联系人都未找到匹配的头像")
-        return []
-    
-    # 按联系人单独：NMS 去重 + 列表/聊天分类（判为列表的必须落在列表区域内），再汇总列表区域结果
-    try:
-        from .models import LocateMethod
-    except ImportError:
-        from models import LocateMethod
-    
-    nms_threshold = 30
-    result_list: List[ContactLocateResult] = []
-    for contact_name, matches in all_contact_matches.items():
-        unique_c = _nms_avatar_matches(matches, nms_threshold=nms_threshold)
-        list_c, chat_c = _classify_avatar_matches(
-            unique_c,
-            search_bar_x=search_bar_x,
-            search_bar_y=search_bar_y,
-            default_to_list=True,
-            list_right_x=list_right_x,
-            list_left_x=list_left_x,
-        )
-        logger.debug(
-            f"联系人 '{contact_name}' 单独统计: 列表头像={len(list_c)} 个, 聊天头像={len(chat_c)} 个"
-        )
-        for match in list_c:
-            locate_result = LocateResult(
+        if cache_key is not None:
+            with _last_list_avatars_lock:
+                _last_list_avatars = (cache_key, list_strip.copy(), [])
+        return [], []
+    
+    # 按联系人单独：NMS 去重 + 列表/聊天分类（判为列表的必须落在列表区域内），再分别汇总
+    def _to_result(match: Dict) -> ContactLocateResult:
+        return ContactLocateResult(
+            locate_result=LocateResult(
                 success=True,
                 x=match["x"],
                 y=match["y"],
@@ -1120,243 +1347,171 @@ def locate_all_contact_avatars_in_list(
                 method=LocateMethod.TEMPLATE_MATCH,
                 region=None,
                 error_message=None
+            ),
+            contact_name=match["contact_name"],
+            contact_id=match.get("contact_id")
+        )
+    
+    nms_threshold = _AVATAR_NMS_DISTANCE
+    list_results: List[ContactLocateResult] = []
+    chat_results: List[ContactLocateResult] = []
+    for contact_name, (candidates, contact_id, in_strip) in all_contact_matches.items():
+        unique_c = _nms_avatar_candidates(
+            *candidates, nms_threshold=nms_threshold, contact_name=contact_name, contact_id=contact_id
+        )
+        if in_strip:
+            # 只在列表条带内匹配：没有聊天区域的点可供分组比较，直接按列表区域筛选
+            list_c = [
+                m for m in unique_c
+                if list_left_x <= m["x"] < list_right_x and m["y"] > search_bar_y
+            ]
+            chat_c = []
+        else:
+            # 无法判断区域的单个匹配点：只要列表时归入列表，否则归入聊天区域
+            list_c, chat_c = _classify_avatar_matches(
+                unique_c,
+                search_bar_x=search_bar_x,
+                search_bar_y=search_bar_y,
+                default_to_list=list_only,
+                list_right_x=list_right_x,
+                list_left_x=list_left_x,
             )
-            result_list.append(ContactLocateResult(
-                locate_result=locate_result,
-                contact_name=match["contact_name"],
-                contact_id=match.get("contact_id")
-            ))
-            logger.debug(
-                f"✓ 定位到联系人 '{match['contact_name']}' 的头像(列表): ({match['x']}, {match['y']}), 置信度={match['confidence']:.3f}"
-            )
+        logger.debug("联系人 '%s' 单独统计: 列表头像=%d 个, 聊天头像=%d 个", contact_name, len(list_c), len(chat_c))
+        if want_list:
+            for match in list_c:
+                list_results.append(_to_result(match))
+                logger.debug(
+                    "✓ 定位到联系人 '%s' 的头像(列表): (%d, %d), 置信度=%.3f",
+                    match['contact_name'], match['x'], match['y'], match['confidence'],
+                )
+        if want_chat:
+            # 聊天区域按 y 从大到小（从下到上，新到旧）
+            chat_c.sort(key=lambda m: m["y"], reverse=True)
+            for match in chat_c:
+                chat_results.append(_to_result(match))
+                logger.debug(
+                    "✓ 定位到联系人 '%s' 的头像(聊天): (%d, %d), 置信度=%.3f",
+                    match['contact_name'], match['x'], match['y'], match['confidence'],
+                )
     
-    logger.debug(f"成功定位 {len(result_list)} 个联系人的头像（列表区域，按联系人单独计算）")
-    return result_list
+    if want_list:
+        logger.debug(f"成功定位 {len(list_results)} 个联系人的头像（列表区域，按联系人单独计算）")
+    if want_chat:
+        logger.debug(f"成功定位 {len(chat_results)} 个联系人的头像（聊天区域，按联系人单独计算）")
+    if cache_key is not None:
+        with _last_list_avatars_lock:
+            _last_list_avatars = (cache_key, list_strip.copy(), copy.deepcopy(list_results))
+    return list_results, chat_results
 
 
-def locate_all_contact_avatars_in_chat(
+def locate_all_contact_avatars(
     screenshot: Optional[np.ndarray] = None,
     threshold: float = 0.7,
     contact_mapper: Optional[ContactUserMapper] = None,
     enabled_contacts_only: bool = True,
     exclude_contacts: Optional[List[str]] = None,
-) -> List[ContactLocateResult]:
+    precomputed_matches: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None,
+) -> Tuple[List[ContactLocateResult], List[ContactLocateResult]]:
     """
-    一次性定位聊天区域中所有配置联系人的头像位置
-    
-    功能：
-    - 获取所有配置的联系人（或仅启用的联系人）
-    - 使用每个联系人的头像模板进行匹配
-    - 将所有匹配结果标记对应的联系人
-    - 只返回聊天区域的头像（排除列表区域）
+    一次性定位所有配置联系人在列表区域和聊天区域的头像位置（每个模板只整图匹配一次）
     
-    适用场景：
-    - 单聊：定位当前聊天对象的头像
-    - 群聊：定位所有群成员的头像（需要预先配置群成员的头像模板）
+    同时需要两组结果时，比分别调用 locate_all_contact_avatars_in_list / _in_chat 少一遍匹配与分类。
+    搜索框未定位、且某联系人只有一个匹配点（无法按位置判断区域）时，该点归入聊天区域。
     
     Args:
         screenshot: 窗口截图（BGR格式），如果为None则自动截取
         threshold: 模板匹配阈值（0.0-1.0）
         contact_mapper: 联系人映射器实例，如果为None则创建新实例
         enabled_contacts_only: 是否只定位启用的联系人，如果为False则定位所有配置的联系人
+        exclude_contacts: 需要排除的联系人名称列表（可选）
+        precomputed_matches: 同一截图、同一阈值下已算好的整图候选点 {模板路径: (xs, ys, confs)}（可选）
     
     Returns:
-        联系人头像定位结果列表 List[ContactLocateResult]，每个结果包含：
-        - locate_result: LocateResult（定位结果）
-        - contact_name: 联系人名称
-        - contact_id: 联系人ID（可选）
+        (列表区域结果, 聊天区域结果)，均为 List[ContactLocateResult]；聊天区域结果按 y 从下到上排列
     """
-    config = WeChatAutomationConfig
-    
-    # 如果没有提供截图，自动截取
-    if screenshot is None:
-        try:
-            hwnd = get_wechat_hwnd()
-            screenshot = capture_window(hwnd)
-        except Exception as e:
-            logger.error(f"获取窗口截图失败: {e}")
-            return []
-    
-    # 如果没有提供联系人映射器，创建新实例
-    if contact_mapper is None:
-        contact_mapper = ContactUserMapper()
-    
-    # 获取联系人列表
-    if enabled_contacts_only:
-        contacts = contact_mapper.get_enabled_contacts()
-        logger.debug(f"定位聊天区域中启用的联系人头像，共 {len(contacts)} 个联系人")
-    else:
-        contacts = contact_mapper.get_all_contacts()
-        logger.debug(f"定位聊天区域中所有配置的联系人头像，共 {len(contacts)} 个联系人")
+    return _locate_all_contact_avatars(
+        screenshot, threshold, contact_mapper, enabled_contacts_only, exclude_contacts, precomputed_matches,
+        want_list=True, want_chat=True,
+    )
 
-    # 按需排除指定联系人（例如“我”）
-    if exclude_contacts:
-        exclude_set = set(c.strip() for c in exclude_contacts if c and c.strip())
-        if exclude_set:
-            before = len(contacts)
-            contacts = [c for c in contacts if c not in exclude_set]
-            logger.debug(
-                "根据 exclude_contacts 过滤联系人(聊天区域): 原有 %d 个, 排除 %s 后剩余 %d 个",
-                before,
-                list(exclude_set),
-                len(contacts),
-            )
-    
-    if not contacts:
-        logger.warning("没有找到配置的联系人")
-        return []
-    
-    # 转换为灰度图
-    if len(screenshot.shape) == 3:
-        screenshot_gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-    else:
-        screenshot_gray = screenshot
-    
-    # 先定位搜索框位置（用于判断头像是否在聊天区域）
-    search_bar_result = None
-    try:
-        search_bar_template_paths = []
-        base_path = config.TEMPLATE_PATHS.get("search_bar")
-        if base_path and base_path.exists():
-            search_bar_template_paths.append(base_path)
-        ing_path = config.TEMPLATE_PATHS.get("search_bar_ing")
-        if ing_path and ing_path.exists():
-            search_bar_template_paths.append(ing_path)
-        
-        if search_bar_template_paths:
-            search_bar_result = match_all_templates(screenshot, search_bar_template_paths, threshold=threshold)
-            if search_bar_result.success:
-                logger.debug(f"搜索框位置: ({search_bar_result.x}, {search_bar_result.y})")
-    except Exception as e:
-        logger.debug(f"定位搜索框失败: {e}")
+
+def locate_all_contact_avatars_in_list(
+    screenshot: Optional[np.ndarray] = None,
+    threshold: float = 0.7,
+    contact_mapper: Optional[ContactUserMapper] = None,
+    enabled_contacts_only: bool = True,
+    exclude_contacts: Optional[List[str]] = None,
+    precomputed_matches: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None,
+) -> List[ContactLocateResult]:
+    """
+    一次性定位联系人列表中所有配置联系人的头像位置
     
-    search_bar_x = search_bar_result.x if search_bar_result and search_bar_result.success else None
-    search_bar_y = search_bar_result.y if search_bar_result and search_bar_result.success else None
-    # 列表区域边界：判为列表的头像必须落在此区域内，否则不计入列表
-    list_left_x = None
-    list_right_x = None
-    if search_bar_x is not None:
-        sb_size = get_element_size("search_bar")
-        sb_w = sb_size[0] if sb_size else 180
-        list_left_x = max(0, int(search_bar_x - sb_w * 0.6))
-        list_right_x = int(search_bar_x)
+    功能：
+    - 获取所有配置的联系人（或仅启用的联系人）
+    - 使用每个联系人的头像模板进行匹配
+    - 将所有匹配结果标记对应的联系人
+    - 只返回列表区域的头像（排除聊天区域）
     
-    # 存储所有匹配结果：{contact_name: List[匹配结果]}
-    all_contact_matches: Dict[str, List[Dict]] = {}
+    Args:
+        screenshot: 窗口截图（BGR格式），如果为None则自动截取
+        threshold: 模板匹配阈值（0.0-1.0）
+        contact_mapper: 联系人映射器实例，如果为None则创建新实例
+        enabled_contacts_only: 是否只定位启用的联系人，如果为False则定位所有配置的联系人
+        exclude_contacts: 需要排除的联系人名称列表（可选）
+        precomputed_matches: 同一截图、同一阈值下已算好的候选点 {模板路径: (xs, ys, confs)}（可选），
+            命中的联系人不再重复做模板匹配
     
-    # 为每个联系人匹配头像
-    for contact_name in contacts:
-        contact_id = contact_mapper.get_contact_id(contact_name)
-        
-        # 获取联系人头像模板路径
-        template_path = config.get_contact_profile_photo_path(
-            contact_name=contact_name,
-            contact_id=contact_id or ""
-        )
-        
-        if not template_path or not template_path.exists():
-            logger.debug(f"联系人 '{contact_name}' 的头像模板不存在: {template_path}，跳过")
-            continue
-        
-        # 加载模板
-        template = cv2.imread(str(template_path))
-        if template is None:
-            logger.warning(f"无法加载联系人 '{contact_name}' 的头像模板: {template_path}")
-            continue
-        
-        # 转换为灰度图
-        if len(template.shape) == 3:
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-        else:
-            template_gray = template
-        
-        # 检查模板尺寸是否小于等于截图尺寸（OpenCV要求）
-        template_h, template_w = template_gray.shape[:2]
-        screenshot_h, screenshot_w = screenshot_gray.shape[:2]
-        
-        if template_h > screenshot_h or template_w > screenshot_w:
-            logger.warning(
-                f"联系人 '{contact_name}' 的头像模板尺寸 ({template_w}x{template_h}) "
-                f"大于截图尺寸 ({screenshot_w}x{screenshot_h})，跳过此模板"
-            )
-            continue
-        
-        # 模板匹配
-        match_result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        
-        # 找到所有超过阈值的位置
-        locations = np.where(match_result >= threshold)
-        
-        # 收集所有匹配点
-        matches = []
-        for pt in zip(*locations[::-1]):  # Switch x and y coordinates
-            confidence = float(match_result[pt[1], pt[0]])
-            # 计算头像中心点
-            avatar_center_x = pt[0] + template_gray.shape[1] // 2
-            avatar_center_y = pt[1] + template_gray.shape[0] // 2
-            
-            matches.append({
-                'x': avatar_center_x,
-                'y': avatar_center_y,
-                'confidence': confidence,
-                'contact_name': contact_name,
-                'contact_id': contact_id
-            })
-        
-        if matches:
-            logger.debug(f"联系人 '{contact_name}' 找到 {len(matches)} 个匹配点")
-            all_contact_matches[contact_name] = matches
-        else:
-            logger.debug(f"联系人 '{contact_name}' 未找到匹配的头像")
+    Returns:
+        联系人头像定位结果列表 List[ContactLocateResult]，每个结果包含：
+        - locate_result: LocateResult（定位结果）
+        - contact_name: 联系人名称
+        - contact_id: 联系人ID（可选）
     
-    if not all_contact_matches:
-        logger.warning("所有联系人都未找到匹配的头像")
-        return []
+    搜索框已定位时，若列表条带与上次调用逐像素相同、联系人与阈值也相同，直接返回上次结果的副本。
+    """
+    return _locate_all_contact_avatars(
+        screenshot, threshold, contact_mapper, enabled_contacts_only, exclude_contacts, precomputed_matches,
+        want_list=True, want_chat=False,
+    )[0]
+
+
+def locate_all_contact_avatars_in_chat(
+    screenshot: Optional[np.ndarray] = None,
+    threshold: float = 0.7,
+    contact_mapper: Optional[ContactUserMapper] = None,
+    enabled_contacts_only: bool = True,
+    exclude_contacts: Optional[List[str]] = None,
+) -> List[ContactLocateResult]:
+    """
+    一次性定位聊天区域中所有配置联系人的头像位置
     
-    # 按联系人单独：NMS 去重 + 列表/聊天分类，再汇总聊天区域结果
-    try:
-        from .models import LocateMethod
-    except ImportError:
-        from models import LocateMethod
-    
-    nms_threshold = 30
-    result_list: List[ContactLocateResult] = []
-    for contact_name, matches in all_contact_matches.items():
-        unique_c = _nms_avatar_matches(matches, nms_threshold=nms_threshold)
-        list_c, chat_c = _classify_avatar_matches(
-            unique_c,
-            search_bar_x=search_bar_x,
-            search_bar_y=search_bar_y,
-            default_to_list=False,
-            list_right_x=list_right_x,
-            list_left_x=list_left_x,
-        )
-        logger.debug(
-            f"联系人 '{contact_name}' 单独统计: 列表头像={len(list_c)} 个, 聊天头像={len(chat_c)} 个"
-        )
-        # 聊天区域按 y 从大到小（从下到上，新到旧）
-        chat_c.sort(key=lambda m: m["y"], reverse=True)
-        for match in chat_c:
-            locate_result = LocateResult(
-                success=True,
-                x=match["x"],
-                y=match["y"],
-                confidence=match["confidence"],
-                method=LocateMethod.TEMPLATE_MATCH,
-                region=None,
-                error_message=None
-            )
-            result_list.append(ContactLocateResult(
-                locate_result=locate_result,
-                contact_name=match["contact_name"],
-                contact_id=match.get("contact_id")
-            ))
-            logger.debug(
-                f"✓ 定位到联系人 '{match['contact_name']}' 的头像(聊天): ({match['x']}, {match['y']}), 置信度={match['confidence']:.3f}"
-            )
+    功能：
+    - 获取所有配置的联系人（或仅启用的联系人）
+    - 使用每个联系人的头像模板进行匹配
+    - 将所有匹配结果标记对应的联系人
+    - 只返回聊天区域的头像（排除列表区域）
+    
+    适用场景：
+    - 单聊：定位当前聊天对象的头像
+    - 群聊：定位所有群成员的头像（需要预先配置群成员的头像模板）
+    
+    Args:
+        screenshot: 窗口截图（BGR格式），如果为None则自动截取
+        threshold: 模板匹配阈值（0.0-1.0）
+        contact_mapper: 联系人映射器实例，如果为None则创建新实例
+        enabled_contacts_only: 是否只定位启用的联系人，如果为False则定位所有配置的联系人
+        exclude_contacts: 需要排除的联系人名称列表（可选）
     
-    logger.debug(f"成功定位 {len(result_list)} 个联系人的头像（聊天区域，按联系人单独计算）")
-    return result_list
+    Returns:
+        联系人头像定位结果列表 List[ContactLocateResult]，每个结果包含：
+        - locate_result: LocateResult（定位结果）
+        - contact_name: 联系人名称
+        - contact_id: 联系人ID（可选）
+    """
+    return _locate_all_contact_avatars(
+        screenshot, threshold, contact_mapper, enabled_contacts_only, exclude_contacts, None,
+        want_list=False, want_chat=True,
+    )[1]
 
 
 def save_element_positions(
@@ -1380,7 +1535,7 @@ def save_element_positions(
     if filepath.parent != filepath:
         filepath.parent.mkdir(parents=True, exist_ok=True)
     
-    # 转换为可序列化的格式
+    # 转换为可序列化的格式（坐标可能是 NumPy 整数，由 _json_dumps 直接序列化，无需逐个 int()）
     data = {}
     for element_name, result_or_list in positions.items():
         # 检查是否为列表（数组）
@@ -1400,11 +1555,11 @@ def save_element_positions(
                             size = bounds[2:]
                     result_list.append({
                         "success": True,
-                        "x": int(_x),
-                        "y": int(_y),
-                        "confidence": float(result.confidence),
-                        "bounds": tuple(int(b) for b in bounds),
-                        "size": tuple(int(s) for s in size) if isinstance(size, tuple) else size
+                        "x": _x,
+                        "y": _y,
+                        "confidence": result.confidence,
+                        "bounds": bounds,
+                        "size": size
                     })
             data[element_name] = result_list
         else:
@@ -1424,11 +1579,11 @@ def save_element_positions(
                         size = bounds[2:]  # 使用边界框的大小
                 data[element_name] = {
                     "success": True,
-                    "x": int(_x),
-                    "y": int(_y),
-                    "confidence": float(result.confidence),
-                    "bounds": tuple(int(b) for b in bounds),
-                    "size": tuple(int(s) for s in size) if isinstance(size, tuple) else size
+                    "x": _x,
+                    "y": _y,
+                    "confidence": result.confidence,
+                    "bounds": bounds,
+                    "size": size
                 }
             else:
                 data[element_name] = {
@@ -1437,8 +1592,7 @@ def save_element_positions(
                 }
     
     # 保存到文件
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    filepath.write_bytes(_json_dumps(data))
     
     logger.info(f"元素位置已保存到: {filepath}")
     return filepath
@@ -1471,12 +1625,251 @@ def load_element_positions(filepath: Optional[Path] = None) -> Dict[str, Dict]:
         return {}
 
 
+@dataclass
+class ContactAvatarArray:
+    """
+    联系人头像定位结果的按字段数组形式（每个字段一个数组，下标对应同一联系人）
+
+    标注等需要反复遍历全部联系人的地方先转换一次，循环内按下标取值，
+    不再逐个访问 contact_result.locate_result.x 之类的属性链。
+    """
+    xs: np.ndarray  # int64，定位失败时为 0
+    ys: np.ndarray  # int64，定位失败时为 0
+    confs: np.ndarray  # float64
+    success: np.ndarray  # bool
+    names: List[str]
+    ids: List[Optional[str]]
+
+    @classmethod
+    def from_results(cls, results: List[ContactLocateResult]) -> "ContactAvatarArray":
+        """由 ContactLocateResult 列表构建"""
+        count = len(results)
+        locs = [c.locate_result for c in results]
+        return cls(
+            xs=np.fromiter((r.x or 0 for r in locs), dtype=np.int64, count=count),
+            ys=np.fromiter((r.y or 0 for r in locs), dtype=np.int64, count=count),
+            confs=np.fromiter((r.confidence for r in locs), dtype=np.float64, count=count),
+            success=np.fromiter((bool(r.success) for r in locs), dtype=bool, count=count),
+            names=[c.contact_name for c in results],
+            ids=[c.contact_id for c in results],
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _red_point_search_boxes(
+    avatars: ContactAvatarArray,
+    avatar_radius: int,
+    image_shape: Tuple[int, ...],
+    search_radius: int = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    一次性计算各联系人头像右上角的红点检测区域，并裁剪到图像范围内
+
+    Args:
+        avatars: 列表区域联系人头像（按字段数组形式）
+        avatar_radius: 头像半宽
+        image_shape: 截图 shape（取前两维）
+        search_radius: 检测区域半宽
+
+    Returns:
+        (indices, boxes)：indices 为非空区域对应的联系人下标，
+        boxes 为 (N, 4) int64 数组，每行 (left, top, right, bottom)
+    """
+    h_img, w_img = image_shape[:2]
+    top_right_xs = avatars.xs + avatar_radius
+    top_right_ys = avatars.ys - avatar_radius
+    boxes = np.stack(
+        [
+            np.clip(top_right_xs - search_radius, 0, w_img),
+            np.clip(top_right_ys - search_radius, 0, h_img),
+            np.clip(top_right_xs + search_radius, 0, w_img),
+            np.clip(top_right_ys + search_radius, 0, h_img),
+        ],
+        axis=1,
+    )
+    indices = np.flatnonzero((boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1]))
+    return indices, boxes[indices]
+
+
+def _dashed_rect_segments(
+    left: int,
+    top: int,
+    width: int,
+    height: int,
+    dash_length: int = 5,
+    gap_length: int = 3,
+) -> np.ndarray:
+    """
+    虚线矩形四条边的全部线段端点，形状 (M, 2, 2)，可直接交给 cv2.polylines 一次绘制
+    （与逐段 cv2.line 绘制的结果逐像素一致）
+    """
+    step = dash_length + gap_length
+    xs = left + np.arange(0, width, step)
+    xe = np.minimum(xs + dash_length, left + width)
+    ys = top + np.arange(0, height, step)
+    ye = np.minimum(ys + dash_length, top + height)
+    segments = []
+    for y in (top, top + height):  # 上边、下边
+        segments.append(np.stack((
+            np.column_stack((xs, np.full_like(xs, y))),
+            np.column_stack((xe, np.full_like(xe, y))),
+        ), axis=1))
+    for x in (left, left + width):  # 左边、右边
+        segments.append(np.stack((
+            np.column_stack((np.full_like(ys, x), ys)),
+            np.column_stack((np.full_like(ye, x), ye)),
+        ), axis=1))
+    return np.concatenate(segments).astype(np.int32)
+
+
+# 标注图后台保存：单线程按提交顺序写盘，每一帧都会保存
+_save_pool: Optional[ThreadPoolExecutor] = None
+_save_pool_lock = threading.Lock()
+
+
+def _log_annotated_save(future: Future) -> None:
+    """后台保存完成回调：记录结果"""
+    error = future.exception()
+    if error is not None:
+        logger.error("保存标注图像失败: %s", error)
+    else:
+        logger.info("标注图像已保存: %s", future.result())
+
+
+def _save_annotated_async(image: np.ndarray) -> None:
+    """
+    在后台线程保存标注图（PNG 编码较慢，不阻塞调用方）；提交的每一帧都按顺序写盘，不丢弃
+    """
+    global _save_pool
+    with _save_pool_lock:
+        if _save_pool is None:
+            _save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wechat-save")
+    future = _save_pool.submit(
+        save_screenshot,
+        image,
+        "annotated_all_elements",
+        task_id="element_locator",
+        step_name="annotate_all",
+        error_info=None
+    )
+    future.add_done_callback(_log_annotated_save)
+
+
+# 标注标记的半径（外接正方形边长 2r+1，需盖住线宽）：
+# "cross" 为元素标记（半径 10 的圆圈 + 长 40 的十字线），"contact" 为联系人头像标记（半径 30 的圆圈 + 实心中心点）
+_MARKER_RADIUS = {"cross": 22, "contact": 32}
+
+
+def _render_marker(image: np.ndarray, kind: str, x: int, y: int, color) -> None:
+    """用 cv2 图元直接在 image 的 (x, y) 处绘制标记"""
+    if kind == "cross":
+        cv2.circle(image, (x, y), 10, color, 2)
+        cv2.line(image, (x - 20, y), (x + 20, y), color, 2)
+        cv2.line(image, (x, y - 20), (x, y + 20), color, 2)
+    else:
+        cv2.circle(image, (x, y), 30, color, 2)
+        cv2.circle(image, (x, y), 5, color, -1)
+
+
+@functools.lru_cache(maxsize=64)
+def _marker_sprite(kind: str, color: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    预渲染标注标记，返回 (BGR 图块, 掩码)，按 (样式, 颜色) 缓存
+
+    图块与直接在原图上绘制逐像素一致（标记完整落在图像内时）。
+    """
+    r = _MARKER_RADIUS[kind]
+    mask = np.zeros((2 * r + 1, 2 * r + 1), dtype=np.uint8)
+    _render_marker(mask, kind, r, r, 255)
+    sprite = np.empty((2 * r + 1, 2 * r + 1, 3), dtype=np.uint8)
+    sprite[:] = color
+    return sprite, mask
+
+
+def _draw_marker(image: np.ndarray, kind: str, x: int, y: int, color: Tuple[int, int, int]) -> None:
+    """
+    在 image 的 (x, y) 处绘制标记（原地修改）
+
+    标记完整落在图像内时贴预渲染图块；压到图像边缘时 cv2 对粗线的裁剪结果与图块略有不同，
+    此时直接绘制，保证与逐次绘制的结果一致。
+    """
+    r = _MARKER_RADIUS[kind]
+    h, w = image.shape[:2]
+    if x - r < 0 or y - r < 0 or x + r >= w or y + r >= h:
+        _render_marker(image, kind, x, y, color)
+        return
+    sprite, mask = _marker_sprite(kind, tuple(color))
+    cv2.copyTo(sprite, mask, image[y - r:y + r + 1, x - r:x + r + 1])
+
+
+def _draw_contact_batch(
+    annotated: np.ndarray,
+    avatars: ContactAvatarArray,
+    size: Tuple[int, int],
+    color: Tuple[int, int, int],
+    dashed: bool,
+    label_prefix: str,
+    texts: List[Tuple[str, Tuple[int, int], int, Tuple[int, int, int]]],
+) -> None:
+    """
+    标注一批联系人头像（列表区域与聊天区域共用）：外圈和中心点、边界框、名称/位置/置信度标签
+    
+    Args:
+        annotated: 标注图（原地绘制）
+        avatars: 联系人头像定位结果（数组形式），只标注定位成功的
+        size: 头像大小 (width, height)
+        color: 标注颜色
+        dashed: 边界框是否画成虚线（列表区域虚线，聊天区域实线）
+        label_prefix: 名称标签前缀（如 "联系人"、"聊天"）
+        texts: 文字标签收集列表，标签追加到这里，由调用方统一绘制
+    """
+    width, height = size
+    # 虚线边框线段先收集起来，循环结束后用一次 cv2.polylines 画完
+    dashed_segments: List[np.ndarray] = []
+    
+    for i in np.flatnonzero(avatars.success):
+        x = int(avatars.xs[i])
+        y = int(avatars.ys[i])
+        confidence = avatars.confs[i]
+        contact_name = avatars.names[i]
+        contact_id = avatars.ids[i]
+        
+        # 绘制外圈（更大的圆圈）和中心点
+        _draw_marker(annotated, "contact", x, y, color)
+        
+        # 边界框
+        left = x - width // 2
+        top = y - height // 2
+        if dashed:
+            dashed_segments.append(_dashed_rect_segments(left, top, width, height))
+        else:
+            cv2.rectangle(annotated, (left, top), (left + width, top + height), color, 2)
+        
+        # 添加联系人名称标签（在头像右侧）
+        contact_label = f"{label_prefix}: {contact_name}"
+        if contact_id:
+            contact_label += f" (ID: {contact_id})"
+        texts.append((contact_label, (x + width // 2 + 10, y - 15), 16, color))
+        
+        # 添加位置和置信度信息
+        texts.append((f"位置: ({x}, {y})", (x + width // 2 + 10, y + 5), 14, color))
+        texts.append((f"置信度: {confidence:.3f}", (x + width // 2 + 10, y + 25), 14, color))
+        
+        logger.debug("  已标注%s头像 '%s': (%s, %s)", label_prefix, contact_name, x, y)
+    
+    if dashed_segments:
+        cv2.polylines(annotated, np.concatenate(dashed_segments), False, color, 2)
+
+
 def annotate_all_elements(
     screenshot: np.ndarray,
     positions: Dict[str, Union[LocateResult, List[LocateResult]]],
     save_path: Optional[Path] = None,
     all_contact_avatars: Optional[List[ContactLocateResult]] = None,
-    all_contact_avatars_in_chat: Optional[List[ContactLocateResult]] = None
+    all_contact_avatars_in_chat: Optional[List[ContactLocateResult]] = None,
+    enabled: Optional[bool] = None,
 ) -> np.ndarray:
     """
     在截图上标注所有元素位置
@@ -1484,108 +1877,93 @@ def annotate_all_elements(
     Args:
         screenshot: 窗口截图（BGR格式）
         positions: 元素位置字典（支持单个LocateResult或LocateResult列表）
-        save_path: 保存路径，如果为None则不保存
+        save_path: 保存路径，如果为None则不保存（在后台线程写盘，函数返回时文件可能尚未写完）
         all_contact_avatars: 所有联系人的头像定位结果列表（列表区域，可选），用于在图片上标注联系人信息
         all_contact_avatars_in_chat: 所有联系人的头像定位结果列表（聊天区域，可选），用于在图片上标注联系人信息
+        enabled: 是否进行标注；为 None 时按 WeChatAutomationConfig.ANNOTATE_ELEMENTS。
+            关闭时原样返回 screenshot，不绘制也不保存（生产环境不需要标注图时省去整个标注开销）
     
     Returns:
-        标注后的图像
+        标注后的图像（在副本上绘制，screenshot 本身不被修改）；未启用标注时为 screenshot 本身
     """
+    if enabled is None:
+        enabled = WeChatAutomationConfig.ANNOTATE_ELEMENTS
+    if not enabled:
+        logger.debug("标注已关闭，跳过 annotate_all_elements")
+        return screenshot
+    
     # 调试：检查输入数据的类型
-    logger.info(f"开始标注，positions 包含 {len(positions)} 个元素")
+    logger.info("开始标注，positions 包含 %s 个元素", len(positions))
     for name, value in positions.items():
         if name == "profile_photo_in_chat":
-            logger.info(f"  {name}: type={type(value)}, is_list={isinstance(value, list)}")
+            logger.info("  %s: type=%s, is_list=%s", name, type(value), isinstance(value, list))
             if isinstance(value, list):
-                logger.info(f"    数组长度: {len(value)}")
+                logger.info("    数组长度: %s", len(value))
                 for i, item in enumerate(value):
-                    logger.info(f"      [{i}]: type={type(item)}, success={getattr(item, 'success', None)}, x={getattr(item, 'x', None)}, y={getattr(item, 'y', None)}")
+                    logger.info("      [%s]: type=%s, success=%s, x=%s, y=%s", i, type(item), getattr(item, 'success', None), getattr(item, 'x', None), getattr(item, 'y', None))
             else:
-                logger.warning(f"    ⚠️ profile_photo_in_chat 不是列表！type={type(value)}")
+                logger.warning("    ⚠️ profile_photo_in_chat 不是列表！type=%s", type(value))
+    
+    # 红点检查范围需要列表头像位置：未传入时用原图定位
+    avatars_for_red_region = all_contact_avatars
+    if avatars_for_red_region is None:
+        try:
+            avatars_for_red_region = locate_all_contact_avatars_in_list(screenshot=screenshot)
+        except Exception as e:
+            logger.debug("定位列表头像失败，跳过红点检查范围: %s", e)
+            avatars_for_red_region = []
+    
+    # 联系人结果转成按字段的数组，红点检查范围与联系人标注都按下标遍历
+    red_region_avatars = ContactAvatarArray.from_results(avatars_for_red_region)
+    list_avatars = (
+        red_region_avatars if avatars_for_red_region is all_contact_avatars
+        else ContactAvatarArray.from_results(all_contact_avatars or [])
+    )
+    chat_avatars = ContactAvatarArray.from_results(all_contact_avatars_in_chat or [])
     
     annotated = screenshot.copy()
     h_img, w_img = annotated.shape[:2]
+    center_x, center_y = w_img // 2, h_img // 2  # 未找到的元素标注在窗口中心
+    # 文字标签先收集，最后用 put_chinese_texts 一次画完（整图只做一次 PIL 转换）
+    texts: List[Tuple[str, Tuple[int, int], int, Tuple[int, int, int]]] = []
+    # 元素尺寸在一次标注内不变，统一查一次，循环内直接取字典
+    element_sizes = {name: get_element_size(name) for name in ELEMENT_ORDER}
+    list_avatar_size = element_sizes["profile_photo_in_list"]
+    chat_avatar_size = element_sizes["profile_photo_in_chat"]
     # 若有 search_bar，绘制列表区域（搜索框左下方）便于检查列表/聊天分界
     list_roi = get_list_area_roi(positions, image_height=h_img)
     if list_roi is not None:
         lx, ly, lw, lh = list_roi
         cv2.rectangle(annotated, (lx, ly), (lx + lw, ly + lh), (0, 255, 255), 2)
-        annotated = put_chinese_text(
-            annotated,
-            "列表区域(搜索框左下方)",
-            (lx + 5, ly + 22),
-            font_size=12,
-            color=(0, 255, 255)
-        )
+        texts.append(("列表区域(搜索框左下方)", (lx + 5, ly + 22), 12, (0, 255, 255)))
     
     # 绘制红点检查范围：在每个联系人头像右上角画出实际参与红点匹配的矩形区域
     try:
-        avatars_for_red_region = all_contact_avatars
-        if avatars_for_red_region is None:
-            avatars_for_red_region = locate_all_contact_avatars_in_list(screenshot=screenshot)
-        avatar_size = get_element_size("profile_photo_in_list")
-        avatar_radius = (avatar_size[0] if avatar_size else 50) // 2
-        search_radius = 10
+        avatar_radius = (list_avatar_size[0] if list_avatar_size else 50) // 2
         red_region_color = (255, 192, 203)  # 与 new_message_red_point 同色
         first_label = True
-        for contact_result in avatars_for_red_region:
-            avatar_x = contact_result.locate_result.x or 0
-            avatar_y = contact_result.locate_result.y or 0
-            top_right_x = avatar_x + avatar_radius
-            top_right_y = avatar_y - avatar_radius
-            search_left = max(0, int(top_right_x - search_radius))
-            search_right = min(w_img, int(top_right_x + search_radius))
-            search_top = max(0, int(top_right_y - search_radius))
-            search_bottom = min(h_img, int(top_right_y + search_radius))
-            if search_right <= search_left or search_bottom <= search_top:
-                continue
+        # 所有头像的检查范围一次性算出并裁剪到图像内，循环里只剩绘制
+        _, boxes = _red_point_search_boxes(red_region_avatars, avatar_radius, annotated.shape)
+        for search_left, search_top, search_right, search_bottom in boxes.tolist():
             cv2.rectangle(annotated, (search_left, search_top), (search_right, search_bottom), red_region_color, 2)
             if first_label:
-                annotated = put_chinese_text(
-                    annotated,
-                    "红点检查范围",
-                    (search_left, max(0, search_top - 4)),
-                    font_size=10,
-                    color=red_region_color
-                )
+                texts.append(("红点检查范围", (search_left, max(0, search_top - 4)), 10, red_region_color))
                 first_label = False
     except Exception as e:
         logger.debug("绘制红点检查范围时跳过: %s", e)
     
-    # 定义颜色映射（按顺序，与ELEMENT_ORDER对应）
-    colors = [
-        (0, 255, 255),   # 黄色 - chat_message_icon
-        (255, 165, 0),   # 橙色 - three_point_icon
-        (255, 20, 147),  # 深粉色 - pin_icon
-        (0, 255, 0),     # 绿色 - search_bar
-        (0, 0, 255),     # 红色 - profile_photo_in_list
-        (255, 192, 203), # 粉色 - new_message_red_point
-        (255, 0, 0),     # 蓝色 - profile_photo_in_chat
-        (255, 0, 255),   # 紫色 - sticker_icon
-        (255, 255, 0),   # 青色 - save_icon
-        (128, 0, 128),   # 紫色 - file_icon
-        (255, 192, 203), # 粉色 - screencap_icon
-        (200, 200, 200), # 浅灰 - tape_icon
-        (0, 128, 128),   # 青色 - voice_call_icon
-        (128, 255, 0),   # 黄绿色 - video_call_icon
-        (0, 128, 255),   # 橙色 - send_button
-        (255, 255, 255), # 白色 - input_box_anchor
-    ]
-    
     # 标注每个元素
-    for idx, element_name in enumerate(ELEMENT_ORDER):
+    for element_name, color in ELEMENT_DRAW_SPEC:
         result_or_list = positions.get(element_name)
         if result_or_list is None:
             continue
         
-        color = colors[idx % len(colors)] if idx < len(colors) else (128, 128, 128)
-        
-        # 调试：检查数据类型
-        logger.debug(f"处理元素 {element_name}: type={type(result_or_list)}, is_list={isinstance(result_or_list, list)}")
-        if isinstance(result_or_list, list):
-            logger.debug(f"  数组长度: {len(result_or_list)}")
+        # 调试：检查数据类型（逐项输出只在 DEBUG 级别开启时才遍历）
+        logger.debug("处理元素 %s: type=%s, is_list=%s", element_name, type(result_or_list), isinstance(result_or_list, list))
+        if isinstance(result_or_list, list) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  数组长度: %s", len(result_or_list))
             for i, item in enumerate(result_or_list):
-                logger.debug(f"    [{i}]: type={type(item)}, success={getattr(item, 'success', None)}, x={getattr(item, 'x', None)}, y={getattr(item, 'y', None)}")
+                logger.debug("    [%s]: type=%s, success=%s, x=%s, y=%s", i, type(item), getattr(item, 'success', None), getattr(item, 'x', None), getattr(item, 'y', None))
         
         # 检查是否为数组类型
         # 重要：profile_photo_in_chat 必须是 List[LocateResult]
@@ -1594,57 +1972,46 @@ def annotate_all_elements(
             # 数组类型（如profile_photo_in_chat）
             if not result_or_list:
                 # 空数组，标注未找到
-                logger.debug(f"元素 {element_name} 是空数组")
-                h, w = annotated.shape[:2]
-                center_x, center_y = w // 2, h // 2
+                logger.debug("元素 %s 是空数组", element_name)
                 label = f"{element_name} (未找到，空数组)"
-                annotated = put_chinese_text(
-                    annotated,
-                    label,
-                    (center_x + 25, center_y),
-                    font_size=14,
-                    color=color
-                )
+                texts.append((label, (center_x + 25, center_y), 14, color))
             else:
-                # 验证列表中的元素类型
-                if not all(isinstance(item, LocateResult) for item in result_or_list):
-                    logger.error(f"⚠️ 数组元素 {element_name} 包含非 LocateResult 类型！")
-                    logger.error(f"  类型: {[type(item).__name__ for item in result_or_list]}")
+                # 验证列表中的元素类型（正常情况下全是 LocateResult，按类型身份判断，遇到第一个异常项即短路）
+                all_locate_results = not any(type(item) is not LocateResult for item in result_or_list)
+                if not all_locate_results:
+                    logger.error("⚠️ 数组元素 %s 包含非 LocateResult 类型！", element_name)
+                    logger.error("  类型: %s", [type(item).__name__ for item in result_or_list])
                     # 尝试转换（如果是字典）
                     converted_list = []
                     for item in result_or_list:
                         if isinstance(item, dict):
-                            logger.warning(f"  检测到字典类型，尝试转换...")
+                            logger.warning("  检测到字典类型，尝试转换...")
                             # 这里不应该发生，但如果发生了，至少记录错误
-                            logger.error(f"  ❌ 数据被降维了！{element_name} 应该是 List[LocateResult]，但收到了字典列表")
+                            logger.error("  ❌ 数据被降维了！%s 应该是 List[LocateResult]，但收到了字典列表", element_name)
                         converted_list.append(item)
                     result_or_list = converted_list
                 
-                logger.info(f"标注数组元素 {element_name}，共 {len(result_or_list)} 个")
+                logger.info("标注数组元素 %s，共 %s 个", element_name, len(result_or_list))
                 success_count = 0
                 for i, result in enumerate(result_or_list):
-                    # 严格类型检查
-                    if not isinstance(result, LocateResult):
-                        logger.error(f"  ❌ 数组元素 {element_name}[{i}] 不是 LocateResult 类型！type={type(result)}")
-                        logger.error(f"     这表示数据被降维了！应该是 List[LocateResult]，但收到了 {type(result)}")
+                    # 严格类型检查（上面已确认全部为 LocateResult 时无需逐项再查）
+                    if not all_locate_results and not isinstance(result, LocateResult):
+                        logger.error("  ❌ 数组元素 %s[%s] 不是 LocateResult 类型！type=%s", element_name, i, type(result))
+                        logger.error("     这表示数据被降维了！应该是 List[LocateResult]，但收到了 %s", type(result))
                         continue
                     
-                    logger.info(f"  处理数组元素 {element_name}[{i}]: success={result.success}")
+                    logger.info("  处理数组元素 %s[%s]: success=%s", element_name, i, result.success)
                     if hasattr(result, 'x') and hasattr(result, 'y'):
-                        logger.info(f"    坐标: x={result.x}, y={result.y}")
+                        logger.info("    坐标: x=%s, y=%s", result.x, result.y)
                     if result.success:
                         success_count += 1
                         x, y = int(result.x or 0), int(result.y or 0)
                         
-                        # 绘制中心点（圆圈）
-                        cv2.circle(annotated, (x, y), 10, color, 2)
-                        
-                        # 绘制十字线
-                        cv2.line(annotated, (x - 20, y), (x + 20, y), color, 2)
-                        cv2.line(annotated, (x, y - 20), (x, y + 20), color, 2)
+                        # 绘制中心点（圆圈）和十字线
+                        _draw_marker(annotated, "cross", x, y, color)
                         
                         # 计算边界框
-                        size = get_element_size(element_name)
+                        size = element_sizes[element_name]
                         if size is None:
                             if result.region:
                                 _, _, width, height = result.region
@@ -1660,27 +2027,15 @@ def annotate_all_elements(
                         
                         # 添加标签（与其他元素保持一致）
                         label = f"{element_name}[{i}] ({x},{y})"
-                        annotated = put_chinese_text(
-                            annotated,
-                            label,
-                            (x + 25, y - 10),
-                            font_size=14,
-                            color=color
-                        )
+                        texts.append((label, (x + 25, y - 10), 14, color))
                         
                         # 添加置信度
                         conf_label = f"conf={result.confidence:.2f}"
-                        annotated = put_chinese_text(
-                            annotated,
-                            conf_label,
-                            (x + 25, y + 5),
-                            font_size=12,
-                            color=color
-                        )
+                        texts.append((conf_label, (x + 25, y + 5), 12, color))
                     else:
-                        logger.warning(f"数组元素 {element_name}[{i}] 定位失败: {result.error_message}")
+                        logger.warning("数组元素 %s[%s] 定位失败: %s", element_name, i, result.error_message)
                 
-                logger.info(f"  成功标注 {success_count}/{len(result_or_list)} 个数组元素")
+                logger.info("  成功标注 %s/%s 个数组元素", success_count, len(result_or_list))
             continue
         
         # 单个结果类型
@@ -1704,13 +2059,7 @@ def annotate_all_elements(
                     # 标注中点说明
                     mid_x = (sx + ex) // 2
                     mid_y = (sy + ey) // 2
-                    annotated = put_chinese_text(
-                        annotated,
-                        "中点",
-                        (mid_x - 20, mid_y - 25),
-                        font_size=12,
-                        color=color
-                    )
+                    texts.append(("中点", (mid_x - 20, mid_y - 25), 12, color))
             
             # 特殊处理：new_message_red_point - 显示与头像的关系
             if element_name == "new_message_red_point":
@@ -1720,45 +2069,29 @@ def annotate_all_elements(
                     # 绘制从头像右上角到红点的虚线（表示关联关系）
                     avatar_x = int(profile_photo_result.x or 0)
                     avatar_y = int(profile_photo_result.y or 0)
-                    avatar_size = get_element_size("profile_photo_in_list")
-                    avatar_width, avatar_height = avatar_size
+                    avatar_width, avatar_height = list_avatar_size
                     # 头像右上角坐标
                     avatar_right = avatar_x + avatar_width // 2
                     avatar_top = avatar_y - avatar_height // 2
                     
                     # 绘制虚线（用多个小线段模拟）
-                    # 从头像右上角到红点
+                    # 从头像右上角到红点：连线等分为 num_segments 段，只画偶数段，一次 polylines 画完
                     dx = x - avatar_right
                     dy = y - avatar_top
                     num_segments = 10
-                    for i in range(num_segments):
-                        if i % 2 == 0:  # 只绘制偶数段，形成虚线效果
-                            start_ratio = i / num_segments
-                            end_ratio = (i + 1) / num_segments
-                            start_x = int(avatar_right + dx * start_ratio)
-                            start_y = int(avatar_top + dy * start_ratio)
-                            end_x = int(avatar_right + dx * end_ratio)
-                            end_y = int(avatar_top + dy * end_ratio)
-                            cv2.line(annotated, (start_x, start_y), (end_x, end_y), color, 1, cv2.LINE_AA)
+                    ratios = np.arange(num_segments + 1) / num_segments
+                    points = np.column_stack((avatar_right + dx * ratios, avatar_top + dy * ratios)).astype(np.int32)
+                    dashes = np.stack((points[:-1:2], points[1::2]), axis=1)
+                    cv2.polylines(annotated, dashes, False, color, 1, cv2.LINE_AA)
                     
-                    # 在头像右上角标注
-                    annotated = put_chinese_text(
-                        annotated,
-                        "头像右上角",
-                        (avatar_right - 30, avatar_top - 15),
-                        font_size=10,
-                        color=(0, 0, 255)  # 红色，与头像颜色一致
-                    )
-            
-            # 绘制中心点（圆圈）
-            cv2.circle(annotated, (x, y), 10, color, 2)
+                    # 在头像右上角标注（红色，与头像颜色一致）
+                    texts.append(("头像右上角", (avatar_right - 30, avatar_top - 15), 10, (0, 0, 255)))
             
-            # 绘制十字线
-            cv2.line(annotated, (x - 20, y), (x + 20, y), color, 2)
-            cv2.line(annotated, (x, y - 20), (x, y + 20), color, 2)
+            # 绘制中心点（圆圈）和十字线
+            _draw_marker(annotated, "cross", x, y, color)
             
             # 计算边界框
-            size = get_element_size(element_name)
+            size = element_sizes[element_name]
             if size is None:
                 # 大小不定，尝试从定位结果获取
                 if result.region:
@@ -1777,27 +2110,13 @@ def annotate_all_elements(
             label = f"{element_name} ({x},{y})"
             if element_name == "input_box_anchor":
                 label = f"{element_name} (中点) ({x},{y})"
-            annotated = put_chinese_text(
-                annotated,
-                label,
-                (x + 25, y - 10),
-                font_size=14,
-                color=color
-            )
+            texts.append((label, (x + 25, y - 10), 14, color))
             
             # 添加置信度
             conf_label = f"conf={result.confidence:.2f}"
-            annotated = put_chinese_text(
-                annotated,
-                conf_label,
-                (x + 25, y + 5),
-                font_size=12,
-                color=color
-            )
+            texts.append((conf_label, (x + 25, y + 5), 12, color))
         else:
             # 标注失败的元素（用虚线框在窗口中心）
-            h, w = annotated.shape[:2]
-            center_x, center_y = w // 2, h // 2
             
             # 绘制虚线（用多个小线段模拟）
             for i in range(0, 40, 5):
@@ -1811,154 +2130,20 @@ def annotate_all_elements(
                         color, 1)
             
             label = f"{element_name} (未找到)"
-            annotated = put_chinese_text(
-                annotated,
-                label,
-                (center_x + 25, center_y),
-                font_size=14,
-                color=color
-            )
+            texts.append((label, (center_x + 25, center_y), 14, color))
     
     # 标注所有联系人的头像位置和名称（如果提供了）
     if all_contact_avatars:
-        logger.info(f"标注 {len(all_contact_avatars)} 个联系人的头像信息")
+        logger.info("标注 %s 个联系人的头像信息", len(all_contact_avatars))
         contact_color = (0, 255, 255)  # 黄色，用于区分联系人头像
-        
-        for contact_result in all_contact_avatars:
-            if not contact_result.locate_result.success:
-                continue
-            
-            x = int(contact_result.locate_result.x or 0)
-            y = int(contact_result.locate_result.y or 0)
-            confidence = contact_result.locate_result.confidence
-            
-            # 绘制联系人头像位置（使用不同的颜色和样式）
-            # 绘制外圈（更大的圆圈）
-            cv2.circle(annotated, (x, y), 30, contact_color, 2)
-            
-            # 绘制中心点
-            cv2.circle(annotated, (x, y), 5, contact_color, -1)
-            
-            # 计算边界框
-            size = get_element_size("profile_photo_in_list")
-            width, height = size
-            left = x - width // 2
-            top = y - height // 2
-            
-            # 绘制边界框（虚线样式，用多个小线段模拟）
-            dash_length = 5
-            gap_length = 3
-            # 上边
-            for i in range(0, width, dash_length + gap_length):
-                end_x = min(left + i + dash_length, left + width)
-                cv2.line(annotated, (left + i, top), (end_x, top), contact_color, 2)
-            # 下边
-            for i in range(0, width, dash_length + gap_length):
-                end_x = min(left + i + dash_length, left + width)
-                cv2.line(annotated, (left + i, top + height), (end_x, top + height), contact_color, 2)
-            # 左边
-            for i in range(0, height, dash_length + gap_length):
-                end_y = min(top + i + dash_length, top + height)
-                cv2.line(annotated, (left, top + i), (left, end_y), contact_color, 2)
-            # 右边
-            for i in range(0, height, dash_length + gap_length):
-                end_y = min(top + i + dash_length, top + height)
-                cv2.line(annotated, (left + width, top + i), (left + width, end_y), contact_color, 2)
-            
-            # 添加联系人名称标签（在头像右侧）
-            contact_label = f"联系人: {contact_result.contact_name}"
-            if contact_result.contact_id:
-                contact_label += f" (ID: {contact_result.contact_id})"
-            annotated = put_chinese_text(
-                annotated,
-                contact_label,
-                (x + width // 2 + 10, y - 15),
-                font_size=16,
-                color=contact_color
-            )
-            
-            # 添加位置和置信度信息
-            pos_label = f"位置: ({x}, {y})"
-            annotated = put_chinese_text(
-                annotated,
-                pos_label,
-                (x + width // 2 + 10, y + 5),
-                font_size=14,
-                color=contact_color
-            )
-            
-            conf_label = f"置信度: {confidence:.3f}"
-            annotated = put_chinese_text(
-                annotated,
-                conf_label,
-                (x + width // 2 + 10, y + 25),
-                font_size=14,
-                color=contact_color
-            )
-            
-            logger.debug(f"  已标注联系人 '{contact_result.contact_name}' 的头像: ({x}, {y})")
+        _draw_contact_batch(annotated, list_avatars, list_avatar_size, contact_color, True, "联系人", texts)
     
     # 标注聊天区域中所有联系人的头像位置和名称（如果提供了）
     if all_contact_avatars_in_chat:
-        logger.info(f"标注聊天区域中 {len(all_contact_avatars_in_chat)} 个联系人的头像信息")
+        logger.info("标注聊天区域中 %s 个联系人的头像信息", len(all_contact_avatars_in_chat))
         chat_contact_color = (0, 255, 128)  # 青绿色，用于区分聊天区域联系人头像
-        
-        for contact_result in all_contact_avatars_in_chat:
-            if not contact_result.locate_result.success:
-                continue
-            
-            x = int(contact_result.locate_result.x or 0)
-            y = int(contact_result.locate_result.y or 0)
-            confidence = contact_result.locate_result.confidence
-            
-            # 绘制聊天区域联系人头像位置（使用不同的颜色和样式）
-            # 绘制外圈（更大的圆圈）
-            cv2.circle(annotated, (x, y), 30, chat_contact_color, 2)
-            
-            # 绘制中心点
-            cv2.circle(annotated, (x, y), 5, chat_contact_color, -1)
-            
-            # 计算边界框
-            size = get_element_size("profile_photo_in_chat")
-            width, height = size
-            left = x - width // 2
-            top = y - height // 2
-            
-            # 绘制边界框（实线，区别于列表区域的虚线）
-            cv2.rectangle(annotated, (left, top), (left + width, top + height), chat_contact_color, 2)
-            
-            # 添加联系人名称标签（在头像右侧）
-            contact_label = f"聊天: {contact_result.contact_name}"
-            if contact_result.contact_id:
-                contact_label += f" (ID: {contact_result.contact_id})"
-            annotated = put_chinese_text(
-                annotated,
-                contact_label,
-                (x + width // 2 + 10, y - 15),
-                font_size=16,
-                color=chat_contact_color
-            )
-            
-            # 添加位置和置信度信息
-            pos_label = f"位置: ({x}, {y})"
-            annotated = put_chinese_text(
-                annotated,
-                pos_label,
-                (x + width // 2 + 10, y + 5),
-                font_size=14,
-                color=chat_contact_color
-            )
-            
-            conf_label = f"置信度: {confidence:.3f}"
-            annotated = put_chinese_text(
-                annotated,
-                conf_label,
-                (x + width // 2 + 10, y + 25),
-                font_size=14,
-                color=chat_contact_color
-            )
-            
-            logger.debug(f"  已标注聊天区域联系人 '{contact_result.contact_name}' 的头像: ({x}, {y})")
+        # 聊天区域用实线边框，区别于列表区域的虚线
+        _draw_contact_batch(annotated, chat_avatars, chat_avatar_size, chat_contact_color, False, "聊天", texts)
     
     # 绘制 three_point_icon 与 sticker_icon 形成的矩形中点（用于 is_chat_at_bottom 等）
     try:
@@ -1971,29 +2156,18 @@ def annotate_all_elements(
             cv2.circle(annotated, (mid_x, mid_y), 12, mid_color, 2)
             cv2.line(annotated, (mid_x - 25, mid_y), (mid_x + 25, mid_y), mid_color, 2)
             cv2.line(annotated, (mid_x, mid_y - 25), (mid_x, mid_y + 25), mid_color, 2)
-            annotated = put_chinese_text(
-                annotated,
-                "three_point-sticker 中点",
-                (mid_x - 60, mid_y - 35),
-                font_size=12,
-                color=mid_color
-            )
-            logger.debug(f"已绘制 three_point-sticker 中点: ({mid_x}, {mid_y})")
+            texts.append(("three_point-sticker 中点", (mid_x - 60, mid_y - 35), 12, mid_color))
+            logger.debug("已绘制 three_point-sticker 中点: (%s, %s)", mid_x, mid_y)
         else:
             logger.debug("未同时定位到 three_point_icon 与 sticker_icon，跳过中点绘制")
     except Exception as e:
-        logger.debug(f"绘制 three_point-sticker 中点失败: {e}")
+        logger.debug("绘制 three_point-sticker 中点失败: %s", e)
     
-    # 保存标注后的图像
+    annotated = put_chinese_texts(annotated, texts)
+    
+    # 保存标注后的图像（后台写盘；复制一份，调用方之后修改返回的图像不影响保存内容）
     if save_path:
-        save_screenshot(
-            annotated,
-            "annotated_all_elements",
-            task_id="element_locator",
-            step_name="annotate_all",
-            error_info=None
-        )
-        logger.info(f"标注图像已保存")
+        _save_annotated_async(annotated.copy())
     
     return annotated
 
@@ -2022,18 +2196,18 @@ def test_locate_all_elements(
     try:
         # 获取窗口句柄
         hwnd = get_wechat_hwnd()
-        logger.info(f"获取到窗口句柄: {hwnd}")
+        logger.info("获取到窗口句柄: %s", hwnd)
         
         # 截取窗口
         screenshot = capture_window(hwnd)
-        logger.info(f"窗口截图尺寸: {screenshot.shape}")
+        logger.info("窗口截图尺寸: %s", screenshot.shape)
         
         # 定位所有元素（如果提供了联系人信息，使用特定联系人的头像模板）
         logger.info("=" * 60)
         logger.info("步骤1: 定位所有UI元素")
         logger.info("=" * 60)
         if contact_name or contact_id:
-            logger.info(f"使用特定联系人头像模板: {contact_name or '未知'}, ID: {contact_id or '未知'}")
+            logger.info("使用特定联系人头像模板: %s, ID: %s", contact_name or '未知', contact_id or '未知')
         else:
             logger.info("使用默认头像模板")
         
@@ -2055,7 +2229,7 @@ def test_locate_all_elements(
                 # 单个结果
                 if result_or_list.success:
                     success_count += 1
-        logger.info(f"定位完成: {success_count} 个元素定位成功（共 {total_count} 个元素类型）")
+        logger.info("定位完成: %s 个元素定位成功（共 %s 个元素类型）", success_count, total_count)
         
         # 显示详细结果
         logger.info("\n详细定位结果:")
@@ -2064,18 +2238,18 @@ def test_locate_all_elements(
                 # 数组类型（如profile_photo_in_chat）
                 if result_or_list:
                     success_count_list = sum(1 for r in result_or_list if r.success)
-                    logger.info(f"  {element_name}: {success_count_list}/{len(result_or_list)} 个成功")
+                    logger.info("  %s: %s/%s 个成功", element_name, success_count_list, len(result_or_list))
                     for i, result in enumerate(result_or_list[:5]):  # 只显示前5个
                         if result.success:
-                            logger.info(f"    [{i}] ({result.x}, {result.y}), 置信度={result.confidence:.3f}")
+                            logger.info("    [%s] (%s, %s), 置信度=%.3f", i, result.x, result.y, result.confidence)
                 else:
-                    logger.info(f"  {element_name}: 未找到（空数组）")
+                    logger.info("  %s: 未找到（空数组）", element_name)
             else:
                 # 单个结果
                 if result_or_list.success:
-                    logger.info(f"  ✓ {element_name}: ({result_or_list.x}, {result_or_list.y}), 置信度={result_or_list.confidence:.3f}")
+                    logger.info("  ✓ %s: (%s, %s), 置信度=%.3f", element_name, result_or_list.x, result_or_list.y, result_or_list.confidence)
                 else:
-                    logger.info(f"  ✗ {element_name}: 定位失败 - {result_or_list.error_message}")
+                    logger.info("  ✗ %s: 定位失败 - %s", element_name, result_or_list.error_message)
         
         # 测试一次性定位所有联系人头像功能（结果会在标注时使用）
         all_contact_results = None
@@ -2086,11 +2260,7 @@ def test_locate_all_elements(
             logger.info("=" * 60)
             try:
                 # 根据环境变量配置的“我”联系人，在测试中排除掉
-                try:
-                    from .contact_mapper import ContactUserMapper as _TestContactUserMapper
-                except ImportError:
-                    from contact_mapper import ContactUserMapper as _TestContactUserMapper
-                _mapper_for_test = _TestContactUserMapper()
+                _mapper_for_test = ContactUserMapper()
                 me_contact = _mapper_for_test.get_me_contact_name()
                 exclude_for_test = [me_contact] if me_contact else None
 
@@ -2103,13 +2273,13 @@ def test_locate_all_elements(
                 )
                 
                 if all_contact_results:
-                    logger.info(f"✓ 成功定位 {len(all_contact_results)} 个联系人的头像（列表区域）:")
+                    logger.info("✓ 成功定位 %s 个联系人的头像（列表区域）:", len(all_contact_results))
                     for contact_result in all_contact_results:
-                        logger.info(f"  联系人: {contact_result.contact_name}")
-                        logger.info(f"    位置: ({contact_result.locate_result.x}, {contact_result.locate_result.y})")
-                        logger.info(f"    置信度: {contact_result.locate_result.confidence:.3f}")
+                        logger.info("  联系人: %s", contact_result.contact_name)
+                        logger.info("    位置: (%s, %s)", contact_result.locate_result.x, contact_result.locate_result.y)
+                        logger.info("    置信度: %.3f", contact_result.locate_result.confidence)
                         if contact_result.contact_id:
-                            logger.info(f"    联系人ID: {contact_result.contact_id}")
+                            logger.info("    联系人ID: %s", contact_result.contact_id)
                 else:
                     logger.warning("✗ 未找到任何联系人的头像（列表区域）")
                 
@@ -2123,17 +2293,17 @@ def test_locate_all_elements(
                 )
                 
                 if all_contact_results_in_chat:
-                    logger.info(f"✓ 成功定位 {len(all_contact_results_in_chat)} 个联系人的头像（聊天区域）:")
+                    logger.info("✓ 成功定位 %s 个联系人的头像（聊天区域）:", len(all_contact_results_in_chat))
                     for contact_result in all_contact_results_in_chat:
-                        logger.info(f"  联系人: {contact_result.contact_name}")
-                        logger.info(f"    位置: ({contact_result.locate_result.x}, {contact_result.locate_result.y})")
-                        logger.info(f"    置信度: {contact_result.locate_result.confidence:.3f}")
+                        logger.info("  联系人: %s", contact_result.contact_name)
+                        logger.info("    位置: (%s, %s)", contact_result.locate_result.x, contact_result.locate_result.y)
+                        logger.info("    置信度: %.3f", contact_result.locate_result.confidence)
                         if contact_result.contact_id:
-                            logger.info(f"    联系人ID: {contact_result.contact_id}")
+                            logger.info("    联系人ID: %s", contact_result.contact_id)
                 else:
                     logger.warning("✗ 未找到任何联系人的头像（聊天区域）")
             except Exception as e:
-                logger.error(f"测试一次性定位所有联系人头像失败: {e}")
+                logger.error("测试一次性定位所有联系人头像失败: %s", e)
                 import traceback
                 traceback.print_exc()
         
@@ -2163,7 +2333,7 @@ def test_locate_all_elements(
         return positions
         
     except Exception as e:
-        logger.error(f"测试失败: {e}")
+        logger.error("测试失败: %s", e)
         import traceback
         traceback.print_exc()
         return {}
@@ -2244,6 +2414,46 @@ def get_contact_name_roi(
     return (roi_x, roi_y, roi_width, roi_height)
 
 
+# get_contact_name 两次 OCR 重试之间的间隔（秒），给窗口重绘留时间
+_CONTACT_NAME_RETRY_DELAY = 0.3
+
+# 预取重试截图用的后台线程（全局单例，按需创建）
+_capture_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_capture_pool() -> ThreadPoolExecutor:
+    """获取预取截图线程池（全局单例）"""
+    global _capture_pool
+    if _capture_pool is None:
+        _capture_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wechat-capture")
+    return _capture_pool
+
+
+def _capture_after(delay: float, stop: threading.Event) -> Optional[np.ndarray]:
+    """等待 delay 秒后截取微信窗口；等待期间 stop 被置位则放弃截图并返回 None"""
+    if stop.wait(delay):
+        return None
+    return capture_window(get_wechat_hwnd())
+
+
+# 联系人名字区域像素摘要 -> (识别出的名字, 连续识别为同一名字的次数)，按最近使用排序（LRU）
+# 轮询时标题栏名字区域逐像素不变，确认过的名字直接复用，不再 OCR
+_contact_name_cache: "OrderedDict[bytes, Tuple[str, int]]" = OrderedDict()
+_contact_name_cache_lock = threading.Lock()
+_CONTACT_NAME_CACHE_SIZE = 64
+# 同一区域至少连续两次识别出相同名字才直接复用，避免把一次误识别固化下来
+_CONTACT_NAME_CACHE_MIN_HITS = 2
+
+
+def _contact_name_roi_digest(screenshot: np.ndarray, roi: Tuple[int, int, int, int]) -> bytes:
+    """联系人名字区域的像素摘要（区域尺寸 + 像素内容），内容完全相同才相等"""
+    roi_x, roi_y, roi_width, roi_height = roi
+    region = np.ascontiguousarray(screenshot[max(roi_y, 0):roi_y + roi_height, max(roi_x, 0):roi_x + roi_width])
+    digest = hashlib.blake2b(repr(region.shape).encode(), digest_size=16)
+    digest.update(region.data)
+    return digest.digest()
+
+
 def get_contact_name(
     screenshot: Optional[np.ndarray] = None,
     positions: Optional[Dict[str, Union[LocateResult, List[LocateResult]]]] = None,
@@ -2257,6 +2467,7 @@ def get_contact_name(
     
     为提高稳定性会进行重试：若首次 OCR 未识别到有效中文，会重新截屏再识别（最多 max_ocr_retries 次），
     避免窗口刚恢复时截图未完全重绘导致识别失败。
+    名字区域与之前连续两次识别出同一名字的区域逐像素相同时，直接返回该名字，不再 OCR。
     当 prefer_aliyun=True 时强制使用阿里云 OCR（用于轮询时联系人名校验）。
     
     Args:
@@ -2270,43 +2481,70 @@ def get_contact_name(
     Returns:
         联系人名字（字符串），如果没有打开聊天界面或识别失败则返回None
     """
-    import time
     last_error: Optional[str] = None
-    for attempt in range(max_ocr_retries):
-        # 首次且调用方已传截图则用传入的；否则或重试时重新截屏
-        if attempt == 0 and screenshot is not None:
-            shot = screenshot
-        else:
+    # 下一次重试用的截图：OCR 进行期间在后台等待重试间隔后预先截取
+    prefetched: Optional[Tuple[Future, threading.Event]] = None
+    try:
+        for attempt in range(max_ocr_retries):
+            has_next = attempt < max_ocr_retries - 1
+            # 首次且调用方已传截图则用传入的；否则或重试时重新截屏（有预取的截图则直接用）
+            if attempt == 0 and screenshot is not None:
+                shot = screenshot
+            else:
+                try:
+                    if prefetched is not None:
+                        shot = prefetched[0].result()
+                    else:
+                        shot = capture_window(get_wechat_hwnd())
+                except Exception as e:
+                    logger.error("获取窗口截图失败: %s", e)
+                    last_error = str(e)
+                    if has_next:
+                        time.sleep(_CONTACT_NAME_RETRY_DELAY)
+                    continue
+                finally:
+                    prefetched = None
+            pos = positions if (positions is not None and attempt == 0) else locate_all_elements(
+                shot, contact_name=contact_name, contact_id=contact_id
+            )
+            roi = get_contact_name_roi(pos)
+            if roi is None:
+                logger.debug("无法获取联系人名字区域，可能没有打开聊天界面")
+                if has_next:
+                    time.sleep(_CONTACT_NAME_RETRY_DELAY)
+                continue
+            roi_digest = _contact_name_roi_digest(shot, roi)
+            with _contact_name_cache_lock:
+                cached = _contact_name_cache.get(roi_digest)
+                if cached is not None and cached[1] >= _CONTACT_NAME_CACHE_MIN_HITS:
+                    _contact_name_cache.move_to_end(roi_digest)
+                    logger.debug("联系人名字区域与已确认的识别结果一致，直接复用: '%s'", cached[0])
+                    return cached[0]
+            # OCR（Tesseract 子进程 / 阿里云网络请求）期间后台等待重试间隔并截好下一张，识别失败时不必再干等
+            if has_next:
+                stop = threading.Event()
+                prefetched = (_get_capture_pool().submit(_capture_after, _CONTACT_NAME_RETRY_DELAY, stop), stop)
             try:
-                hwnd = get_wechat_hwnd()
-                shot = capture_window(hwnd)
+                text = ocr_region(shot, roi, save_preprocessed=False, expect_chinese=True, prefer_aliyun=prefer_aliyun)
+                if text:
+                    text = text.strip()
+                    if text:
+                        logger.debug("识别到联系人名字: '%s'", text)
+                        with _contact_name_cache_lock:
+                            previous = _contact_name_cache.get(roi_digest)
+                            hits = previous[1] + 1 if previous is not None and previous[0] == text else 1
+                            _contact_name_cache[roi_digest] = (text, hits)
+                            _contact_name_cache.move_to_end(roi_digest)
+                            if len(_contact_name_cache) > _CONTACT_NAME_CACHE_SIZE:
+                                _contact_name_cache.popitem(last=False)
+                        return text
             except Exception as e:
-                logger.error(f"获取窗口截图失败: {e}")
+                logger.debug("OCR识别异常（尝试 %s/%s）: %s", attempt + 1, max_ocr_retries, e)
                 last_error = str(e)
-                if attempt < max_ocr_retries - 1:
-                    time.sleep(0.3)
-                continue
-        pos = positions if (positions is not None and attempt == 0) else locate_all_elements(
-            shot, contact_name=contact_name, contact_id=contact_id
-        )
-        roi = get_contact_name_roi(pos)
-        if roi is None:
-            logger.debug("无法获取联系人名字区域，可能没有打开聊天界面")
-            if attempt < max_ocr_retries - 1:
-                time.sleep(0.3)
-            continue
-        try:
-            text = ocr_region(shot, roi, save_preprocessed=False, expect_chinese=True, prefer_aliyun=prefer_aliyun)
-            if text:
-                text = text.strip()
-                if text:
-                    logger.debug(f"识别到联系人名字: '{text}'")
-                    return text
-        except Exception as e:
-            logger.debug(f"OCR识别异常（尝试 {attempt + 1}/{max_ocr_retries}）: {e}")
-            last_error = str(e)
-        if attempt < max_ocr_retries - 1:
-            time.sleep(0.3)
+    finally:
+        # 已识别成功或提前退出时，通知尚在等待的预取任务不再截图
+        if prefetched is not None:
+            prefetched[1].set()
     logger.warning("OCR未识别到文字（已重试 %d 次）", max_ocr_retries)
     if last_error:
         logger.debug(f"最后错误: {last_error}")
@@ -2432,13 +2670,11 @@ def is_chat_at_bottom(hwnd: Optional[int] = None, scroll_amount: int = 3, wait_a
     Returns:
         True 表示已在最下面（再向下滚动无新内容），False 表示还能向下滚动
     """
-    import time
     try:
+        # actions 依赖 pyautogui，仅滚动时需要，保持按需导入
         try:
-            from .screen import get_wechat_hwnd, capture_window, get_window_client_bbox
             from .actions import scroll_at
         except ImportError:
-            from screen import get_wechat_hwnd, capture_window, get_window_client_bbox
             from actions import scroll_at
         if hwnd is None:
             hwnd = get_wechat_hwnd()
@@ -2460,7 +2696,14 @@ def is_chat_at_bottom(hwnd: Optional[int] = None, scroll_amount: int = 3, wait_a
         after = capture_window(hwnd)
         if after is None or after.shape != before.shape:
             return False
-        if before.tobytes() == after.tobytes():
+        # 只比较聊天区域（滚动只影响这里），直接比较数组，不生成整图字节串；定位不到聊天区域时比较整图
+        chat_roi = get_chat_area_roi(positions, image_width=before.shape[1])
+        if chat_roi is not None:
+            roi_x, roi_y, roi_w, roi_h = chat_roi
+            rows = slice(max(roi_y, 0), roi_y + roi_h)
+            cols = slice(max(roi_x, 0), roi_x + roi_w)
+            before, after = before[rows, cols], after[rows, cols]
+        if np.array_equal(before, after):
             logger.debug("is_chat_at_bottom: 滚动前后画面一致，判定为已在底部")
             return True
         logger.debug("is_chat_at_bottom: 滚动后画面有变化，未在底部")
@@ -2482,6 +2725,132 @@ def _get_state_manager() -> ChatStateManager:
     return _global_state_manager
 
 
+# pHash 参数（与 imagehash.phash 默认一致：32x32 缩放，取 8x8 低频 DCT 系数）
+_PHASH_IMG_SIZE = 32
+_PHASH_HASH_SIZE = 8
+_SQRT2 = float(np.sqrt(2.0))
+
+
+def _compute_roi_phash(screenshot: np.ndarray, roi: Tuple[int, int, int, int]) -> str:
+    """
+    计算截图中 ROI 区域的感知哈希（pHash），返回 16 位十六进制字符串
+    
+    算法与 imagehash.phash 相同（灰度 → 32x32 → 2D DCT-II → 8x8 低频与中位数比较），
+    位序和十六进制格式一致，可与 imagehash.hex_to_hash 互通；
+    但全程使用 OpenCV（INTER_AREA 缩放 + cv2.dct），避免 BGR→RGB 整图转换、PIL 对象拷贝和 Lanczos 缩放。
+    缩放插值不同，结果与 imagehash 并不逐位相同：在界面截图样本上平均相差约 1.3 位，
+    个别区域可达 6～10 位，会达到默认 hash_threshold（8）。因此基线的保存与比较必须都用本函数；
+    升级前由 imagehash 保存的基线在首次比较时可能被判为有变化（多读一次，不会漏读）。
+    
+    Args:
+        screenshot: BGR 截图
+        roi: (x, y, width, height)
+    
+    Returns:
+        pHash 十六进制字符串
+    """
+    roi_x, roi_y, roi_width, roi_height = roi
+    roi_image = screenshot[roi_y:roi_y + roi_height, roi_x:roi_x + roi_width]
+    gray = cv2.cvtColor(roi_image, cv2.COLOR_BGR2GRAY) if roi_image.ndim == 3 else roi_image
+    small = cv2.resize(
+        gray, (_PHASH_IMG_SIZE, _PHASH_IMG_SIZE), interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+    dct = cv2.dct(small)
+    # cv2.dct 为正交归一化；首行/首列乘 sqrt(2) 还原为与 scipy 非归一化 DCT 同比例，保证中位数比较一致
+    low_freq = dct[:_PHASH_HASH_SIZE, :_PHASH_HASH_SIZE]
+    low_freq[0, :] *= _SQRT2
+    low_freq[:, 0] *= _SQRT2
+    bits = low_freq > np.median(low_freq)
+    return np.packbits(bits).tobytes().hex()
+
+
+# 非归一化 DCT-II 矩阵（与 scipy.fftpack.dct 同比例），用于 batch_phash 中整批 ROI 的矩阵形式 DCT
+_PHASH_DCT_MATRIX = np.cos(
+    np.pi * np.outer(np.arange(_PHASH_IMG_SIZE), 2 * np.arange(_PHASH_IMG_SIZE) + 1) / (2 * _PHASH_IMG_SIZE)
+)
+
+
+def batch_phash(screenshot: np.ndarray, rois: List[Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    一次性计算截图中多个 ROI 的感知哈希
+    
+    整图只做一次灰度转换；各 ROI 缩放到 32x32 后堆叠，整批做矩阵形式的 2D DCT、
+    按行取中位数并打包为 uint64。结果与 _compute_roi_phash 的十六进制值一一对应（f"{h:016x}"）。
+    
+    Args:
+        screenshot: BGR 截图
+        rois: ROI 列表，每项为 (x, y, width, height)
+    
+    Returns:
+        uint64 数组，与 rois 一一对应
+    """
+    if not rois:
+        return np.zeros(0, dtype=np.uint64)
+    gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY) if screenshot.ndim == 3 else screenshot
+    stack = np.empty((len(rois), _PHASH_IMG_SIZE, _PHASH_IMG_SIZE), dtype=np.float64)
+    for i, (roi_x, roi_y, roi_width, roi_height) in enumerate(rois):
+        stack[i] = cv2.resize(
+            gray[roi_y:roi_y + roi_height, roi_x:roi_x + roi_width],
+            (_PHASH_IMG_SIZE, _PHASH_IMG_SIZE),
+            interpolation=cv2.INTER_AREA,
+        )
+    dct = _PHASH_DCT_MATRIX @ stack @ _PHASH_DCT_MATRIX.T
+    low_freq = dct[:, :_PHASH_HASH_SIZE, :_PHASH_HASH_SIZE].reshape(len(rois), -1)
+    bits = low_freq > np.median(low_freq, axis=1, keepdims=True)
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def get_contact_row_rois(
+    screenshot: np.ndarray,
+    positions: Dict[str, Union[LocateResult, List[LocateResult]]],
+    contact_mapper: Optional[ContactUserMapper] = None,
+    threshold: float = 0.7,
+) -> Dict[str, Tuple[int, int, int, int]]:
+    """
+    获取联系人列表中每个可见联系人所在行的 ROI（头像 + 昵称/预览/时间/红点）
+    
+    行区域：左界 = 头像左界，右界 = 搜索框右界，上下界 = 头像上下界。
+    同一联系人出现多次时取置信度最高的一处。
+    
+    Args:
+        screenshot: 窗口截图（BGR格式）
+        positions: 元素位置字典（需包含 search_bar）
+        contact_mapper: 联系人映射器实例（可选）
+        threshold: 头像模板匹配阈值
+    
+    Returns:
+        {联系人名称: (x, y, width, height)}，未定位到搜索框时返回空字典
+    """
+    search_bar_result = _get_single_result(positions, "search_bar")
+    if not search_bar_result or not search_bar_result.success:
+        return {}
+    img_h, img_w = screenshot.shape[:2]
+    sb_w = (get_element_size("search_bar") or (180, 40))[0]
+    row_right = min(img_w, int(search_bar_result.x or 0) + sb_w // 2)
+    avatar_w, avatar_h = get_element_size("profile_photo_in_list")
+    
+    avatars = locate_all_contact_avatars_in_list(
+        screenshot=screenshot,
+        threshold=threshold,
+        contact_mapper=contact_mapper,
+        enabled_contacts_only=False,
+    )
+    avatars.sort(key=lambda c: c.locate_result.confidence, reverse=True)
+    
+    rois: Dict[str, Tuple[int, int, int, int]] = {}
+    for item in avatars:
+        r = item.locate_result
+        if item.contact_name in rois or r.x is None or r.y is None:
+            continue
+        left = max(0, r.x - avatar_w // 2)
+        top = max(0, r.y - avatar_h // 2)
+        width = row_right - left
+        height = min(avatar_h, img_h - top)
+        if width > 0 and height > 0:
+            rois[item.contact_name] = (left, top, width, height)
+    return rois
+
+
 def get_current_chat_hash(
     contact_name: Optional[str] = None,
     screenshot: Optional[np.ndarray] = None,
@@ -2498,8 +2867,6 @@ def get_current_chat_hash(
     Returns:
         当前聊天区 ROI 的 pHash 字符串，若无法计算则返回 None
     """
-    if not IMAGEHASH_AVAILABLE:
-        return None
     try:
         if screenshot is None:
             hwnd = get_wechat_hwnd()
@@ -2510,13 +2877,7 @@ def get_current_chat_hash(
         roi = get_chat_area_roi(positions, image_width=img_w)
         if roi is None:
             return None
-        from PIL import Image as _PILImage
-        import imagehash as _imagehash
-        roi_x, roi_y, roi_width, roi_height = roi
-        roi_image = screenshot[roi_y:roi_y + roi_height, roi_x:roi_x + roi_width]
-        roi_pil = _PILImage.fromarray(cv2.cvtColor(roi_image, cv2.COLOR_BGR2RGB))
-        current_hash = _imagehash.phash(roi_pil)
-        return str(current_hash)
+        return _compute_roi_phash(screenshot, roi)
     except Exception as e:
         logger.debug("get_current_chat_hash 失败: %s", e)
         return None
@@ -2558,12 +2919,8 @@ def save_chat_state(
         # 获取状态管理器
         manager = state_manager if state_manager is not None else _get_state_manager()
         
-        # 如果没有提供截图，自动截取（支持包内/独立目录两种运行方式）
+        # 如果没有提供截图，自动截取
         if screenshot is None:
-            try:
-                from .screen import get_wechat_hwnd, capture_window
-            except ImportError:
-                from screen import get_wechat_hwnd, capture_window
             hwnd = get_wechat_hwnd()
             screenshot = capture_window(hwnd)
         
@@ -2579,15 +2936,8 @@ def save_chat_state(
             return False
         
         # 计算聊天区域的感知哈希
-        chat_hash = None
-        if IMAGEHASH_AVAILABLE:
-            from PIL import Image as _PILImage
-            import imagehash as _imagehash
-            roi_x, roi_y, roi_width, roi_height = roi
-            roi_image = screenshot[roi_y:roi_y+roi_height, roi_x:roi_x+roi_width]
-            roi_pil = _PILImage.fromarray(cv2.cvtColor(roi_image, cv2.COLOR_BGR2RGB))
-            chat_hash = str(_imagehash.phash(roi_pil))
-            logger.debug(f"保存联系人 '{contact_name or '默认'}' 的聊天区域hash: {chat_hash[:16]}...")
+        chat_hash = _compute_roi_phash(screenshot, roi)
+        logger.debug(f"保存联系人 '{contact_name or '默认'}' 的聊天区域hash: {chat_hash[:16]}...")
         
         # 保存头像y位置（仅保留非 None 的 y 坐标）
         profile_photo_in_chat = positions.get("profile_photo_in_chat")
@@ -2665,20 +3015,12 @@ def has_new_message(
         # 使用默认状态（向后兼容）
         has_new = has_new_message()
     """
-    if not IMAGEHASH_AVAILABLE:
-        logger.warning("imagehash未安装，无法使用视觉指纹检测新消息；降级为「假定可能有新消息」以便 poll 仍会尝试读取")
-        return True  # 降级：让 message_channel 仍尝试读取，避免 CLI read 永远返回「暂无新消息」
-    
     try:
         # 获取状态管理器
         manager = state_manager if state_manager is not None else _get_state_manager()
         
-        # 如果没有提供截图，自动截取（支持包内/独立目录两种运行方式）
+        # 如果没有提供截图，自动截取
         if screenshot is None:
-            try:
-                from .screen import get_wechat_hwnd, capture_window
-            except ImportError:
-                from screen import get_wechat_hwnd, capture_window
             hwnd = get_wechat_hwnd()
             screenshot = capture_window(hwnd)
         
@@ -2694,13 +3036,7 @@ def has_new_message(
             return False
         
         # 计算当前聊天区域的感知哈希
-        from PIL import Image as _PILImage
-        import imagehash as _imagehash
-        roi_x, roi_y, roi_width, roi_height = roi
-        roi_image = screenshot[roi_y:roi_y+roi_height, roi_x:roi_x+roi_width]
-        roi_pil = _PILImage.fromarray(cv2.cvtColor(roi_image, cv2.COLOR_BGR2RGB))
-        current_hash = _imagehash.phash(roi_pil)
-        current_hash_str = str(current_hash)
+        current_hash_str = _compute_roi_phash(screenshot, roi)
         
         # 获取当前头像y位置（仅保留非 None 的 y 坐标）
         profile_photo_in_chat = positions.get("profile_photo_in_chat")
@@ -2754,12 +3090,8 @@ def has_new_message_by_red_point(
         是否有新消息（True表示有新消息，False表示没有新消息）
     """
     try:
-        # 如果没有提供截图，自动截取（支持包内/独立目录两种运行方式）
+        # 如果没有提供截图，自动截取
         if screenshot is None:
-            try:
-                from .screen import get_wechat_hwnd, capture_window
-            except ImportError:
-                from screen import get_wechat_hwnd, capture_window
             hwnd = get_wechat_hwnd()
             screenshot = capture_window(hwnd)
         
@@ -2813,19 +3145,11 @@ def get_contacts_with_new_message_red_point(
     Returns:
         存在新消息红点的联系人名称列表（可能为空或包含多个）。
     """
-    try:
-        from .config import WeChatAutomationConfig as _config
-    except ImportError:
-        from config import WeChatAutomationConfig as _config
     ratio_threshold: float = (
-        threshold if threshold is not None else getattr(_config, "RED_POINT_AREA_RATIO_THRESHOLD", 0.7)
+        threshold if threshold is not None else getattr(WeChatAutomationConfig, "RED_POINT_AREA_RATIO_THRESHOLD", 0.7)
     )
 
     if screenshot is None:
-        try:
-            from .screen import get_wechat_hwnd, capture_window
-        except ImportError:
-            from screen import get_wechat_hwnd, capture_window
         hwnd = get_wechat_hwnd()
         screenshot = capture_window(hwnd)
 
@@ -2834,10 +3158,6 @@ def get_contacts_with_new_message_red_point(
         return []
 
     if contact_mapper is None:
-        try:
-            from .contact_mapper import ContactUserMapper
-        except ImportError:
-            from contact_mapper import ContactUserMapper
         contact_mapper = ContactUserMapper()
 
     contact_avatars = locate_all_contact_avatars_in_list(
@@ -2852,26 +3172,18 @@ def get_contacts_with_new_message_red_point(
 
     avatar_size = get_element_size("profile_photo_in_list")
     avatar_radius = (avatar_size[0] if avatar_size else 50) // 2
-    search_radius = 10
-    h_img, w_img = screenshot.shape[:2]
     contact_names_with_red_point: List[str] = []
 
-    for contact_result in contact_avatars:
-        avatar_x = contact_result.locate_result.x or 0
-        avatar_y = contact_result.locate_result.y or 0
-        contact_name = contact_result.contact_name
-        top_right_x = avatar_x + avatar_radius
-        top_right_y = avatar_y - avatar_radius
-        search_left = max(0, int(top_right_x - search_radius))
-        search_right = min(w_img, int(top_right_x + search_radius))
-        search_top = max(0, int(top_right_y - search_radius))
-        search_bottom = min(h_img, int(top_right_y + search_radius))
-        if search_right <= search_left or search_bottom <= search_top:
-            continue
-        ratio, cx, cy = _red_pixel_ratio_in_region(
-            screenshot, search_left, search_top, search_right, search_bottom
-        )
+    # 各头像右上角的检测区域一次性算出，整批计算红色占比
+    avatars = ContactAvatarArray.from_results(contact_avatars)
+    scanned, boxes = _red_point_search_boxes(avatars, avatar_radius, screenshot.shape)
+    red_ratios = _red_pixel_ratios_in_regions(
+        screenshot, [tuple(box) for box in boxes.tolist()], min_ratio=ratio_threshold
+    )
+
+    for i, (ratio, cx, cy) in zip(scanned.tolist(), red_ratios):
         if ratio >= ratio_threshold:
+            contact_name = avatars.names[i]
             contact_names_with_red_point.append(contact_name)
             logger.debug(
                 f"[新消息红点] 联系人 {contact_name} 红色占比={ratio:.2%} >= {ratio_threshold:.0%}, 判定有红点: ({cx}, {cy})"
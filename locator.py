@@ -5,8 +5,13 @@
 核心功能：
 - match_template(): 基础模板匹配（被match_all_templates内部使用）
 - match_all_templates(): 多模板匹配（亮/暗主题、不同版本）
+- load_template_gray(): 加载灰度模板（按路径+修改时间缓存，模板文件更新后自动重新加载）
+- frame_scope(): 声明一段只读使用同一截图的定位过程，期间灰度图、响应图等按帧缓存
+- to_gray(): 截图转灰度（frame_scope 内同一截图只转换一次）
+- match_response(): 整图模板匹配响应图（frame_scope 内同一截图、同一模板只计算一次）
 - ocr_region(): 区域OCR识别
 - put_chinese_text(): 在图像上绘制中文文本
+- put_chinese_texts(): 一次绘制多段中文文本（整图只转换一次）
 
 注意事项：
 1. 模板匹配是最可靠的方法，优先使用
@@ -23,8 +28,11 @@
 
 import cv2
 import numpy as np
+import functools
 import json
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
 from pathlib import Path
@@ -33,13 +41,13 @@ from pathlib import Path
 try:
     from .models import LocateResult, LocateMethod
     from .screen import save_screenshot, crop_region
-    from .config import WeChatAutomationConfig
+    from .config import WeChatAutomationConfig, ensure_dotenv_loaded
 except ImportError:
     import sys
     sys.path.insert(0, str(Path(__file__).parent))
     from models import LocateResult, LocateMethod
     from screen import save_screenshot, crop_region
-    from config import WeChatAutomationConfig
+    from config import WeChatAutomationConfig, ensure_dotenv_loaded
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +63,84 @@ except ImportError:
     logger.warning("PIL/Pillow 未安装，中文文本标注功能将不可用")
 
 
+# 标注只用到少数几种字号，按字号缓存字体对象，避免每段文字都重新查找并解析字体文件
+@functools.lru_cache(maxsize=16)
+def _load_chinese_font(font_size: int):
+    """加载指定字号的中文字体（Windows 常见中文字体），找不到时返回 PIL 默认字体（可能不支持中文）"""
+    try:
+        # 尝试使用Windows系统字体
+        import platform
+        if platform.system() == 'Windows':
+            # Windows常见中文字体路径
+            font_paths = [
+                'C:/Windows/Fonts/msyh.ttc',  # 微软雅黑
+                'C:/Windows/Fonts/simsun.ttc',  # 宋体
+                'C:/Windows/Fonts/simhei.ttf',  # 黑体
+            ]
+            for font_path in font_paths:
+                if Path(font_path).exists():
+                    try:
+                        return ImageFont.truetype(font_path, font_size)
+                    except:
+                        continue
+    except:
+        pass
+    
+    # 如果没有找到字体，使用默认字体（可能不支持中文）
+    return ImageFont.load_default()
+
+
+def _put_texts(image: np.ndarray, items: List[Tuple[Any, ...]]) -> np.ndarray:
+    """
+    按 (text, position, font_size, color, stroke_width, stroke_fill) 列表绘制文本：
+    整图只做一次 BGR -> PIL -> BGR 转换；PIL 不可用或绘制失败时逐条回退到 cv2.putText
+    """
+    def put_with_cv2() -> np.ndarray:
+        for text, position, font_size, color, stroke_width, _ in items:
+            cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, 
+                       font_size / 20.0, color, max(1, stroke_width))
+        return image
+    
+    if not items:
+        return image
+    
+    if not PIL_AVAILABLE or Image is None or ImageDraw is None or ImageFont is None:
+        # 如果PIL不可用，使用cv2.putText绘制（可能无法显示中文）
+        logger.warning("PIL不可用，使用cv2.putText绘制文本（可能无法显示中文）")
+        return put_with_cv2()
+    
+    try:
+        # 将OpenCV图像（BGR）转换为PIL图像（RGB）
+        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        draw = ImageDraw.Draw(pil_image)
+        
+        for text, position, font_size, color, stroke_width, stroke_fill in items:
+            # 转换颜色格式（BGR -> RGB）
+            rgb_color = (color[2], color[1], color[0])
+            rgb_stroke_fill = None
+            if stroke_fill is not None:
+                rgb_stroke_fill = (stroke_fill[2], stroke_fill[1], stroke_fill[0])
+            
+            # 绘制文本
+            draw.text(
+                position,
+                text,
+                font=_load_chinese_font(font_size),
+                fill=rgb_color,
+                stroke_width=stroke_width,
+                stroke_fill=rgb_stroke_fill
+            )
+        
+        # 将PIL图像（RGB）转换回OpenCV图像（BGR）
+        image_with_text = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        return image_with_text
+        
+    except Exception as e:
+        logger.warning(f"使用PIL绘制中文文本失败: {e}，回退到cv2.putText")
+        # 回退到cv2.putText（可能无法显示中文）
+        return put_with_cv2()
+
+
 def put_chinese_text(
     image: np.ndarray,
     text: str,
@@ -79,70 +165,26 @@ def put_chinese_text(
     Returns:
         绘制了文本的图像（BGR格式，numpy数组）
     """
-    if not PIL_AVAILABLE or Image is None or ImageDraw is None or ImageFont is None:
-        # 如果PIL不可用，使用cv2.putText绘制（可能无法显示中文）
-        logger.warning("PIL不可用，使用cv2.putText绘制文本（可能无法显示中文）")
-        cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, 
-                   font_size / 20.0, color, max(1, stroke_width))
-        return image
+    return _put_texts(image, [(text, position, font_size, color, stroke_width, stroke_fill)])
+
+
+def put_chinese_texts(
+    image: np.ndarray,
+    items: List[Tuple[str, Tuple[int, int], int, Tuple[int, int, int]]],
+) -> np.ndarray:
+    """
+    在OpenCV图像上一次绘制多段中文文本
     
-    try:
-        # 将OpenCV图像（BGR）转换为PIL图像（RGB）
-        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(pil_image)
-        
-        # 尝试加载中文字体
-        font = None
-        try:
-            # 尝试使用Windows系统字体
-            import platform
-            if platform.system() == 'Windows':
-                # Windows常见中文字体路径
-                font_paths = [
-                    'C:/Windows/Fonts/msyh.ttc',  # 微软雅黑
-                    'C:/Windows/Fonts/simsun.ttc',  # 宋体
-                    'C:/Windows/Fonts/simhei.ttf',  # 黑体
-                ]
-                for font_path in font_paths:
-                    if Path(font_path).exists():
-                        try:
-                            font = ImageFont.truetype(font_path, font_size)
-                            break
-                        except:
-                            continue
-        except:
-            pass
-        
-        # 如果没有找到字体，使用默认字体（可能不支持中文）
-        if font is None:
-            font = ImageFont.load_default()
-        
-        # 转换颜色格式（BGR -> RGB）
-        rgb_color = (color[2], color[1], color[0])
-        rgb_stroke_fill = None
-        if stroke_fill is not None:
-            rgb_stroke_fill = (stroke_fill[2], stroke_fill[1], stroke_fill[0])
-        
-        # 绘制文本
-        draw.text(
-            position,
-            text,
-            font=font,
-            fill=rgb_color,
-            stroke_width=stroke_width,
-            stroke_fill=rgb_stroke_fill
-        )
-        
-        # 将PIL图像（RGB）转换回OpenCV图像（BGR）
-        image_with_text = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-        return image_with_text
-        
-    except Exception as e:
-        logger.warning(f"使用PIL绘制中文文本失败: {e}，回退到cv2.putText")
-        # 回退到cv2.putText（可能无法显示中文）
-        cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, 
-                   font_size / 20.0, color, max(1, stroke_width))
-        return image
+    与逐条调用 put_chinese_text 效果相同，但整图只做一次 PIL 转换，标注文字较多时用这个。
+    
+    Args:
+        image: OpenCV图像（BGR格式，numpy数组）
+        items: (text, position, font_size, color) 列表，各字段含义同 put_chinese_text
+    
+    Returns:
+        绘制了文本的图像（BGR格式，numpy数组）
+    """
+    return _put_texts(image, [(text, position, font_size, color, 0, None) for text, position, font_size, color in items])
 
 
 # OCR 可选依赖
@@ -152,7 +194,8 @@ try:
     import os
     
     # 配置 Tesseract 路径
-    # 方法1：从环境变量读取
+    # 方法1：从环境变量（含 .env）读取
+    ensure_dotenv_loaded()
     tesseract_path = os.getenv('TESSERACT_CMD')
     if tesseract_path and os.path.exists(tesseract_path):
         pytesseract.pytesseract.tesseract_cmd = tesseract_path
@@ -251,10 +294,226 @@ class LocateError(Exception):
     pass
 
 
+# 界面元素模板（约 30 个）加上每个联系人一个头像模板；容量须覆盖全部，否则轮询时按固定顺序访问会让 LRU 每次都未命中
+@functools.lru_cache(maxsize=512)
+def _load_template_gray(path_str: str, mtime_ns: int) -> Optional[np.ndarray]:
+    """读取模板并转为灰度图（mtime_ns 仅作为缓存键，文件修改后缓存自然失效）"""
+    template = cv2.imread(path_str)
+    if template is None:
+        return None
+    template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY) if template.ndim == 3 else template
+    # 缓存对象被多次复用，禁止原地修改
+    template_gray.setflags(write=False)
+    return template_gray
+
+
+def load_template_gray(template_path: Path) -> Optional[np.ndarray]:
+    """
+    加载灰度模板（缓存，避免每次定位都重新解码 PNG）
+    
+    Args:
+        template_path: 模板文件路径
+    
+    Returns:
+        只读的灰度模板图像，文件不存在或无法解码时返回 None
+    """
+    try:
+        mtime_ns = template_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _load_template_gray(str(template_path), mtime_ns)
+
+
+# 进行中的帧作用域：{id(截图): [截图, 嵌套层数, 缓存字典]}。持有截图引用，保证 id 不会被回收后复用；
+# 作用域结束即丢弃缓存，调用方之后原地修改或重新填充同一数组也不会命中旧结果
+_frame_scopes: Dict[int, list] = {}
+_frame_scopes_lock = threading.Lock()
+
+
+@contextmanager
+def frame_scope(image: np.ndarray):
+    """
+    在 with 块内把 image 视为只读的同一帧：to_gray、match_response 等对它的结果按帧缓存
+    
+    可嵌套、可跨线程共享（线程池中的匹配任务能看到发起线程打开的作用域）；
+    最外层退出时释放缓存。块内不得原地修改 image。
+    """
+    key = id(image)
+    with _frame_scopes_lock:
+        entry = _frame_scopes.get(key)
+        if entry is not None and entry[0] is image:
+            entry[1] += 1
+        else:
+            _frame_scopes[key] = [image, 1, {}]
+    try:
+        yield
+    finally:
+        with _frame_scopes_lock:
+            entry = _frame_scopes.get(key)
+            if entry is not None and entry[0] is image:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del _frame_scopes[key]
+
+
+def frame_cache(image: np.ndarray) -> Optional[Dict[Any, Any]]:
+    """返回 image 所在帧作用域的缓存字典；不在 frame_scope 内时返回 None（调用方不缓存）"""
+    with _frame_scopes_lock:
+        entry = _frame_scopes.get(id(image))
+        if entry is not None and entry[0] is image:
+            return entry[2]
+    return None
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """
+    BGR 图像转灰度图；在 frame_scope 内对同一截图重复调用时复用结果
+    
+    Args:
+        image: 源图像（BGR 或已是灰度）
+    
+    Returns:
+        灰度图像
+    """
+    if image.ndim != 3:
+        return image
+    cache = frame_cache(image)
+    if cache is not None:
+        gray = cache.get("gray")
+        if gray is not None:
+            return gray
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if cache is not None:
+        gray = cache.setdefault("gray", gray)
+    return gray
+
+
+# 单帧缓存的响应图数量上限（每张为整图大小的 float32）
+_MAX_CACHED_RESPONSES = 16
+
+# 粗到细匹配：半分辨率粗搜的候选放宽量、全分辨率精修的窗口半径（像素）、适用的最小模板边长
+_COARSE_SCORE_MARGIN = 0.1
+_REFINE_RADIUS = 8
+_COARSE_MIN_TEMPLATE_SIDE = 16
+
+
+
+# OpenCL 匹配出错后置为 True，本进程内不再尝试
+_opencl_failed = False
+
+
+@functools.lru_cache(maxsize=None)
+def _opencl_available() -> bool:
+    """OpenCV 是否有可用的 OpenCL 设备（首次检测时启用 OpenCL，结果缓存）"""
+    if not cv2.ocl.haveOpenCL():
+        return False
+    cv2.ocl.setUseOpenCL(True)
+    return cv2.ocl.useOpenCL()
+
+
+def _match_ncc(image_gray: np.ndarray, template_gray: np.ndarray) -> np.ndarray:
+    """
+    TM_CCOEFF_NORMED 模板匹配；配置开启 TEMPLATE_MATCH_USE_OPENCL 且 OpenCL 可用时通过 cv2.UMat 在 OpenCL 设备上计算，
+    出错则回退 CPU 且本进程内不再尝试
+    """
+    global _opencl_failed
+    if WeChatAutomationConfig.TEMPLATE_MATCH_USE_OPENCL and not _opencl_failed and _opencl_available():
+        try:
+            return cv2.matchTemplate(cv2.UMat(image_gray), cv2.UMat(template_gray), cv2.TM_CCOEFF_NORMED).get()
+        except cv2.error as e:
+            _opencl_failed = True
+            logger.warning("OpenCL 模板匹配失败，回退到 CPU: %s", e)
+    return cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+
+
+def _coarse_to_fine_response(image_gray: np.ndarray, template_gray: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    先在半分辨率上匹配找候选，再只在候选附近做全分辨率匹配
+    
+    返回与整图匹配同尺寸的响应图：候选窗口内为全分辨率 NCC 值，其余位置为 -1（低于任何阈值）。
+    """
+    th, tw = template_gray.shape[:2]
+    ih, iw = image_gray.shape[:2]
+    response = np.full((ih - th + 1, iw - tw + 1), -1.0, dtype=np.float32)
+    
+    coarse = _match_ncc(cv2.pyrDown(image_gray), cv2.pyrDown(template_gray))
+    candidates = (coarse >= threshold - _COARSE_SCORE_MARGIN).astype(np.uint8)
+    if not candidates.any():
+        return response
+    
+    # 候选点映射回全分辨率并膨胀出精修窗口，连通区域各自做一次局部匹配（窗口很小，始终在 CPU 上计算）
+    mask = np.zeros(response.shape, dtype=np.uint8)
+    ys, xs = np.nonzero(candidates)
+    mask[np.minimum(ys * 2, response.shape[0] - 1), np.minimum(xs * 2, response.shape[1] - 1)] = 1
+    kernel = np.ones((2 * _REFINE_RADIUS + 1, 2 * _REFINE_RADIUS + 1), dtype=np.uint8)
+    mask = cv2.dilate(mask, kernel)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    for x0, y0, w, h, _area in stats[1:n]:
+        patch = image_gray[y0:y0 + h + th - 1, x0:x0 + w + tw - 1]
+        response[y0:y0 + h, x0:x0 + w] = cv2.matchTemplate(patch, template_gray, cv2.TM_CCOEFF_NORMED)
+    return response
+
+
+def match_response(
+    image: np.ndarray,
+    template_path: Path,
+    threshold: Optional[float] = None,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+) -> Optional[np.ndarray]:
+    """
+    计算整图 TM_CCOEFF_NORMED 响应图；在 frame_scope 内对同一截图重复匹配同一模板时直接返回缓存
+    
+    头像定位、红点定位、标注等流程会在同一帧上多次匹配相同的联系人头像模板，
+    匹配（NCC）是定位中最耗时的一步，按帧缓存后每个模板只计算一次。
+    缓存字典：{(模板路径, 阈值, 区域): 响应图}，最多 _MAX_CACHED_RESPONSES 张。
+    
+    Args:
+        image: 源图像（BGR 或灰度，定位期间视为只读）
+        template_path: 模板文件路径
+        threshold: 调用方使用的匹配阈值（可选）。传入且模板足够大时采用粗到细匹配：
+            半分辨率找出得分 >= threshold - _COARSE_SCORE_MARGIN 的候选，仅在候选附近计算全分辨率得分，
+            其余位置置为 -1；只关心超过阈值的位置时使用
+        roi: 只在该区域 (x0, y0, x1, y1) 内匹配（可选）；本帧已有整图响应图时直接切片，否则只计算区域内部
+    
+    Returns:
+        只读的响应图（坐标为模板左上角；传入 roi 时相对 (x0, y0)），模板无法加载或大于源图像/区域时返回 None
+    """
+    template_gray = load_template_gray(template_path)
+    if template_gray is None:
+        return None
+    image_gray = to_gray(image)
+    if template_gray.shape[0] > image_gray.shape[0] or template_gray.shape[1] > image_gray.shape[1]:
+        return None
+    
+    cache = frame_cache(image)
+    responses = cache.setdefault("responses", {}) if cache is not None else {}
+    th, tw = template_gray.shape[:2]
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        if y1 - y0 < th or x1 - x0 < tw:
+            return None
+        full = responses.get((str(template_path), threshold, None))
+        if full is not None:
+            return full[y0:y1 - th + 1, x0:x1 - tw + 1]
+        image_gray = image_gray[y0:y1, x0:x1]
+    key = (str(template_path), threshold, roi)
+    response = responses.get(key)
+    if response is None:
+        if threshold is not None and min(th, tw) >= _COARSE_MIN_TEMPLATE_SIDE:
+            response = _coarse_to_fine_response(image_gray, template_gray, threshold)
+        else:
+            response = _match_ncc(image_gray, template_gray)
+        response.setflags(write=False)
+        if len(responses) < _MAX_CACHED_RESPONSES:
+            response = responses.setdefault(key, response)
+    return response
+
+
 def match_template(
     image: np.ndarray,
     template: np.ndarray,
-    threshold: float = 0.8
+    threshold: float = 0.8,
+    coarse_to_fine: bool = False,
 ) -> Tuple[Optional[Tuple[int, int]], float]:
     """
     模板匹配，返回最佳点和置信度
@@ -263,16 +522,15 @@ def match_template(
         image: 源图像（BGR格式）
         template: 模板图像（BGR格式）
         threshold: 匹配阈值（0.0-1.0），低于此值返回None
+        coarse_to_fine: 是否先在半分辨率上粗搜、只在候选附近做全分辨率匹配（模板足够大时生效）。
+            最佳点与置信度仍为全分辨率结果；粗搜得分低于 threshold - _COARSE_SCORE_MARGIN 的位置不再精修
     
     Returns:
         (最佳点坐标(x, y), 置信度) 或 (None, 置信度)
     """
     try:
         # 转换为灰度图（模板匹配通常在灰度图上进行）
-        if len(image.shape) == 3:
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            image_gray = image
+        image_gray = to_gray(image)
         
         if len(template.shape) == 3:
             template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
@@ -280,7 +538,10 @@ def match_template(
             template_gray = template
         
         # 模板匹配
-        result = cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+        if coarse_to_fine and min(template_gray.shape[:2]) >= _COARSE_MIN_TEMPLATE_SIDE:
+            result = _coarse_to_fine_response(image_gray, template_gray, threshold)
+        else:
+            result = cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCOEFF_NORMED)
         
         # 找到最佳匹配位置
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
@@ -306,6 +567,7 @@ def match_all_templates(
     threshold: float = 0.8,
     original_image: Optional[np.ndarray] = None,
     search_region_offset: Optional[Tuple[int, int]] = None,
+    coarse_to_fine: bool = False,
 ) -> LocateResult:
     """
     多模板匹配（同一元素的不同版本：亮/暗主题、不同版本等）
@@ -318,10 +580,26 @@ def match_all_templates(
         threshold: 匹配阈值（0.0-1.0）
         original_image: 原始完整截图（可选，用于保存调试截图时显示完整区域）
         search_region_offset: 搜索区域在原始图像中的偏移 (offset_x, offset_y)（可选）
+        coarse_to_fine: 是否使用粗到细匹配（见 match_template），适用于尺寸较大、只需最佳一处的模板
     
     Returns:
         定位结果（最佳匹配）
     """
+    with frame_scope(image):
+        return _match_all_templates(
+            image, template_group, threshold, original_image, search_region_offset, coarse_to_fine
+        )
+
+
+def _match_all_templates(
+    image: np.ndarray,
+    template_group: List[Path],
+    threshold: float,
+    original_image: Optional[np.ndarray],
+    search_region_offset: Optional[Tuple[int, int]],
+    coarse_to_fine: bool,
+) -> LocateResult:
+    """match_all_templates 的实现（在 image 的帧作用域内执行，多模板共用一次灰度转换）"""
     best_result = None
     best_confidence = 0.0
     best_template = None
@@ -332,14 +610,14 @@ def match_all_templates(
             continue
         
         try:
-            # 加载模板
-            template = cv2.imread(str(template_path))
+            # 加载模板（灰度、缓存）
+            template = load_template_gray(template_path)
             if template is None:
                 logger.warning(f"无法加载模板: {template_path}")
                 continue
             
-            # 匹配模板
-            point, confidence = match_template(image, template, threshold)
+            # 匹配模板（同一截图的灰度图在多模板间复用）
+            point, confidence = match_template(image, template, threshold, coarse_to_fine=coarse_to_fine)
             
             logger.debug(f"模板 {template_path.name}: 置信度={confidence:.3f}, 匹配成功={point is not None}, 阈值={threshold}")
             
@@ -417,7 +695,7 @@ def ocr_region(
     Returns:
         识别出的文本（去除空白字符）
     """
-    appcode = (getattr(WeChatAutomationConfig, "ALIYUN_OCR_APPCODE", None) or "").strip()
+    appcode = (WeChatAutomationConfig.get_aliyun_ocr_appcode() or "").strip()
     ocr_aliyun_module = None
     if appcode:
         try:
@@ -15,11 +15,15 @@
 4. 置信度范围：0.0-1.0，0.8以上认为可靠
 """
 
+import sys
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+# 供各模块的 dataclass 使用：@dataclass(**DATACLASS_SLOTS)。slots=True 需要 Python 3.10+；3.9 下退化为普通 dataclass
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class TaskType(Enum):
     """任务类型枚举"""
@@ -50,6 +54,9 @@ class WeChatConfig:
         display_resolution: 显示器分辨率 (width, height)
         language: 微信界面语言，必须为简体中文
         input_method: 输入法策略（clipboard/direct）
+        ready_ttl: 就绪检查结果的缓存时间（秒），期间不重复查找窗口/读取DPI/校验配置
+        frame_cache_ttl: 截图与元素定位结果的复用时间（秒），用于连续的 hash/状态查询共享同一帧
+        current_chat_ttl: 控制器自己打开的聊天被视为仍在前台的时间（秒），期间读取消息时若界面联系人名一致则不再预先 open_chat
     """
     window_position: tuple[int, int] = (0, 0)
     window_size: tuple[int, int] = (1200, 800)
@@ -58,6 +65,9 @@ class WeChatConfig:
     display_resolution: tuple[int, int] = (1920, 1080)
     language: str = "zh_CN"
     input_method: str = "clipboard"
+    ready_ttl: float = 3.0
+    frame_cache_ttl: float = 0.5
+    current_chat_ttl: float = 5.0
 
 
 @dataclass
@@ -16,6 +16,8 @@ import json
 import logging
 import os
 import ssl
+import threading
+import time
 from typing import Optional, Tuple
 
 import cv2
@@ -36,13 +38,45 @@ logger = logging.getLogger(__name__)
 
 # 支持相对导入和绝对导入
 try:
-    from .config import WeChatAutomationConfig
+    from .config import WeChatAutomationConfig, ensure_dotenv_loaded
 except ImportError:
     import sys
     from pathlib import Path
 
     sys.path.insert(0, str(Path(__file__).parent))
-    from config import WeChatAutomationConfig
+    from config import WeChatAutomationConfig, ensure_dotenv_loaded
+
+
+# 远程 OCR 并发上限：多个轮询线程同时识别时按此数量排队，避免超出阿里云 TPS 限制后集体被限流
+_ocr_semaphore: Optional[threading.BoundedSemaphore] = None
+_ocr_semaphore_lock = threading.Lock()
+
+# 限流（HTTP 429 / Throttling）时的指数退避：b <- min(2b, b_max)
+_THROTTLE_BACKOFF_INITIAL = 0.5
+_THROTTLE_BACKOFF_MAX = 4.0
+_THROTTLE_MAX_RETRIES = 3
+
+
+def _get_ocr_semaphore() -> threading.BoundedSemaphore:
+    """懒创建远程 OCR 并发信号量，容量取环境变量 OCR_CONCURRENCY（默认 CPU 核数）"""
+    global _ocr_semaphore
+    if _ocr_semaphore is None:
+        with _ocr_semaphore_lock:
+            if _ocr_semaphore is None:
+                ensure_dotenv_loaded()
+                try:
+                    limit = int(os.getenv("OCR_CONCURRENCY") or 0)
+                except ValueError:
+                    limit = 0
+                if limit <= 0:
+                    limit = os.cpu_count() or 1
+                _ocr_semaphore = threading.BoundedSemaphore(limit)
+    return _ocr_semaphore
+
+
+def _is_throttled(code: int, body: str) -> bool:
+    """判断 HTTP 错误是否为限流（429 或网关返回的 Throttling 错误码）"""
+    return code == 429 or "Throttling" in body
 
 
 def _image_to_base64_png(image_bgr) -> str:
@@ -63,6 +97,7 @@ def _ocr_via_dashscope_qwen(
 
     返回识别出的文本（失败返回空字符串）。
     """
+    ensure_dotenv_loaded()
     api_key = (os.getenv("DASHSCOPE_API_KEY") or "").strip()
     if not api_key:
         return ""
@@ -99,24 +134,26 @@ def _ocr_via_dashscope_qwen(
 
     try:
         client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
-        completion = client.chat.completions.create(
-            model=os.getenv("DASHSCOPE_OCR_MODEL", "qwen-vl-ocr-2025-11-20"),
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": data_url},
-                        },
-                        {
-                            "type": "text",
-                            "text": "请仅输出图像中的文本内容。",
-                        },
-                    ],
-                }
-            ],
-        )
+        # openai 客户端自身会对 429 做退避重试，这里只限制并发
+        with _get_ocr_semaphore():
+            completion = client.chat.completions.create(
+                model=os.getenv("DASHSCOPE_OCR_MODEL", "qwen-vl-ocr-2025-11-20"),
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image_url",
+                                "image_url": {"url": data_url},
+                            },
+                            {
+                                "type": "text",
+                                "text": "请仅输出图像中的文本内容。",
+                            },
+                        ],
+                    }
+                ],
+            )
         content = completion.choices[0].message.content
         # 兼容字符串或结构化 content
         if isinstance(content, str):
@@ -143,7 +180,7 @@ def _ocr_via_legacy_market_api(
     """
     兼容旧版阿里云市场高精版 OCR 接口（APPCODE 方式）。
     """
-    appcode = (appcode or WeChatAutomationConfig.ALIYUN_OCR_APPCODE or "").strip()
+    appcode = (appcode or WeChatAutomationConfig.get_aliyun_ocr_appcode() or "").strip()
     if not appcode:
         return ""
 
@@ -179,24 +216,35 @@ def _ocr_via_legacy_market_api(
         "Authorization": "APPCODE %s" % appcode,
         "Content-Type": "application/json; charset=UTF-8",
     }
-    try:
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        req = Request(url, data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
-        resp = urlopen(req, timeout=timeout, context=ctx)
-        raw = resp.read().decode("utf-8")
-        data = json.loads(raw)
-        words = data.get("prism_wordsInfo") or []
-        text = "".join(w.get("word", "") for w in words)
-        return (text or "").strip()
-    except HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        logger.warning("阿里云 OCR 请求失败: %s %s", e.code, body[:200])
-        return ""
-    except Exception as e:
-        logger.warning("阿里云 OCR 请求异常: %s", e)
-        return ""
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    payload = json.dumps(body).encode("utf-8")
+    backoff = _THROTTLE_BACKOFF_INITIAL
+    for attempt in range(_THROTTLE_MAX_RETRIES + 1):
+        try:
+            req = Request(url, data=payload, headers=headers, method="POST")
+            with _get_ocr_semaphore():
+                resp = urlopen(req, timeout=timeout, context=ctx)
+                raw = resp.read().decode("utf-8")
+            data = json.loads(raw)
+            words = data.get("prism_wordsInfo") or []
+            text = "".join(w.get("word", "") for w in words)
+            return (text or "").strip()
+        except HTTPError as e:
+            err_body = e.read().decode("utf-8", errors="replace")
+            if _is_throttled(e.code, err_body) and attempt < _THROTTLE_MAX_RETRIES:
+                logger.debug("阿里云 OCR 被限流，%.1fs 后重试 (第 %s 次)", backoff, attempt + 1)
+                # 退避期间不占用信号量，让其他线程的请求照常排队
+                time.sleep(backoff)
+                backoff = min(2 * backoff, _THROTTLE_BACKOFF_MAX)
+                continue
+            logger.warning("阿里云 OCR 请求失败: %s %s", e.code, err_body[:200])
+            return ""
+        except Exception as e:
+            logger.warning("阿里云 OCR 请求异常: %s", e)
+            return ""
+    return ""
 
 
 def ocr_region_aliyun(
@@ -4,6 +4,7 @@
 
 核心功能：
 - get_wechat_hwnd(): 获取微信窗口句柄（可缓存）
+- is_window_alive(): 检查窗口句柄是否仍然有效
 - get_window_client_bbox(): 获取窗口客户区在屏幕上的绝对位置
 - capture_window(): 截取微信窗口
 - crop_region(): 裁剪指定区域
@@ -146,6 +147,24 @@ def get_wechat_hwnd(window_title: Optional[str] = None) -> int:
     return windows[0]
 
 
+def is_window_alive(hwnd: Optional[int]) -> bool:
+    """
+    检查窗口句柄是否仍然有效（IsWindow，远比 EnumWindows 查找便宜）
+    
+    Args:
+        hwnd: 窗口句柄
+    
+    Returns:
+        句柄有效返回 True，否则返回 False
+    """
+    if not hwnd:
+        return False
+    try:
+        return bool(win32gui.IsWindow(hwnd))
+    except Exception:
+        return False
+
+
 def get_window_client_bbox(hwnd: int) -> Tuple[int, int, int, int]:
     """
     获取窗口客户区在屏幕上的绝对位置
@@ -297,17 +316,12 @@ def capture_window(hwnd: Optional[int] = None, window_title: Optional[str] = Non
         if result == 0:
             raise ScreenshotError("PrintWindow 失败")
         
-        # 转换为PIL Image然后转为numpy数组（Windows 位图为 BGRX，PIL 解析后可能为 RGB）
-        img = Image.frombuffer(
-            'RGB',
-            (bmp_info['bmWidth'], bmp_info['bmHeight']),
-            bmp_str, 'raw', 'BGRX', 0, 1
+        # Windows 位图为 BGRX，直接视为 (高, 宽, 4) 数组取前三通道即为 BGR（OpenCV 约定），
+        # 保证整条链路红点判定、保存前再转 RGB 时颜色一致；只做一次拷贝，不经 PIL 中转
+        bgrx = np.frombuffer(bmp_str, dtype=np.uint8).reshape(
+            bmp_info['bmHeight'], bmp_info['bmWidth'], 4
         )
-        img_array = np.array(img)
-        # 统一为 BGR（OpenCV 约定），保证整条链路红点判定、保存前再转 RGB 时颜色一致
-        if img_array.shape[2] == 3:
-            img_array = np.ascontiguousarray(img_array[:, :, ::-1])
-        return img_array
+        return np.ascontiguousarray(bgrx[:, :, :3])
     
     except WindowNotFoundError:
         raise
@@ -23,8 +23,12 @@ import pytest
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from config import ensure_dotenv_loaded  # noqa: E402
 from ocr_aliyun import ocr_region_aliyun  # noqa: E402
 
+# skip 判断读取的变量可能只写在 .env 中
+ensure_dotenv_loaded()
+
 
 _HAS_DASHSCOPE = bool(os.getenv("DASHSCOPE_API_KEY", "").strip())
 _HAS_APPCODE = bool(os.getenv("ALIYUN_OCR_APPCODE", "").strip())
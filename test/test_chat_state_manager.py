@@ -0,0 +1,99 @@
+"""聊天状态管理测试：视觉基线的保存、比较与清除
+
+1. 汉明距离：hash_distance 与 imagehash 的 hash 相减结果一致（按位 XOR + popcount）。
+2. has_new_message：无基线时返回 True；差异低于阈值返回 False；达到阈值返回 True 并更新基线。
+3. 各联系人状态互不影响；hash_distances 批量比较结果与单个比较一致。
+4. 非 64 位十六进制的 hash 回退到字符串比较；清除状态后基线表的行可复用。
+"""
+
+import sys
+from pathlib import Path
+
+# 项目根加入 path，支持直接运行或 pytest
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from chat_state_manager import ChatStateManager, hash_distance
+
+
+BASE_HASH = "c1597d6d076cce06"
+NEAR_HASH = "c1597d4d076cce0e"  # 与 BASE_HASH 相差 2 位
+FAR_HASH = "3ea68292f89331f9"  # BASE_HASH 按位取反，相差 64 位
+
+
+def test_hash_distance_counts_differing_bits():
+    assert hash_distance(BASE_HASH, BASE_HASH) == 0
+    assert hash_distance(BASE_HASH, NEAR_HASH) == 2
+    assert hash_distance(BASE_HASH, FAR_HASH) == 64
+
+
+def test_has_new_message_without_baseline_returns_true():
+    manager = ChatStateManager()
+    assert manager.has_new_message("联系人A", current_hash=BASE_HASH) is True
+
+
+def test_has_new_message_below_threshold_returns_false():
+    manager = ChatStateManager()
+    manager.save_state("联系人A", chat_hash=BASE_HASH)
+    assert manager.has_new_message("联系人A", current_hash=NEAR_HASH, hash_threshold=8) is False
+    assert manager.get_chat_hash("联系人A") == BASE_HASH
+
+
+def test_has_new_message_above_threshold_updates_baseline():
+    manager = ChatStateManager()
+    manager.save_state("联系人A", chat_hash=BASE_HASH)
+    assert manager.has_new_message("联系人A", current_hash=FAR_HASH, hash_threshold=8) is True
+    assert manager.get_chat_hash("联系人A") == FAR_HASH
+    # 基线已更新，相同画面再次比较不再判定为新消息
+    assert manager.has_new_message("联系人A", current_hash=FAR_HASH, hash_threshold=8) is False
+
+
+def test_states_are_isolated_per_contact():
+    manager = ChatStateManager()
+    manager.save_state("联系人A", chat_hash=BASE_HASH)
+    assert manager.has_new_message("联系人B", current_hash=BASE_HASH) is True
+    assert manager.clear_state("联系人A") is True
+    assert manager.has_new_message("联系人A", current_hash=NEAR_HASH) is True
+
+
+def test_hash_distances_batch_matches_single_and_marks_missing_baseline():
+    manager = ChatStateManager()
+    # 超过初始容量，验证基线表扩容后仍然正确
+    for i in range(100):
+        manager.save_state(f"联系人{i}", chat_hash=f"{i:016x}")
+    manager.save_state("联系人A", chat_hash=BASE_HASH)
+
+    distances = manager.hash_distances(
+        ["联系人A", "联系人3", "联系人99", "无基线"],
+        [NEAR_HASH, "0000000000000000", "0000000000000000", BASE_HASH],
+    )
+    assert distances.tolist() == [2, 2, 4, -1]
+
+
+def test_hashes_that_do_not_fit_uint64_fall_back_to_string_comparison():
+    manager = ChatStateManager()
+    long_hash = BASE_HASH * 4  # hash_size=16 的 pHash：256 位
+    manager.save_state("长hash", chat_hash=long_hash)
+    manager.save_state("非十六进制", chat_hash="not-a-hash")
+
+    assert manager.has_new_message("长hash", current_hash=long_hash) is False
+    assert manager.has_new_message("长hash", current_hash=NEAR_HASH * 4, hash_threshold=10) is False  # 相差 8 位
+    assert manager.has_new_message("非十六进制", current_hash="not-a-hash") is False
+    assert manager.has_new_message("非十六进制", current_hash="other") is True  # 基线更新为 "other"
+
+    distances = manager.hash_distances(["长hash", "非十六进制"], [FAR_HASH * 4, "other"])
+    assert distances.tolist() == [256, 0]
+
+
+def test_clear_state_releases_hash_row_for_reuse():
+    manager = ChatStateManager()
+    manager.save_state("联系人A", chat_hash=BASE_HASH)
+    manager.save_state("联系人B", chat_hash=FAR_HASH)
+    assert manager.clear_state("联系人A") is True
+    manager.save_state("联系人C", chat_hash=NEAR_HASH)
+
+    # 联系人C 复用联系人A 释放的行，联系人B 的基线不受影响
+    assert len(manager._hash_table) == 64
+    assert sorted(manager._hash_rows.values()) == [0, 1]
+    assert manager.hash_distances(["联系人B", "联系人C", "联系人A"], [FAR_HASH, NEAR_HASH, BASE_HASH]).tolist() == [0, 0, -1]
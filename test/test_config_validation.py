@@ -114,6 +114,26 @@ def test_validate_config_strict_true_raises_when_optional_missing():
     assert False, "validate_config(strict=True) 在可选缺失时应抛出 ConfigValidationError"
 
 
+
+def test_validate_reports_template_added_in_place():
+    """TEMPLATE_PATHS 被原地修改（新增/替换条目）时，validate() 按当前路径报告缺失，不抛 KeyError。"""
+    required_name = next(iter(WeChatAutomationConfig.REQUIRED_TEMPLATES))
+    paths = WeChatAutomationConfig.TEMPLATE_PATHS
+    original = paths[required_name]
+    fake = MagicMock(spec=Path)
+    fake.exists.return_value = False
+    fake.name = "added_in_place.png"
+    paths[required_name] = fake
+    paths["added_in_place"] = fake
+    try:
+        is_valid, msg = WeChatAutomationConfig.validate(strict=False)
+    finally:
+        paths[required_name] = original
+        del paths["added_in_place"]
+    assert not is_valid
+    assert f"{required_name} -> added_in_place.png" in msg
+
+
 if __name__ == "__main__":
     try:
         import pytest
@@ -126,4 +146,5 @@ if __name__ == "__main__":
         test_validate_strict_false_passes_with_only_required_templates()
         test_validate_strict_true_fails_when_optional_missing()
         test_validate_config_strict_true_raises_when_optional_missing()
+        test_validate_reports_template_added_in_place()
         print("OK: all config validation tests passed")
@@ -0,0 +1,235 @@
+"""驱动层控制器测试（WeChatController）
+
+通过 mock 截图/定位/流程函数验证控制器自身的缓存与跳过逻辑，不依赖真实微信窗口。
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+import controller
+from models import FlowResult, TaskType, WeChatConfig
+
+
+class _FakeClock:
+    """替代 controller 模块中的 time：monotonic 返回手动推进的时间，其余属性取自真实 time 模块"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _make_controller() -> controller.WeChatController:
+    """创建跳过就绪检查的控制器"""
+    ctrl = controller.WeChatController(WeChatConfig())
+    ctrl._ensure_ready = MagicMock()
+    return ctrl
+
+
+def test_read_new_messages_skips_open_chat_only_when_visible_contact_matches():
+    """本控制器刚打开过同一聊天时，只有界面联系人名仍一致才跳过 open_chat"""
+    ctrl = _make_controller()
+    ctrl._remember_current_chat("张三")
+    flows = MagicMock()
+    flows.open_chat.return_value = FlowResult(success=True, task_type=TaskType.OPEN_CHAT, execution_time=0.0)
+    flows.read_new_messages.return_value = FlowResult(
+        success=True, task_type=TaskType.READ_MESSAGES, execution_time=0.0, data={"messages": []}
+    )
+    locator = MagicMock()
+    with patch.object(controller, "_flows", return_value=flows), \
+         patch.object(controller, "_element_locator", return_value=locator):
+        locator.get_contact_name.return_value = "张三"
+        ctrl.read_new_messages("张三")
+        flows.open_chat.assert_not_called()
+
+        # 用户手动切到了别的聊天：必须重新打开
+        locator.get_contact_name.return_value = "李四"
+        ctrl.read_new_messages("张三")
+        flows.open_chat.assert_called_once()
+
+
+def test_get_status_skips_window_probes_when_wechat_not_running():
+    """微信未运行时不读取 DPI、不校验配置"""
+    ctrl = _make_controller()
+    ctrl.is_wechat_running = MagicMock(return_value=False)
+    with patch.object(controller, "get_dpi_scale") as dpi, \
+         patch.object(controller.WeChatAutomationConfig, "validate") as validate:
+        status = ctrl.get_status()
+    assert status["wechat_running"] is False
+    assert status["dpi_scale"] is None
+    dpi.assert_not_called()
+    validate.assert_not_called()
+
+
+def test_get_status_waits_for_all_probes():
+    """微信运行时等待 DPI 读取与配置校验完成，不因耗时而丢弃结果"""
+    ctrl = _make_controller()
+    ctrl.is_wechat_running = MagicMock(return_value=True)
+
+    def _slow_validate(*args, **kwargs):
+        time.sleep(0.6)
+        return False, "模板缺失"
+
+    with patch.object(controller, "get_dpi_scale", return_value=125), \
+         patch.object(controller.WeChatAutomationConfig, "validate", side_effect=_slow_validate):
+        status = ctrl.get_status()
+    assert status["dpi_scale"] == 125
+    assert status["config_valid"] is False
+    assert status["config_error"] == "模板缺失"
+    assert "error" not in status
+
+
+def test_sync_ui_methods_are_serialized_across_threads():
+    """不经协程接口、直接从多个线程调用同步 UI 方法时，流程也不会交错执行"""
+    ctrl = _make_controller()
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def _flow(*args, **kwargs):
+        with lock:
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        return FlowResult(success=True, task_type=TaskType.SEND_MESSAGE, execution_time=0.0)
+
+    flows = MagicMock()
+    flows.send_text_to_contact.side_effect = _flow
+    flows.open_chat.side_effect = _flow
+    with patch.object(controller, "_flows", return_value=flows):
+        threads = [threading.Thread(target=ctrl.send_text, args=("张三", f"消息{i}")) for i in range(3)]
+        threads += [threading.Thread(target=ctrl.open_chat, args=("李四",)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert flows.send_text_to_contact.call_count == 3
+    assert flows.open_chat.call_count == 3
+    assert overlaps == []
+
+
+def test_ready_cache_reused_within_ttl_and_rechecked_after_expiry_or_invalidation():
+    """完整就绪检查在 ready_ttl 内复用；过期、显式失效或窗口失效后重新检查"""
+    ctrl = controller.WeChatController(WeChatConfig())
+    clock = _FakeClock()
+    with patch.object(controller, "time", clock), \
+         patch.object(controller, "get_wechat_hwnd", return_value=123) as find_window, \
+         patch.object(controller, "get_dpi_scale", return_value=100.0), \
+         patch.object(controller, "is_window_alive", return_value=True) as alive, \
+         patch.object(controller.WeChatAutomationConfig, "validate_config"):
+        ctrl._ensure_ready()
+        clock.advance(ctrl.config.ready_ttl - 0.1)
+        ctrl._ensure_ready()
+        assert find_window.call_count == 1
+
+        clock.advance(0.1)
+        ctrl._ensure_ready()
+        assert find_window.call_count == 2
+
+        ctrl._invalidate_ready_cache()
+        ctrl._ensure_ready()
+        assert find_window.call_count == 3
+
+        alive.return_value = False
+        ctrl._ensure_ready()
+        assert find_window.call_count == 4
+    assert ctrl._hwnd == 123
+
+
+def test_grab_reuses_frame_within_ttl_for_same_contact():
+    """截图与定位结果在 frame_cache_ttl 内对同一联系人复用；换联系人、过期或失效后重新截图"""
+    ctrl = _make_controller()
+    clock = _FakeClock()
+    locator = MagicMock()
+    with patch.object(controller, "time", clock), \
+         patch.object(controller, "capture_window", side_effect=lambda hwnd: np.zeros((4, 4, 3), np.uint8)) as capture, \
+         patch.object(controller, "_element_locator", return_value=locator):
+        first = ctrl._grab("张三")
+        assert ctrl._grab("张三")[0] is first[0]
+        assert capture.call_count == 1
+
+        ctrl._grab("李四")
+        assert capture.call_count == 2
+
+        clock.advance(ctrl.config.frame_cache_ttl)
+        ctrl._grab("李四")
+        assert capture.call_count == 3
+
+        ctrl._invalidate_frame_cache()
+        ctrl._grab("李四")
+        assert capture.call_count == 4
+    assert locator.locate_all_elements.call_count == 4
+
+
+def test_has_new_messages_first_poll_only_sets_baselines():
+    """批量检测：首次出现的联系人只保存行基线并报告无变化，之后才比较"""
+    ctrl = _make_controller()
+    ctrl._grab = MagicMock(return_value=(np.zeros((10, 10, 3), np.uint8), {}))
+    locator = MagicMock()
+    locator.get_contact_row_rois.return_value = {"张三": (0, 0, 5, 5), "李四": (0, 5, 5, 5)}
+    hash_a, hash_b = 0x0123456789ABCDEF, 0xFEDCBA9876543210
+    locator.batch_phash.return_value = np.array([hash_a, hash_b], dtype=np.uint64)
+    contacts = ["张三", "李四", "王五"]
+    with patch.object(controller, "_element_locator", return_value=locator):
+        assert ctrl.has_new_messages(contacts) == {"张三": False, "李四": False, "王五": False}
+        assert ctrl._list_row_states.get_chat_hash("张三") == f"{hash_a:016x}"
+        assert ctrl._list_row_states.get_chat_hash("李四") == f"{hash_b:016x}"
+
+        assert ctrl.has_new_messages(contacts) == {"张三": False, "李四": False, "王五": False}
+
+        locator.batch_phash.return_value = np.array([hash_a ^ 0xFFFF, hash_b], dtype=np.uint64)
+        assert ctrl.has_new_messages(contacts) == {"张三": True, "李四": False, "王五": False}
+        assert ctrl._list_row_states.get_chat_hash("张三") == f"{hash_a ^ 0xFFFF:016x}"
+
+
+def test_async_wrappers_share_frame_cache_with_ttl_and_invalidation():
+    """协程接口与同步方法共用帧缓存：TTL 内复用，过期或 UI 操作后重新截图"""
+    ctrl = _make_controller()
+    clock = _FakeClock()
+    locator = MagicMock()
+    locator.has_new_message.return_value = False
+    flows = MagicMock()
+    flows.send_text_to_contact.return_value = FlowResult(
+        success=True, task_type=TaskType.SEND_MESSAGE, execution_time=0.0
+    )
+
+    async def _scenario(capture):
+        assert await ctrl.a_has_new_message("张三") is False
+        await ctrl.a_has_new_message("张三")
+        assert capture.call_count == 1
+
+        clock.advance(ctrl.config.frame_cache_ttl)
+        await ctrl.a_has_new_message("张三")
+        assert capture.call_count == 2
+
+        result = await ctrl.a_send_text("张三", "你好")
+        assert result.success
+        await ctrl.a_has_new_message("张三")
+        assert capture.call_count == 3
+
+    with patch.object(controller, "time", clock), \
+         patch.object(controller, "capture_window", return_value=np.zeros((4, 4, 3), np.uint8)) as capture, \
+         patch.object(controller, "_element_locator", return_value=locator), \
+         patch.object(controller, "_flows", return_value=flows):
+        asyncio.run(_scenario(capture))
+    assert locator.has_new_message.call_count == 4
@@ -0,0 +1,90 @@
+"""感知哈希（pHash）测试
+
+1. batch_phash 整批计算的结果与 _compute_roi_phash 逐个计算的结果逐行一致。
+2. _compute_roi_phash 与 imagehash.phash 的差异保持在已知范围内（缩放插值不同，并非逐位一致）。
+
+样本 ROI 取自把 assets/templates 中的界面模板拼贴到浅色背景上得到的合成截图（行区域、单个图标、跨图标区域），
+另加少量随机纹理区域。
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+import pytest
+
+# 项目根加入 path
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+_TEMPLATES_DIR = _project_root / "assets" / "templates"
+
+
+def _sample_screenshot_and_rois() -> Tuple[np.ndarray, List[Tuple[int, int, int, int]]]:
+    """构造合成截图及其上的样本 ROI 列表 (x, y, width, height)"""
+    canvas = np.full((900, 700, 3), 245, dtype=np.uint8)
+    rois: List[Tuple[int, int, int, int]] = []
+    x, y, row_h = 10, 10, 0
+    for path in sorted(_TEMPLATES_DIR.glob("*.png")):
+        template = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if template is None:
+            continue
+        h, w = template.shape[:2]
+        h, w = min(h, 200), min(w, 340)
+        if x + w > canvas.shape[1] - 10:
+            x, y, row_h = 10, y + row_h + 10, 0
+        if y + h > canvas.shape[0] - 10:
+            break
+        canvas[y:y + h, x:x + w] = template[:h, :w]
+        rois.append((x, y, w, h))
+        # 带一圈背景的稍大区域
+        rois.append((max(0, x - 5), max(0, y - 5), w + 10, h + 10))
+        x, row_h = x + w + 10, max(row_h, h)
+    # 跨越多个图标的整行区域
+    rois.append((0, 0, canvas.shape[1], 80))
+    rois.append((0, 40, canvas.shape[1] // 2, 120))
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    canvas[-130:-10, -170:-10] = cv2.GaussianBlur(texture, (5, 5), 0)
+    rois.append((canvas.shape[1] - 170, canvas.shape[0] - 130, 160, 120))
+    rois.append((canvas.shape[1] - 150, canvas.shape[0] - 110, 64, 48))
+    return canvas, rois
+
+
+def test_batch_phash_matches_single_roi_phash_row_by_row():
+    """batch_phash 的每一行与 _compute_roi_phash 的十六进制结果相同"""
+    from element_locator import batch_phash, _compute_roi_phash
+
+    screenshot, rois = _sample_screenshot_and_rois()
+    assert len(rois) >= 10
+    hashes = batch_phash(screenshot, rois)
+    assert hashes.dtype == np.uint64
+    assert hashes.shape == (len(rois),)
+    for roi, value in zip(rois, hashes):
+        assert f"{int(value):016x}" == _compute_roi_phash(screenshot, roi), roi
+
+
+def test_batch_phash_empty_rois():
+    from element_locator import batch_phash
+
+    assert batch_phash(np.zeros((10, 10, 3), np.uint8), []).shape == (0,)
+
+
+def test_roi_phash_stays_close_to_imagehash():
+    """与 imagehash.phash 的汉明距离：平均不超过 2 位，最大不超过 10 位（样本上的实测上界）"""
+    imagehash = pytest.importorskip("imagehash")
+    from PIL import Image
+    from element_locator import _compute_roi_phash
+    from chat_state_manager import hash_distance
+
+    screenshot, rois = _sample_screenshot_and_rois()
+    distances = []
+    for roi_x, roi_y, roi_width, roi_height in rois:
+        roi_image = screenshot[roi_y:roi_y + roi_height, roi_x:roi_x + roi_width]
+        expected = str(imagehash.phash(Image.fromarray(cv2.cvtColor(roi_image, cv2.COLOR_BGR2RGB))))
+        distances.append(hash_distance(expected, _compute_roi_phash(screenshot, (roi_x, roi_y, roi_width, roi_height))))
+    assert float(np.mean(distances)) <= 2.0, distances
+    assert max(distances) <= 10, distances
@@ -3,14 +3,17 @@
 同一画面 → 同一结果。验证的不是“能不能定位”，而是可重复性。
 
 1. screen 纯函数：给截图/区域 → 出确定结果（crop_region 同入同出；get_window_client_bbox 同 hwnd 同出）
-2. locator 不依赖“上一帧状态”：同一图+同一模板跑多次，结果差在阈值内
+2. locator 不依赖“上一帧状态”：同一图+同一模板跑多次，结果差在阈值内；
+   按帧缓存只在 frame_scope 内或像素完全相同时命中，同一数组被原地修改后不会返回旧结果
 3. DPI 只是缩放：dpi=100/125/150 下，归一化后逻辑 ROI 坐标一致
 """
 
 import sys
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest.mock import patch, MagicMock
 
+import cv2
 import numpy as np
 
 # 项目根加入 path
@@ -91,6 +94,57 @@ def test_match_template_same_input_same_output_three_times():
         assert abs(c0 - c1) < 1e-6  # 置信度应完全一致
 
 
+def test_match_response_cached_only_inside_frame_scope():
+    """match_response：frame_scope 内同一截图复用响应图；作用域结束后原地修改截图，结果随之更新。"""
+    from locator import frame_scope, match_response
+
+    np.random.seed(7)
+    template = np.random.randint(0, 255, (24, 24, 3), dtype=np.uint8)
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    image[30:54, 40:64] = template
+
+    with TemporaryDirectory() as tmp:
+        template_path = Path(tmp) / "template.png"
+        assert cv2.imwrite(str(template_path), template)
+
+        with frame_scope(image):
+            first = match_response(image, template_path)
+            assert match_response(image, template_path) is first
+
+        # 同一数组对象被重新填充（如在原图上绘制），不能再命中上一帧的响应图
+        image[30:54, 40:64] = 0
+        image[60:84, 10:34] = template
+        second = match_response(image, template_path)
+    assert np.unravel_index(np.argmax(first), first.shape) == (30, 40)
+    assert np.unravel_index(np.argmax(second), second.shape) == (60, 10)
+
+
+def test_locate_all_elements_cache_keyed_by_frame_content():
+    """locate_all_elements：像素相同的帧复用结果（返回副本）；同一数组原地修改后重新定位。"""
+    import element_locator
+    from models import LocateResult
+
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    calls = []
+
+    def fake_locate(screenshot, threshold, contact_name, contact_id):
+        calls.append(screenshot.sum())
+        return {"search_bar": LocateResult(success=True, x=len(calls), y=0, confidence=0.9)}
+
+    with patch.object(element_locator, "_last_positions", (None, None)), \
+            patch.object(element_locator, "_locate_elements_in_frame", side_effect=fake_locate):
+        first = element_locator.locate_all_elements(image)
+        first["search_bar"].x = 999  # 修改返回值不影响缓存
+        again = element_locator.locate_all_elements(image.copy())
+        assert len(calls) == 1
+        assert again["search_bar"].x == 1
+
+        image[0, 0] = 255
+        changed = element_locator.locate_all_elements(image)
+        assert len(calls) == 2
+        assert changed["search_bar"].x == 2
+
+
 # ---------------------------------------------------------------------------
 # 3. DPI 只是缩放，归一化后逻辑坐标一致
 # ---------------------------------------------------------------------------